@@ -0,0 +1,334 @@
+import random
+import asyncio
+import hashlib
+import threading
+
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+from xml.sax.saxutils import escape
+from datetime import date, datetime, timedelta, timezone
+
+from aiohttp import web
+
+from bmrs.benchmarks import logger
+
+
+class BenchmarkBmrsStandInServer:
+    """
+    A local aiohttp server standing in for the BMRS API when benchmarking.
+
+    It serves B1770 and B1780 responses in XML or CSV for any settlement date and period,
+    including Period=* for a whole day, with deterministic pseudo-random values. Latency,
+    server errors and rate limiting (429 with Retry-After) can be injected at configurable rates.
+    Responses carry an ETag and are answered with 304 Not Modified when it matches If-None-Match,
+    and setting published_until withholds the periods that have not ended by then, as on a live day.
+    Setting truncate_day_after cuts whole-day responses short after that period, and withheld_periods
+    withholds periods of every date as if they were published late.
+    The server runs its own event loop in a background thread, so serving does not delay the
+    event loop of the client being measured.
+
+    Usage:
+        with BenchmarkBmrsStandInServer(latency=0.05, error_rate=0.01) as server:
+            retriever = ServiceBmrsDataRetriever(url_builder=server)
+    """
+
+    # Fields of every item, in the order of the live API, with a template for their values.
+    REPORT_FIELDS = {
+        'B1770': {'timeSeriesID': 'ELX-EMFIP-IMBP-TS-2',
+                  'businessType': 'Balance energy deviation',
+                  'controlArea': '10YGB----------A',
+                  'settlementDate': None,
+                  'settlementPeriod': None,
+                  'imbalancePriceAmountGBP': None,
+                  'priceCategory': 'Excess balance',
+                  'curveType': 'Sequential fixed size block',
+                  'resolution': 'PT30M',
+                  'documentType': 'Imbalance prices',
+                  'processType': 'Realised',
+                  'activeFlag': 'Y',
+                  'docStatus': 'Final',
+                  'documentID': None,
+                  'documentRevNum': '1'},
+        'B1780': {'timeSeriesID': 'ELX-EMFIP-IMBVOL-TS-1',
+                  'businessType': 'Balance energy deviation',
+                  'controlArea': '10YGB----------A',
+                  'settlementDate': None,
+                  'settlementPeriod': None,
+                  'imbalanceQuantityMAW': None,
+                  'imbalanceQuantityDirection': None,
+                  'curveType': 'Sequential fixed size block',
+                  'resolution': 'PT30M',
+                  'documentType': 'Imbalance volume',
+                  'processType': 'Realised',
+                  'activeFlag': 'Y',
+                  'docStatus': 'Final',
+                  'documentID': None,
+                  'documentRevNum': '1'},
+    }
+    CSV_TITLES = {'B1770': 'IMBALANCE PRICES', 'B1780': 'IMBALANCE VOLUME'}
+    LOCAL_TIMEZONE = ZoneInfo('Europe/London')
+
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 retry_after: float = 1.0,
+                 published_until: Optional[datetime] = None,
+                 truncate_day_after: Optional[int] = None,
+                 withheld_periods: Iterable[int] = (),
+                 seed: Optional[int] = None) -> None:
+        self.host = host
+        # Port to listen on; 0 picks a free port, available from base_url once started.
+        self.port = port
+        # Seconds every response is delayed by, plus a uniform random jitter of up to latency_jitter.
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # Share of requests answered with a 503 error.
+        self.error_rate = error_rate
+        # Share of requests answered with a 429 and a Retry-After header of retry_after seconds.
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        # Periods ending after this timezone-aware time are not published yet. None publishes every period.
+        self.published_until = published_until
+        # Period=* responses stop after this period, as if cut short. None serves whole days.
+        self.truncate_day_after = truncate_day_after
+        # Periods of every date that are not published yet, even once they have ended.
+        self.withheld_periods = set(withheld_periods)
+
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.base_url: Optional[str] = None
+
+        self.request_count = 0
+        self.error_count = 0
+        self.throttled_count = 0
+        self.bytes_sent = 0
+        self.not_modified_count = 0
+
+
+    def __enter__(self) -> 'BenchmarkBmrsStandInServer':
+        self.start()
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+    def start(self) -> str:
+        """
+        Starts serving on the configured host and port in a background thread and returns the base URL.
+        """
+
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve() -> None:
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        started.wait()
+
+        logger.info(f"{self.__class__.__name__}: Serving on {self.base_url}")
+        return self.base_url
+
+
+    def stop(self) -> None:
+        """
+        Stops the server and its thread.
+        """
+
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+            self._runner = None
+
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get('/{report_name}/{version}', self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}/"
+
+
+    def build_url(self,
+                  period: str,
+                  report_name: str,
+                  settlement_date: str,
+                  service_type: str = 'xml') -> Optional[str]:
+        """
+        Builds the URL of a report on this server, so the server can be passed to a retriever as its url_builder.
+        """
+
+        if self.base_url is None:
+            logger.error(f"{self.__class__.__name__}: The server has not been started.")
+            return None
+        return (f"{self.base_url}{report_name}/V1?SettlementDate={settlement_date}"
+                f"&Period={period}&ServiceType={service_type}")
+
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        Returns the server's request counters.
+        """
+
+        return {'request_count': self.request_count,
+                'error_count': self.error_count,
+                'throttled_count': self.throttled_count,
+                'not_modified_count': self.not_modified_count,
+                'bytes_sent': self.bytes_sent}
+
+
+    async def handle(self,
+                     request: web.Request) -> web.Response:
+        """
+        Answers a report request after the configured latency, injecting errors and rate limiting.
+        """
+
+        self.request_count += 1
+        delay = self.latency + self._random.uniform(0.0, self.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            self.throttled_count += 1
+            return web.Response(status=429, headers={'Retry-After': f"{self.retry_after:g}"})
+        if roll < self.throttle_rate + self.error_rate:
+            self.error_count += 1
+            return web.Response(status=503)
+
+        report_name = request.match_info['report_name']
+        if report_name not in self.REPORT_FIELDS:
+            return web.Response(status=404)
+
+        try:
+            settlement_date = date.fromisoformat(request.query.get('SettlementDate', ''))
+        except ValueError:
+            return web.Response(status=400)
+
+        period = request.query.get('Period', '*')
+        periods = range(1, self.get_period_count(settlement_date) + 1) if period == '*' else [int(period)]
+        if period == '*' and self.truncate_day_after is not None:
+            periods = periods[:self.truncate_day_after]
+        items = [self.build_item(report_name=report_name, settlement_date=settlement_date, period=period)
+                 for period in periods if period <= self.get_period_count(settlement_date)
+                 and self.is_published(settlement_date=settlement_date, period=period)]
+
+        if request.query.get('ServiceType', 'xml').lower() == 'csv':
+            body, content_type = self.render_csv(report_name=report_name, items=items), 'text/csv'
+        else:
+            body, content_type = self.render_xml(report_name=report_name, items=items), 'text/xml'
+
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified_count += 1
+            return web.Response(status=304, headers={'ETag': etag})
+
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type=content_type, headers={'ETag': etag})
+
+
+    def get_period_count(self,
+                         settlement_date: date) -> int:
+        """
+        Returns the number of settlement periods of a date: 48, or 46 and 50 on clock-change days.
+        """
+
+        start = datetime(settlement_date.year, settlement_date.month, settlement_date.day, tzinfo=self.LOCAL_TIMEZONE)
+        end = datetime.combine(settlement_date + timedelta(days=1), datetime.min.time(), tzinfo=self.LOCAL_TIMEZONE)
+        return int((end.astimezone(timezone.utc) - start.astimezone(timezone.utc)) / timedelta(minutes=30))
+
+
+    def is_published(self,
+                     settlement_date: date,
+                     period: int) -> bool:
+        """
+        Returns whether a period is not withheld and has ended by published_until, counting periods from local midnight.
+        """
+
+        if period in self.withheld_periods:
+            return False
+        if self.published_until is None:
+            return True
+        start = datetime(settlement_date.year, settlement_date.month, settlement_date.day, tzinfo=self.LOCAL_TIMEZONE)
+        return start.astimezone(timezone.utc) + timedelta(minutes=30) * period <= self.published_until
+
+
+    def build_item(self,
+                   report_name: str,
+                   settlement_date: date,
+                   period: int) -> dict[str, str]:
+        """
+        Builds one item with values derived from its report, date and period, so every response is reproducible.
+        """
+
+        digest = hashlib.blake2b(f"{report_name}{settlement_date}{period}".encode(), digest_size=8).digest()
+        value = (int.from_bytes(digest, 'big') / 2 ** 64 - 0.3) * (200.0 if report_name == 'B1770' else 1000.0)
+
+        item = dict(self.REPORT_FIELDS[report_name])
+        item.update(settlementDate=settlement_date.isoformat(),
+                    settlementPeriod=str(period),
+                    documentID=f"ELX-EMFIP-{settlement_date:%Y%m%d}{period:02d}")
+        if report_name == 'B1770':
+            item['imbalancePriceAmountGBP'] = f"{value:.5g}"
+        else:
+            item['imbalanceQuantityMAW'] = f"{abs(value):.5g}"
+            item['imbalanceQuantityDirection'] = 'SURPLUS' if value >= 0 else 'DEFICIT'
+        return item
+
+
+    def render_xml(self,
+                   report_name: str,
+                   items: list[dict[str, str]]) -> bytes:
+        """
+        Renders items as a BMRS XML response.
+        """
+
+        rendered_items = ''.join('<item>' + ''.join(f"<{field}>{escape(value)}</{field}>"
+                                                    for field, value in item.items()) + '</item>'
+                                 for item in items)
+        return ('<?xml version="1.0" encoding="UTF-8"?><response><responseMetadata><httpCode>200</httpCode>'
+                '<errorType>Ok</errorType><description>Success</description></responseMetadata>'
+                f"<responseBody><dataItem>{report_name}</dataItem><responseList>{rendered_items}"
+                '</responseList></responseBody></response>').encode()
+
+
+    def render_csv(self,
+                   report_name: str,
+                   items: list[dict[str, str]]) -> bytes:
+        """
+        Renders items as a BMRS CSV response, with the HDR and FTR envelope and a '*' marked header.
+        """
+
+        fields = list(self.REPORT_FIELDS[report_name])
+        header = ','.join(self._to_title(field) for field in fields)
+        rows = '\n'.join(','.join(item[field] for field in fields) for item in items)
+        return f"HDR,{self.CSV_TITLES[report_name]}\n*{header}\n{rows}\nFTR,{len(items)}\n".encode()
+
+
+    def _to_title(self,
+                  field: str) -> str:
+        """
+        Converts a camelCase field name into a CSV column title, e.g. 'settlementDate' into 'Settlement Date'.
+        """
+
+        title = ''.join(f" {character}" if character.isupper() else character for character in field)
+        return title[0].upper() + title[1:]
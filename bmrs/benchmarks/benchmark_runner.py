@@ -0,0 +1,244 @@
+import json
+import math
+import time
+import asyncio
+import tracemalloc
+import pandas as pd
+
+from pathlib import Path
+from dataclasses import asdict
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional, Union
+
+from bmrs.benchmarks import logger
+from bmrs.objects.object_benchmark_result import ObjectBenchmarkResult
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_cpu_offload import ServiceCpuOffload
+from bmrs.services.service_rate_limiter import ServiceRateLimiter
+from bmrs.services.service_bmrs_backfill import ServiceBmrsBackfill
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_bmrs_dataframe_analyser import ServiceBmrsDataframeAnalyser
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class BenchmarkRunner:
+    """
+    Runs retrieval, conversion and analysis scenarios of increasing size against a local
+    BenchmarkBmrsStandInServer and records their throughput, latency and memory.
+
+    Each scenario retrieves every report over its number of days with ServiceBmrsBackfill,
+    converts each day with ConverterDictToDataFrame as it completes, and then analyses every
+    report with ServiceBmrsDataframeAnalyser. With cpu_workers set, parsing and conversion run in a
+    ServiceCpuOffload process pool instead of on the event loop. Results are appended to a JSON lines
+    file so that runs can be compared over time.
+    """
+
+    SCENARIOS = {'day': 1, 'month': 30, 'year': 365}
+    DEFAULT_OUTPUT_PATH = Path(__file__).resolve().parent.parent.parent / 'bmrs_benchmarks.jsonl'
+
+
+    def __init__(self,
+                 reports: Iterable[str] = ('B1770', 'B1780'),
+                 service_type: str = 'xml',
+                 max_concurrent_tasks: int = 24,
+                 max_rate: Optional[float] = None,
+                 server_options: Optional[dict[str, Any]] = None,
+                 trace_memory: bool = True,
+                 cpu_workers: int = 0,
+                 output_path: Union[str, Path, None] = None) -> None:
+        self.reports = list(reports)
+        # Response format requested from the server, either 'xml' or 'csv'.
+        self.service_type = service_type
+        # Concurrency limit of the retriever under test.
+        self.max_concurrent_tasks = max_concurrent_tasks
+        # Requests per second allowed by the retriever's rate limiter. Defaults to the limiter's own maximum.
+        self.max_rate = max_rate
+        # Keyword arguments of the stand-in server, e.g. {'latency': 0.05, 'error_rate': 0.01}.
+        self.server_options = server_options if server_options else {}
+        # Tracing allocations measures peak memory at the cost of slower runs.
+        self.trace_memory = trace_memory
+        # Worker processes parsing and converting responses; 0 keeps that work on the event loop.
+        self.cpu_workers = cpu_workers
+        self.output_path = Path(output_path if output_path else self.DEFAULT_OUTPUT_PATH)
+
+        self.converter_dict_to_dataframe = ConverterDictToDataFrame()
+        self.service_bmrs_analyser = ServiceBmrsDataframeAnalyser()
+
+
+    def run(self,
+            scenarios: Iterable[str] = ('day', 'month', 'year'),
+            start_date: str = '2023-01-01') -> list[ObjectBenchmarkResult]:
+        """
+        Runs the named scenarios in order and appends their results to output_path.
+
+        Args:
+            scenarios: Names of the scenarios to run, any of 'day', 'month' and 'year'.
+            start_date: The first settlement date of every scenario in the format 'YYYY-MM-DD'.
+        """
+
+        results = []
+        for scenario in scenarios:
+            if scenario not in self.SCENARIOS:
+                logger.error(f"{self.__class__.__name__}: Unknown scenario '{scenario}'. "
+                             f"Allowed values are {list(self.SCENARIOS)}.")
+                continue
+            result = asyncio.run(self.run_scenario(scenario=scenario,
+                                                   start_date=start_date,
+                                                   days=self.SCENARIOS[scenario]))
+            self.log_result(result=result)
+            results.append(result)
+
+        self.write(results=results)
+        return results
+
+
+    async def run_scenario(self,
+                           scenario: str,
+                           start_date: str,
+                           days: int) -> ObjectBenchmarkResult:
+        """
+        Retrieves, converts and analyses every report over the given number of days against a fresh server.
+        """
+
+        end_date = (date.fromisoformat(start_date) + timedelta(days=days - 1)).isoformat()
+        metrics = ServiceMetrics()
+        report_dataframes = {report_name: [] for report_name in self.reports}
+        convert_seconds = 0.0
+        periods = 0
+
+        if self.trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+
+        cpu_offload = ServiceCpuOffload(max_workers=self.cpu_workers, metrics=metrics) if self.cpu_workers else None
+
+        async def convert_day(report_name: str, report_output: Any) -> None:
+            nonlocal convert_seconds, periods
+            convert_start = time.perf_counter()
+            if cpu_offload is not None:
+                report_dataframe = await cpu_offload.run(self.converter_dict_to_dataframe.convert,
+                                                         report_name=report_name,
+                                                         report_output=report_output)
+            else:
+                report_dataframe = self.converter_dict_to_dataframe.convert(report_name=report_name,
+                                                                            report_output=report_output)
+            convert_seconds += time.perf_counter() - convert_start
+            if report_dataframe is not None:
+                report_dataframes[report_name].append(report_dataframe)
+                periods += len(report_dataframe)
+
+        with BenchmarkBmrsStandInServer(**self.server_options) as server:
+            retriever = self.build_retriever(url_builder=server, metrics=metrics, cpu_offload=cpu_offload)
+            service_bmrs_backfill = ServiceBmrsBackfill(data_retriever=retriever)
+
+            # Days are converted as they complete, concurrently with the retrieval of the remaining days.
+            conversions = []
+            try:
+                async for report_name, _, report_output in service_bmrs_backfill.backfill(reports=self.reports,
+                                                                                          start_date=start_date,
+                                                                                          end_date=end_date):
+                    if report_output is not None and len(report_output) > 0:
+                        conversions.append(asyncio.ensure_future(convert_day(report_name, report_output)))
+                await asyncio.gather(*conversions)
+            finally:
+                if cpu_offload is not None:
+                    cpu_offload.close()
+
+            server_snapshot = server.snapshot()
+
+        analyse_start = time.perf_counter()
+        for report_name, dataframes in report_dataframes.items():
+            if dataframes:
+                self.service_bmrs_analyser.calculate_imbalances(report_name=report_name,
+                                                                report_ts_dataframe=pd.concat(dataframes).sort_index())
+        analyse_seconds = time.perf_counter() - analyse_start
+
+        elapsed_seconds = time.perf_counter() - start_time
+        peak_memory = 0
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        snapshot = metrics.snapshot()
+        request_summaries = [summary for summary in snapshot['summaries'] if summary['name'] == 'request_seconds']
+        request_quantiles = {quantile: max((summary[quantile] for summary in request_summaries), default=math.nan)
+                             for quantile in ('p50', 'p95', 'p99')}
+
+        return ObjectBenchmarkResult(scenario=scenario,
+                                     days=days,
+                                     service_type=self.service_type,
+                                     max_concurrent_tasks=self.max_concurrent_tasks,
+                                     requests=server_snapshot['request_count'],
+                                     periods=periods,
+                                     bytes_received=int(self._sum_counter(snapshot, 'response_bytes_total')),
+                                     elapsed_seconds=elapsed_seconds,
+                                     convert_seconds=convert_seconds,
+                                     analyse_seconds=analyse_seconds,
+                                     periods_per_second=periods / elapsed_seconds,
+                                     requests_per_second=server_snapshot['request_count'] / elapsed_seconds,
+                                     request_p50_seconds=request_quantiles['p50'],
+                                     request_p95_seconds=request_quantiles['p95'],
+                                     request_p99_seconds=request_quantiles['p99'],
+                                     parse_seconds=sum(summary['sum'] for summary in snapshot['summaries']
+                                                       if summary['name'] == 'parse_seconds'),
+                                     retries=int(self._sum_counter(snapshot, 'retries_total')),
+                                     throttled=int(self._sum_counter(snapshot, 'throttled_total')),
+                                     peak_memory_mb=peak_memory / 2 ** 20,
+                                     cpu_workers=self.cpu_workers)
+
+
+    def build_retriever(self,
+                        url_builder: BenchmarkBmrsStandInServer,
+                        metrics: ServiceMetrics,
+                        cpu_offload: Optional[ServiceCpuOffload] = None) -> ServiceBmrsDataRetriever:
+        """
+        Builds an uncached retriever requesting from the stand-in server.
+        """
+
+        rate_limiter = ServiceRateLimiter(max_rate=self.max_rate) if self.max_rate else None
+        retriever = ServiceBmrsDataRetriever(timeout=30,
+                                             max_tries=3,
+                                             max_concurrent_tasks=self.max_concurrent_tasks,
+                                             rate_limit_sleep_time=30,
+                                             metrics=metrics,
+                                             url_builder=url_builder,
+                                             rate_limiter=rate_limiter,
+                                             cpu_offload=cpu_offload,
+                                             service_type=self.service_type)
+        # The environment variables take precedence over the arguments above, so the limit under test is set afterwards.
+        retriever.max_concurrent_tasks = self.max_concurrent_tasks
+        return retriever
+
+
+    def log_result(self,
+                   result: ObjectBenchmarkResult) -> None:
+        logger.info(f"{self.__class__.__name__}: {result.scenario} ({result.days} days, {result.service_type}, "
+                    f"concurrency {result.max_concurrent_tasks}, {result.cpu_workers} cpu workers) - {result.periods} periods from {result.requests} "
+                    f"requests in {result.elapsed_seconds:.2f}s, {result.periods_per_second:.0f} periods/s, "
+                    f"request p50/p95/p99 {result.request_p50_seconds * 1000:.1f}/{result.request_p95_seconds * 1000:.1f}/"
+                    f"{result.request_p99_seconds * 1000:.1f} ms, convert {result.convert_seconds:.2f}s, "
+                    f"analyse {result.analyse_seconds:.2f}s, peak memory {result.peak_memory_mb:.1f} MiB")
+
+
+    def write(self,
+              results: list[ObjectBenchmarkResult]) -> None:
+        """
+        Appends the results to output_path as JSON lines, each stamped with the time of the run.
+        """
+
+        if not results:
+            return
+
+        run_at = pd.Timestamp.now(tz='UTC').isoformat()
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, 'a') as output_file:
+            for result in results:
+                output_file.write(json.dumps({'run_at': run_at, **asdict(result)}) + '\n')
+        logger.info(f"{self.__class__.__name__}: Results appended to {self.output_path}")
+
+
+    def _sum_counter(self,
+                     snapshot: dict[str, list[dict]],
+                     name: str) -> float:
+        return sum(counter['value'] for counter in snapshot['counters'] if counter['name'] == name)
@@ -0,0 +1,162 @@
+import io
+import re
+import numpy as np
+import pandas as pd
+
+from typing import Optional
+
+from bmrs.converters import logger
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+
+
+class ConverterCsvToDataFrame:
+    """
+    A converter class to parse a BMRS CSV response straight into a typed pandas DataFrame.
+
+    BMRS CSV responses start with a 'HDR' line, carry a '*' prefixed header row with
+    human readable column names and end with a 'FTR' line. Columns are matched to the
+    camelCase field names used by the XML responses after normalisation, so the
+    resulting DataFrame has the same columns as the XML pipeline.
+    """
+
+    SETTLEMENT_FIELDS = ('settlementDate', 'settlementPeriod')
+
+
+    def __init__(self,
+                 registry: Optional[RegistryReports] = None) -> None:
+        self.logger = logger
+        # Value columns and dtypes of every report.
+        self.registry = registry if registry else get_default_registry()
+        # CSV header to field renames, matched once per report and header layout.
+        self._renames: dict[tuple[str, tuple[str, ...]], Optional[dict[str, str]]] = {}
+
+
+    def convert(self,
+                report_name: str,
+                content: bytes) -> Optional[pd.DataFrame]:
+        """
+        Parses a CSV response body in bulk with the pandas C engine.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            content (bytes): The raw CSV response body.
+
+        Returns:
+            A DataFrame with a datetime64 'settlementDate', an integer 'settlementPeriod' and the report's
+            value columns in their registered dtypes. An empty DataFrame is returned when the response has no rows.
+        """
+
+        try:
+            definition = self.registry.get(report_name=report_name)
+            if definition is None:
+                return None
+
+            wanted_fields = (*self.SETTLEMENT_FIELDS, *definition.value_columns)
+            body = self._strip_envelope(content=content)
+            if not body.strip():
+                return pd.DataFrame(columns=list(wanted_fields))
+
+            # Map each wanted field to the CSV header it corresponds to.
+            renames = self._get_renames(report_name=report_name,
+                                        wanted_fields=wanted_fields,
+                                        header_line=body.split(b'\n', 1)[0])
+            if renames is None:
+                return None
+
+            df = pd.read_csv(io.BytesIO(body),
+                             engine='c',
+                             usecols=list(renames),
+                             dtype={csv_column: definition.get_dtype(field) for csv_column, field in renames.items()
+                                    if field in definition.value_columns})
+            df = df.rename(columns=renames)[list(wanted_fields)]
+
+            df['settlementDate'] = pd.to_datetime(df['settlementDate'], format='%Y-%m-%d')
+            df['settlementPeriod'] = df['settlementPeriod'].astype('int64')
+            return df
+
+        except Exception as e:
+            self.logger.error(f"{self.__class__.__name__}: Error in conversion: {e}")
+            return None
+
+
+    def convert_columns(self,
+                        report_name: str,
+                        content: bytes) -> Optional[dict[str, np.ndarray]]:
+        """
+        Parses a CSV response body into the typed columns of convert, as arrays keyed by field name,
+        which are compact to pickle back from a worker process.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            content (bytes): The raw CSV response body.
+        """
+
+        df = self.convert(report_name=report_name, content=content)
+        return None if df is None else {column: df[column].to_numpy() for column in df.columns}
+
+
+    def _get_renames(self,
+                     report_name: str,
+                     wanted_fields: tuple[str, ...],
+                     header_line: bytes) -> Optional[dict[str, str]]:
+        """
+        Returns the CSV column of each wanted field, keyed by the CSV column. The matching is
+        cached per report and header layout, since every response of a report shares its header.
+        """
+
+        key = (report_name, tuple(wanted_fields), header_line.strip())
+        if key not in self._renames:
+            header = pd.read_csv(io.BytesIO(header_line), nrows=0).columns
+            renames = {}
+            for field in wanted_fields:
+                csv_column = self._match_column(field=field, columns=header)
+                if csv_column is None:
+                    self.logger.error(f"{self.__class__.__name__}: Column {field} not found in {report_name} CSV response")
+                    renames = None
+                    break
+                renames[csv_column] = field
+            self._renames[key] = renames
+        return self._renames[key]
+
+
+    def _strip_envelope(self,
+                        content: bytes) -> bytes:
+        """
+        Removes the 'HDR' and 'FTR' lines and the '*' header marker from a CSV response.
+        """
+
+        body = content.strip()
+        if body.startswith(b'HDR'):
+            newline = body.find(b'\n')
+            body = body[newline + 1:] if newline != -1 else b''
+
+        footer = body.rfind(b'\nFTR')
+        if footer != -1:
+            body = body[:footer]
+        elif body.startswith(b'FTR'):
+            body = b''
+
+        return body[1:] if body.startswith(b'*') else body
+
+
+    def _match_column(self,
+                      field: str,
+                      columns: pd.Index) -> Optional[str]:
+        """
+        Finds the CSV column for a camelCase field name, comparing lower-cased alphanumerics only.
+        A CSV column whose normalised name is a prefix of the field (e.g. a missing unit suffix) also matches.
+        """
+
+        normalised_field = self._normalise(field)
+        normalised_columns = {self._normalise(str(column)): column for column in columns}
+
+        if normalised_field in normalised_columns:
+            return normalised_columns[normalised_field]
+
+        prefixes = [name for name in normalised_columns if name and normalised_field.startswith(name)]
+        return normalised_columns[max(prefixes, key=len)] if prefixes else None
+
+
+    def _normalise(self,
+                   name: str) -> str:
+        return re.sub(r'[^0-9a-z]', '', name.lower())
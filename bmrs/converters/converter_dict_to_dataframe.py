@@ -1,92 +1,163 @@
+import numpy as np
 import pandas as pd
 
+from typing import Any, Mapping, Optional, Sequence, Union
+
 from bmrs.converters import logger
-from bmrs.decorators.decorator_report_column_headers_required import \
-                                        report_column_headers_required
+from bmrs.objects.object_period_records import ObjectPeriodRecords
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar, get_default_calendar
 
 
 class ConverterDictToDataFrame:
     """
     A converter class to transform a dictionary to a pandas DataFrame object.
     """
-    
-    
-    @report_column_headers_required
-    def __init__(self, 
-                 b1770_column: str, 
-                 b1780_column: str) -> None:
-        # Initializing the columns for the reports B1770 and B1780
+
+
+    def __init__(self,
+                 registry: Optional[RegistryReports] = None,
+                 calendar: Optional[ServiceSettlementCalendar] = None) -> None:
         self.logger = logger
-        self.b1770_column = b1770_column
-        self.b1780_column = b1780_column
-        
-    def convert(self, 
-                report_name: str, 
-                report_output: list[dict]) -> pd.DataFrame:
+        # Value columns, dtypes and granularity of every report.
+        self.registry = registry if registry else get_default_registry()
+        # Maps settlement periods to times. The default calendar is looked up on use, so converters
+        # pickled into worker processes do not carry its precomputed days.
+        self.calendar = calendar
+
+    def convert(self,
+                report_name: str,
+                report_output: Union[list[dict], pd.DataFrame, ObjectPeriodRecords],
+                value_columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
         """
         Converts the given report_output dictionary to a DataFrame and preprocesses it.
 
         Args:
-            report_name (str): Name of the report, either 'B1770' or 'B1780'.
-            report_output (list[dict]): List of dictionaries containing the report data.
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            report_output (list[dict] | pd.DataFrame | ObjectPeriodRecords): List of dictionaries containing the
+                report data, or a DataFrame already parsed from a CSV response or compact records, in which case
+                the dict-per-row stage is skipped.
+            value_columns (Sequence[str]): The value columns to keep. Defaults to the report's configured column.
+        """
+
+        try:
+            value_columns = self.get_value_columns(report_name=report_name, value_columns=value_columns)
+            if value_columns is None:
+                return None
+
+            # Compact records and typed DataFrames from CSV responses are already columnar
+            if isinstance(report_output, ObjectPeriodRecords):
+                return self.convert_columns(report_name=report_name,
+                                            columns=report_output.to_columns(),
+                                            value_columns=value_columns)
+            if isinstance(report_output, pd.DataFrame):
+                return self.convert_columns(report_name=report_name,
+                                            columns=report_output,
+                                            value_columns=value_columns)
+
+            # Transpose the list of dictionaries into one list per required field in a single pass
+            fields = ('settlementDate', 'settlementPeriod', *value_columns)
+            columns = {field: [item.get(field) for item in report_output] for field in fields}
+
+            return self.convert_columns(report_name=report_name,
+                                        columns=columns,
+                                        value_columns=value_columns)
+
+        except Exception as e:
+            self.logger.error(f"{self.__class__.__name__}: Error in conversion: {e}")
+            return None
+
+
+    def convert_columns(self,
+                        report_name: str,
+                        columns: Mapping[str, Any],
+                        value_columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Converts columnar report data, covering any number of days, into a half-hourly time series
+        indexed by the Europe/London start of each period, using the settlement calendar and dtype coercion.
+        Periods start from local midnight, so clock-change days hold 46 or 50 periods. Missing periods and
+        periods without a value are left out rather than filled in, so ServiceBmrsGapIndex can find and refetch them.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            columns (Mapping[str, array-like]): Arrays keyed by field name holding 'settlementDate',
+                'settlementPeriod' and the value columns, e.g. a dict of lists or a DataFrame.
+            value_columns (Sequence[str]): The value columns to keep. Defaults to the report's configured column.
         """
-        
+
         try:
-            # Determine the column name based on the provided report name
-            if report_name == 'B1770':
-                column_name = self.b1770_column
-            elif report_name == 'B1780':
-                column_name = self.b1780_column
-            else:
-                logger.error(f"{self.__class__.__name__}: Invalid report name provided: {report_name}")
+            value_columns = self.get_value_columns(report_name=report_name, value_columns=value_columns)
+            if value_columns is None:
                 return None
 
-            # Convert the report output list of dictionaries to a pandas DataFrame
-            df = pd.DataFrame(report_output)
-            df['settlementDate'] = pd.to_datetime(df['settlementDate'])
-            df['settlementPeriod'] = df['settlementPeriod'].astype(int)
-
-            # Calculate the actual datetime for each entry
-            df['datetime'] = df['settlementDate'] + pd.to_timedelta((df['settlementPeriod'] - 1) * 30, unit='m')
-
-            # Convert the desired column to float type
-            df[column_name] = df[column_name].astype(float)
-
-            # Keep only the necessary columns and set datetime as the index
-            output_df = df[['datetime', column_name]].set_index('datetime')
-
-            # Sort by datetime
-            output_df.sort_index(inplace=True)
-
-            # Generate a complete range of datetimes at 30-minute intervals and reindex
-            full_range = pd.date_range(start=output_df.index.min(),
-                                       end=output_df.index.max(),
-                                       freq='30T')
-            
-            missing_datetimes = full_range.difference(output_df.index)
-
-            # Reindex only if there are missing datetime values
-            if not missing_datetimes.empty:
-                output_df = output_df.reindex(full_range, method='bfill')
-
-            # Ensure all columns are numeric, convert if necessary
-            for col in output_df.columns:
-                output_df[col] = pd.to_numeric(output_df[col], errors='coerce')
-
-            # Fill NaN values with forward and backward fill
-            if output_df.isna().any().any():
-                output_df.fillna(method='bfill', inplace=True)
-            if output_df.isna().any().any():
-                output_df.fillna(method='ffill', inplace=True)
-                
-            # Validation check for NaN values
-            if output_df.isna().any().any():
-                self.logger.error(f"{self.__class__.__name__}: NaN values present after preprocessing")
+            definition = self.registry.get(report_name=report_name) if report_name in self.registry else None
+            granularity = definition.granularity if definition is not None else '30min'
+
+            # Parse each distinct settlement date once and look every timestamp up in the calendar in one pass
+            calendar = self.calendar if self.calendar else get_default_calendar()
+            settlement_dates = np.asarray(pd.to_datetime(columns['settlementDate'], cache=True), dtype='datetime64[D]')
+            settlement_periods = np.asarray(columns['settlementPeriod']).astype(np.int64)
+
+            # Dropping periods the settlement date does not have, e.g. period 49 of a 48 period day
+            valid = (settlement_periods >= 1) & (settlement_periods <= calendar.get_period_counts(
+                                                                        settlement_dates=settlement_dates,
+                                                                        granularity=granularity))
+            if not valid.all():
+                self.logger.warning(f"{self.__class__.__name__}: {int((~valid).sum())} items of {report_name} "
+                                    f"with periods outside their settlement date dropped")
+            timestamps = calendar.to_timestamps(granularity=granularity,
+                                                settlement_dates=settlement_dates[valid],
+                                                settlement_periods=settlement_periods[valid])
+
+            values = {column: self._to_float(columns[column])[valid].astype(definition.get_dtype(column)
+                                                                            if definition is not None else np.float64,
+                                                                            copy=False)
+                      for column in value_columns}
+
+            # Index by datetime, sorted, keeping the last value of any duplicated period
+            output_df = pd.DataFrame(values, index=timestamps)
+            output_df = output_df.iloc[np.argsort(output_df.index.values, kind='stable')]
+            output_df = output_df[~output_df.index.duplicated(keep='last')]
+
+            if output_df.empty:
+                self.logger.error(f"{self.__class__.__name__}: No data to convert for {report_name}")
                 return None
 
+            # Periods without a value are left out as gaps rather than filled from their neighbours
+            output_df = output_df.dropna()
+
             self.logger.info(f"{self.__class__.__name__}: Time Series For {report_name} generated of length {len(output_df)}")
             return output_df
 
         except Exception as e:
             self.logger.error(f"{self.__class__.__name__}: Error in conversion: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+    def get_value_columns(self,
+                          report_name: str,
+                          value_columns: Optional[Sequence[str]] = None) -> Optional[list[str]]:
+        """
+        Returns the value columns to convert, defaulting to the registered columns of the report.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            value_columns (Sequence[str]): Columns explicitly requested by the caller.
+        """
+
+        if value_columns:
+            return list(value_columns)
+
+        return self.registry.get_value_columns(report_name=report_name)
+
+
+    def _to_float(self,
+                  column: Any) -> np.ndarray:
+        """
+        Converts a column to float64, coercing values that are not numeric to NaN.
+        """
+
+        try:
+            return np.asarray(column, dtype=np.float64)
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(column), errors='coerce').to_numpy(dtype=np.float64)
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from typing import Optional
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from bmrs.converters import logger
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+
+
+class XmlItemStreamParser:
+    """
+    An incremental parser for a single BMRS XML response. Chunks are fed as they arrive
+    and each completed responseList item is reduced to the requested fields and dropped
+    from the tree, so the full document is never held in memory.
+
+    An empty or invalid body, e.g. for a period that is not published yet, holds no items.
+    """
+
+
+    def __init__(self,
+                 fields: Optional[frozenset[str]] = None) -> None:
+        # Fields kept for each item; every leaf field is kept when None.
+        self.fields = fields
+        self.items: list[dict[str, Optional[str]]] = []
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._path: list[str] = []
+        self._response_list = None
+        # The first error of a body that is not valid XML; the rest of the body is ignored once set.
+        self._error: Optional[ParseError] = None
+
+
+    def feed(self,
+             chunk: bytes) -> None:
+        """
+        Feeds the next chunk of the response body and extracts any items it completes.
+
+        Args:
+            chunk: The next chunk of raw response bytes.
+        """
+
+        if self._error is not None:
+            return
+        try:
+            self._parser.feed(chunk)
+            self._read_events()
+        except ParseError as e:
+            self._error = e
+
+
+    def close(self) -> list[dict[str, Optional[str]]]:
+        """
+        Finishes parsing and returns the extracted items in document order, or no items if the body
+        was empty or not valid XML.
+        """
+
+        if self._error is None:
+            try:
+                self._parser.close()
+                self._read_events()
+            except ParseError as e:
+                self._error = e
+
+        if self._error is not None:
+            logger.warning(f"{self.__class__.__name__}: Response body is empty or not valid XML, "
+                           f"read as no data - {self._error}")
+            self.items = []
+        return self.items
+
+
+    def _read_events(self) -> None:
+        """
+        Consumes the pending parser events, keeping only the fields of completed items.
+        """
+
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                self._path.append(element.tag)
+                if element.tag == 'responseList' and self._path[-2:-1] == ['responseBody']:
+                    self._response_list = element
+                continue
+
+            self._path.pop()
+            # Items outside responseBody/responseList, e.g. in error bodies, are not report data.
+            if element.tag == 'item' and self._response_list is not None \
+                    and self._path[-2:] == ['responseBody', 'responseList']:
+                self.items.append({child.tag: (child.text or '').strip() or None for child in element
+                                   if self.fields is None or child.tag in self.fields})
+                # Discarding the processed item so the tree does not grow with the response.
+                self._response_list.remove(element)
+
+
+class ConverterXmlStreamToDict:
+    """
+    A converter class to stream a BMRS XML response into dictionaries holding only the
+    settlement fields and the registered value columns of each report.
+    """
+
+    SETTLEMENT_FIELDS = ('settlementDate', 'settlementPeriod')
+
+
+    def __init__(self,
+                 registry: Optional[RegistryReports] = None) -> None:
+        self.logger = logger
+        # Value columns and dtypes of every report.
+        self.registry = registry if registry else get_default_registry()
+
+
+    def get_fields(self,
+                   report_name: str) -> Optional[frozenset[str]]:
+        """
+        Returns the fields kept for the given report, or None to keep every field of unknown reports.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        return self.registry.get_fields(report_name=report_name)
+
+
+    def create_parser(self,
+                      report_name: str) -> XmlItemStreamParser:
+        """
+        Creates an incremental parser for one response of the given report.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        return XmlItemStreamParser(fields=self.get_fields(report_name=report_name))
+
+
+    def convert(self,
+                report_name: str,
+                content: bytes) -> Optional[list[dict[str, Optional[str]]]]:
+        """
+        Parses a complete response body in one call.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            content (bytes): The raw XML response body.
+        """
+
+        try:
+            parser = self.create_parser(report_name=report_name)
+            parser.feed(content)
+            return parser.close()
+
+        except Exception as e:
+            self.logger.error(f"{self.__class__.__name__}: Error in conversion: {e}")
+            return None
+
+
+    def convert_columns(self,
+                        report_name: str,
+                        content: bytes) -> Optional[dict[str, np.ndarray]]:
+        """
+        Parses a complete response body into typed columns, matching the DataFrames of ConverterCsvToDataFrame:
+        a datetime64 'settlementDate', an integer 'settlementPeriod' and value columns in their registered dtypes.
+        Arrays are far cheaper than a dictionary per item to pickle back from a worker process.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            content (bytes): The raw XML response body.
+
+        Returns:
+            The columns keyed by field name. Items without a valid settlementPeriod are dropped.
+            Fields of unknown reports are kept as object arrays. None if the body could not be parsed.
+        """
+
+        items = self.convert(report_name=report_name, content=content)
+        if items is None:
+            return None
+
+        try:
+            definition = self.registry.get(report_name=report_name) if report_name in self.registry else None
+            value_fields = list(definition.value_columns) if definition is not None else \
+                                [field for field in dict.fromkeys(field for item in items for field in item)
+                                 if field not in self.SETTLEMENT_FIELDS]
+
+            settlement_periods = pd.to_numeric(pd.Series([item.get('settlementPeriod') for item in items],
+                                                         dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+            valid = ~np.isnan(settlement_periods)
+            if not valid.all():
+                self.logger.warning(f"{self.__class__.__name__}: Skipping {int((~valid).sum())} {report_name} "
+                                    "items without a valid settlementPeriod.")
+
+            columns = {'settlementDate': pd.to_datetime(pd.Series([item.get('settlementDate') for item in items],
+                                                                  dtype=object)[valid],
+                                                        format='%Y-%m-%d').to_numpy(),
+                       'settlementPeriod': settlement_periods[valid].astype(np.int64)}
+            for field in value_fields:
+                values = pd.Series([item.get(field) for item in items], dtype=object)[valid]
+                columns[field] = values.to_numpy() if definition is None else \
+                                    pd.to_numeric(values, errors='coerce').to_numpy(dtype=definition.get_dtype(field))
+            return columns
+
+        except Exception as e:
+            self.logger.error(f"{self.__class__.__name__}: Error in conversion: {e}")
+            return None
@@ -0,0 +1,20 @@
+import logging
+
+# create logger
+logger = logging.getLogger('bmrs.objects')
+logger.setLevel(logging.DEBUG)
+
+logger.propagate = 0
+
+# create console handler and set level to debug
+ch = logging.StreamHandler()
+ch.setLevel(logging.DEBUG)
+
+# create formatter
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# add formatter to ch
+ch.setFormatter(formatter)
+
+# add ch to logger
+logger.addHandler(ch)
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from typing import Any, Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ObjectAggregation:
+    """
+    A daily metric of a report, declared in its ObjectReportDefinition and applied by the analysers
+    to every settlement date they fold.
+
+    Attributes:
+    - function (Callable[[pd.Series], Any]): Computes the metric from the values of one settlement date,
+      indexed by the start of each period.
+    - message (str): The message the metric is logged with, formatted with {value}.
+    """
+
+    function: Callable[[pd.Series], Any]
+    message: str
+
+
+    def apply(self,
+              values: pd.Series) -> Any:
+        """
+        Returns the metric of one settlement date's values.
+        """
+        return self.function(values)
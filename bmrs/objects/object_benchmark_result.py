@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ObjectBenchmarkResult:
+    """
+    Throughput, latency and memory measurements of one benchmark scenario.
+
+    Attributes:
+    - scenario (str): Name of the scenario, e.g. 'day', 'month' or 'year'.
+    - days (int): Number of settlement dates retrieved per report.
+    - service_type (str): Response format requested, either 'xml' or 'csv'.
+    - max_concurrent_tasks (int): Concurrency limit of the retriever.
+    - requests (int): HTTP requests answered by the stand-in server, including errors and 429s.
+    - periods (int): Settlement periods converted across every report.
+    - bytes_received (int): Response bytes downloaded.
+    - elapsed_seconds (float): Wall-clock time of the whole scenario.
+    - convert_seconds (float): Time spent converting days into time series.
+    - analyse_seconds (float): Time spent calculating the imbalance metrics.
+    - periods_per_second (float): Periods converted per second of elapsed time.
+    - requests_per_second (float): Requests answered per second of elapsed time.
+    - request_p50_seconds (float): Median request latency, excluding parse time.
+    - request_p95_seconds (float): 95th percentile request latency.
+    - request_p99_seconds (float): 99th percentile request latency.
+    - parse_seconds (float): Total time spent parsing response bodies.
+    - retries (int): Attempts retried after an error.
+    - throttled (int): Responses rate limited with a 429.
+    - peak_memory_mb (float): Peak memory allocated by Python during the scenario, in MiB.
+    - cpu_workers (int): Worker processes parsing and converting responses, or 0 when done on the event loop.
+    """
+
+    scenario: str
+    days: int
+    service_type: str
+    max_concurrent_tasks: int
+    requests: int
+    periods: int
+    bytes_received: int
+    elapsed_seconds: float
+    convert_seconds: float
+    analyse_seconds: float
+    periods_per_second: float
+    requests_per_second: float
+    request_p50_seconds: float
+    request_p95_seconds: float
+    request_p99_seconds: float
+    parse_seconds: float
+    retries: int
+    throttled: int
+    peak_memory_mb: float
+    cpu_workers: int = 0
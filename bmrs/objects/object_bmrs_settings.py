@@ -0,0 +1,116 @@
+import os
+
+from typing import Mapping, Optional, Union
+from pathlib import Path
+from dataclasses import dataclass, fields
+
+from bmrs.objects import logger
+
+
+@dataclass(frozen=True)
+class ObjectBmrsSettings:
+    """
+    The BMRS API settings, loaded once and injected into ServiceBmrsBuildUrl instead of being
+    read from the environment on every URL built.
+
+    Attributes:
+    - host (str): Base BMRS API URL, e.g. 'https://api.bmreports.com/BMRS/'.
+    - version (str): API version, e.g. 'V1'.
+    - url_end_str (str): URL ending format string with {SettlementDate}, {Period} and {ServiceType} fields.
+    - api_scripting_key (str): API key for BMRS.
+    """
+
+    host: str = ''
+    version: str = ''
+    url_end_str: str = ''
+    api_scripting_key: str = ''
+
+
+    @classmethod
+    def load(cls,
+             environ: Optional[Mapping[str, str]] = None,
+             env_file: Union[str, Path, None] = '.env') -> 'ObjectBmrsSettings':
+        """
+        Loads the settings from the HOST, VERSION, URL_END_STR and API_SCRIPTING_KEY variables,
+        taken from the environment first, then the Django settings, then the .env file.
+
+        Args:
+            environ (Mapping[str, str]): The environment variables. Defaults to os.environ.
+            env_file (str or Path): The .env file of 'var=value' lines, or None to skip it.
+        """
+
+        environ = os.environ if environ is None else environ
+        dotenv = cls._read_env_file(env_file=env_file) if env_file else {}
+        values = {}
+
+        for setting in fields(cls):
+            var = setting.name.upper()
+            value = environ.get(var) or cls._get_django_setting(var=var) or dotenv.get(var)
+            if not value:
+                logger.error(f"Environment variable {var} is missing or empty")
+                continue
+            values[setting.name] = str(value)
+
+        return cls(**values)
+
+
+    @staticmethod
+    def _get_django_setting(var: str) -> Optional[str]:
+        """
+        Returns a variable of the Django settings, or None outside a configured Django project.
+        """
+
+        try:
+            from django.conf import settings
+        except ImportError:
+            return None
+        return getattr(settings, var, None) if settings.configured else None
+
+
+    @staticmethod
+    def _read_env_file(env_file: Union[str, Path]) -> dict[str, str]:
+        """
+        Reads the 'var=value' lines of a .env file, skipping comments and blank lines.
+        """
+
+        env_file = Path(env_file)
+        if not env_file.is_file():
+            return {}
+
+        dotenv = {}
+        for line in env_file.read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            var, value = line.removeprefix('export ').split('=', 1)
+            dotenv[var.strip()] = value.strip().strip('\'"')
+        return dotenv
+
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether every setting needed to build a URL is set.
+        """
+        return all((self.host, self.version, self.url_end_str, self.api_scripting_key))
+
+
+# The settings of the first complete load, shared by every URL builder that is not given any.
+_default_bmrs_settings: Optional[ObjectBmrsSettings] = None
+
+
+def get_default_bmrs_settings() -> ObjectBmrsSettings:
+    """
+    Returns the settings shared by every URL builder that is not given any, loaded on first use.
+    An incomplete load, e.g. one made before the environment or .env was populated, is not kept,
+    so the settings are loaded again on the next call.
+    """
+
+    global _default_bmrs_settings
+    if _default_bmrs_settings is not None:
+        return _default_bmrs_settings
+
+    settings = ObjectBmrsSettings.load()
+    if settings.is_complete:
+        _default_bmrs_settings = settings
+    return settings
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from typing import Any, Mapping
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ObjectImbalanceSummary:
+    """
+    Aggregated imbalance metrics of one report over one settlement date.
+
+    Attributes:
+    - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+    - settlement_date (pd.Timestamp): The settlement date the metrics cover.
+    - period_count (int): Number of settlement periods folded into the metrics.
+    - aggregates (Mapping[str, Any]): The value of every aggregation registered for the report, by name,
+      e.g. 'total' for B1770 or 'mean_unit_rate' and 'peak_hour' for B1780.
+    """
+
+    report_name: str
+    settlement_date: pd.Timestamp
+    period_count: int
+    aggregates: Mapping[str, Any] = field(default_factory=dict)
@@ -0,0 +1,33 @@
+from typing import Any
+from datetime import datetime
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ObjectLiveUpdate:
+    """
+    Newly published settlement periods of one report and date, pushed to the subscribers of ServiceBmrsLivePoller.
+
+    Attributes:
+    - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+    - settlement_date (str): The settlement date in the format 'YYYY-MM-DD'.
+    - periods (tuple[int, ...]): The newly published periods, in order.
+    - report_output (Any): The items of those periods, as returned by the retriever's merge_periods.
+    - received_at (datetime): When the periods were received, in UTC.
+    - lag_seconds (float): Seconds between the end of the latest period and its receipt.
+    """
+
+    report_name: str
+    settlement_date: str
+    periods: tuple[int, ...]
+    report_output: Any
+    received_at: datetime
+    lag_seconds: float
+
+
+    @property
+    def latest_period(self) -> int:
+        """
+        The latest period of the update.
+        """
+        return self.periods[-1]
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from typing import Any, Iterable, Mapping, Sequence, Union
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ObjectPeriodRecords:
+    """
+    Compact, column-oriented records of retrieved settlement periods, holding only the
+    settlement date, the period and the float value columns of a report in NumPy arrays.
+    A day of 48 periods takes around a kilobyte, instead of a dictionary of strings per period.
+
+    Attributes:
+    - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+    - settlement_dates (np.ndarray): The settlement date of each record as datetime64[D].
+    - settlement_periods (np.ndarray): The settlement period of each record as int16.
+    - values (dict[str, np.ndarray]): The float64 values of each record, keyed by column name.
+    """
+
+    report_name: str
+    settlement_dates: np.ndarray
+    settlement_periods: np.ndarray
+    values: dict[str, np.ndarray]
+
+
+    @classmethod
+    def from_items(cls,
+                   report_name: str,
+                   items: Iterable[Union[Mapping[str, Any], pd.DataFrame]],
+                   value_columns: Sequence[str]) -> 'ObjectPeriodRecords':
+        """
+        Builds records from retrieved items, i.e. item dictionaries and typed DataFrames, in one pass
+        per column. Values that are not numeric become NaN and items without a valid period are dropped.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            items: The items of the report, e.g. the per-period results of a retriever.
+            value_columns (Sequence[str]): The value columns to keep.
+        """
+
+        fields = ('settlementDate', 'settlementPeriod', *value_columns)
+        chunks, dictionaries = [], []
+
+        def flush() -> None:
+            # Transposing consecutive dictionaries into one object column per field.
+            chunks.append({field: np.array([item.get(field) for item in dictionaries], dtype=object)
+                           for field in fields})
+            dictionaries.clear()
+
+        # Items are kept in order, so a later duplicate of a period still takes precedence when converted.
+        for item in items:
+            if isinstance(item, pd.DataFrame):
+                if dictionaries:
+                    flush()
+                chunks.append({field: item[field].to_numpy() if field in item else np.full(len(item), None)
+                               for field in fields})
+            elif item is not None:
+                dictionaries.append(item)
+        if dictionaries or not chunks:
+            flush()
+
+        settlement_periods = pd.to_numeric(np.concatenate([chunk['settlementPeriod'] for chunk in chunks]),
+                                           errors='coerce').astype(np.float64)
+        valid = ~np.isnan(settlement_periods)
+        settlement_dates = np.concatenate([pd.to_datetime(chunk['settlementDate']).to_numpy(dtype='datetime64[D]')
+                                           for chunk in chunks])
+
+        return cls(report_name=report_name,
+                   settlement_dates=settlement_dates[valid],
+                   settlement_periods=settlement_periods[valid].astype(np.int16),
+                   values={column: pd.to_numeric(np.concatenate([chunk[column] for chunk in chunks]),
+                                                 errors='coerce').astype(np.float64)[valid]
+                           for column in value_columns})
+
+
+    @classmethod
+    def concat(cls,
+               records: Sequence['ObjectPeriodRecords']) -> 'ObjectPeriodRecords':
+        """
+        Concatenates records of one report, e.g. the days of a backfill, keeping the value columns of the first.
+        """
+
+        return cls(report_name=records[0].report_name,
+                   settlement_dates=np.concatenate([record.settlement_dates for record in records]),
+                   settlement_periods=np.concatenate([record.settlement_periods for record in records]),
+                   values={column: np.concatenate([record.values[column] for record in records])
+                           for column in records[0].values})
+
+
+    def __len__(self) -> int:
+        return len(self.settlement_periods)
+
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held by the record columns.
+        """
+
+        return self.settlement_dates.nbytes + self.settlement_periods.nbytes + \
+                    sum(column.nbytes for column in self.values.values())
+
+
+    def to_columns(self) -> dict[str, np.ndarray]:
+        """
+        Returns the records as arrays keyed by the field names of the BMRS responses.
+        """
+
+        return {'settlementDate': self.settlement_dates,
+                'settlementPeriod': self.settlement_periods,
+                **self.values}
+
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the records as a DataFrame with the columns of ConverterCsvToDataFrame.
+        """
+
+        return pd.DataFrame({'settlementDate': self.settlement_dates.astype('datetime64[ns]'),
+                             'settlementPeriod': self.settlement_periods.astype(np.int64),
+                             **self.values})
@@ -0,0 +1,50 @@
+from typing import Mapping, Optional
+from dataclasses import dataclass, field
+
+from bmrs.objects.object_aggregation import ObjectAggregation
+
+
+@dataclass(frozen=True)
+class ObjectReportDefinition:
+    """
+    Everything the pipeline needs to know about one BMRS report, so that supporting a report
+    means registering a definition rather than editing the parser, converter, analyser and plot.
+
+    Attributes:
+    - report_name (str): Name of the report, e.g. 'B1770'.
+    - value_columns (tuple[str, ...]): The value fields kept from each item, in order.
+    - dtypes (Mapping[str, str]): The dtype of each value column. Columns not listed are float64.
+    - granularity (str): The length of a settlement period as a pandas frequency, e.g. '30min'.
+    - aggregations (Mapping[str, ObjectAggregation]): The daily metrics computed and logged for the report,
+      by name. The analysers apply them to every settlement date, into ObjectImbalanceSummary.aggregates.
+    - plot_title (str): Title of the report's plots, following the settlement date.
+    - plot_label (str): Label of the plotted series and its axis.
+    - bulk (bool): Whether the API returns a whole settlement date for Period=*.
+    """
+
+    SETTLEMENT_FIELDS = ('settlementDate', 'settlementPeriod')
+
+    report_name: str
+    value_columns: tuple[str, ...]
+    dtypes: Mapping[str, str] = field(default_factory=dict)
+    granularity: str = '30min'
+    aggregations: Mapping[str, ObjectAggregation] = field(default_factory=dict)
+    plot_title: Optional[str] = None
+    plot_label: Optional[str] = None
+    bulk: bool = False
+
+
+    @property
+    def fields(self) -> frozenset[str]:
+        """
+        The fields kept from each item: the settlement fields and the value columns.
+        """
+        return frozenset((*self.SETTLEMENT_FIELDS, *self.value_columns))
+
+
+    def get_dtype(self,
+                  column: str) -> str:
+        """
+        Returns the dtype of a value column.
+        """
+        return self.dtypes.get(column, 'float64')
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from typing import Optional
+from dataclasses import dataclass, field
+
+from bmrs.objects.object_imbalance_summary import ObjectImbalanceSummary
+
+
+@dataclass(frozen=True)
+class ObjectReportResult:
+    """
+    The outcome of running one report through the fetch, convert, analyse and plot pipeline.
+
+    Attributes:
+    - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+    - report_ts_dataframe (Optional[pd.DataFrame]): The converted time series, or None if no data was retrieved.
+    - summaries (list[ObjectImbalanceSummary]): The imbalance metrics of each settlement date.
+    - plot_paths (list[str]): The images rendered for the report, if plotting was enabled.
+    """
+
+    report_name: str
+    report_ts_dataframe: Optional[pd.DataFrame]
+    summaries: list[ObjectImbalanceSummary] = field(default_factory=list)
+    plot_paths: list[str] = field(default_factory=list)
@@ -0,0 +1,170 @@
+import os
+import functools
+import pandas as pd
+
+from typing import Iterable, Iterator, Optional
+
+from bmrs.registries import logger
+from bmrs.objects.object_aggregation import ObjectAggregation
+from bmrs.objects.object_report_definition import ObjectReportDefinition
+
+
+class RegistryReports:
+    """
+    A registry of the BMRS reports the pipeline supports, keyed by report name.
+
+    The parsers, converters, analysers and plots look every report up here instead of branching on
+    its name, so another report is supported by registering its ObjectReportDefinition:
+
+        get_default_registry().register(ObjectReportDefinition(report_name='B1610',
+                                                               value_columns=('quantity',)))
+    """
+
+
+    def __init__(self,
+                 definitions: Iterable[ObjectReportDefinition] = ()) -> None:
+        self._definitions: dict[str, ObjectReportDefinition] = {}
+        for definition in definitions:
+            self.register(definition=definition)
+
+
+    def register(self,
+                 definition: ObjectReportDefinition) -> None:
+        """
+        Adds a report to the registry, replacing any earlier definition of the same report.
+
+        Args:
+            definition (ObjectReportDefinition): The definition of the report.
+        """
+
+        if not definition.value_columns:
+            raise ValueError(f"Report {definition.report_name} should declare at least one value column.")
+        self._definitions[definition.report_name] = definition
+
+
+    def get(self,
+            report_name: str) -> Optional[ObjectReportDefinition]:
+        """
+        Returns the definition of a report, or None if it is not registered.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        definition = self._definitions.get(report_name)
+        if definition is None:
+            logger.error(f"{self.__class__.__name__}: Invalid report name provided: {report_name}")
+        return definition
+
+
+    def get_value_columns(self,
+                          report_name: str) -> Optional[list[str]]:
+        """
+        Returns the value columns of a report, or None if it is not registered.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        definition = self.get(report_name=report_name)
+        return list(definition.value_columns) if definition is not None else None
+
+
+    def get_fields(self,
+                   report_name: str) -> Optional[frozenset[str]]:
+        """
+        Returns the fields kept from each item of a report, or None to keep every field of unregistered reports.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        definition = self._definitions.get(report_name)
+        return definition.fields if definition is not None else None
+
+
+    @property
+    def bulk_reports(self) -> frozenset[str]:
+        """
+        The reports whose API returns a whole settlement date for Period=*.
+        """
+        return frozenset(name for name, definition in self._definitions.items() if definition.bulk)
+
+
+    def __contains__(self,
+                     report_name: str) -> bool:
+        return report_name in self._definitions
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._definitions)
+
+
+def get_hourly_absolute(values: pd.Series) -> pd.Series:
+    """
+    Returns the sum of the absolute values of each hour, indexed by the start of the hour.
+    Hours are floored in UTC, as the repeated hour of the autumn clock change is ambiguous in local time.
+    """
+
+    index = values.index
+    hours = index.floor('H') if index.tz is None else index.tz_convert('UTC').floor('H').tz_convert(index.tz)
+    return values.abs().groupby(hours).sum()
+
+
+def get_peak_hour(values: pd.Series) -> Optional[pd.Timestamp]:
+    """
+    Returns the start of the hour with the highest sum of absolute values, or None without values.
+    """
+
+    return get_hourly_absolute(values=values).idxmax() if not values.empty else None
+
+
+def get_peak_hour_absolute(values: pd.Series) -> float:
+    """
+    Returns the sum of the absolute values within the peak hour, or 0.0 without values.
+    """
+
+    return float(get_hourly_absolute(values=values).max()) if not values.empty else 0.0
+
+
+def build_default_registry(b1770_column: Optional[str] = None,
+                           b1780_column: Optional[str] = None) -> RegistryReports:
+    """
+    Builds a registry of the B1770 and B1780 reports. Their value columns default to the
+    B1770_COLUMN and B1780_COLUMN environment variables when set, and to the API's field names otherwise.
+    """
+
+    b1770_column = b1770_column if b1770_column else os.environ.get('B1770_COLUMN') or 'imbalancePriceAmountGBP'
+    b1780_column = b1780_column if b1780_column else os.environ.get('B1780_COLUMN') or 'imbalanceQuantityMAW'
+
+    return RegistryReports(definitions=[
+        ObjectReportDefinition(report_name='B1770',
+                               value_columns=(b1770_column,),
+                               aggregations={'total': ObjectAggregation(function=pd.Series.sum,
+                                                                        message='total daily imbalance cost £{value:.2f}')},
+                               plot_title='Bi-Hourly Imbalance Cost (GBP)',
+                               plot_label='Imbalance Cost (GBP)',
+                               bulk=True),
+        ObjectReportDefinition(report_name='B1780',
+                               value_columns=(b1780_column,),
+                               aggregations={'mean_unit_rate': ObjectAggregation(
+                                                                    function=pd.Series.mean,
+                                                                    message='daily imbalance unit rate {value:.2f} Mwh'),
+                                             'peak_hour': ObjectAggregation(
+                                                                    function=get_peak_hour,
+                                                                    message='highest absolute hourly imbalance volume occured at {value}'),
+                                             'peak_hour_absolute_imbalance': ObjectAggregation(
+                                                                    function=get_peak_hour_absolute,
+                                                                    message='absolute imbalance volume of the peak hour {value:.2f} Mwh')},
+                               plot_title='Bi-Hourly Imbalance rate (MWh)',
+                               plot_label='Imbalance rate (MWh)',
+                               bulk=True),
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_registry() -> RegistryReports:
+    """
+    Returns the registry shared by every component that is not given one, built once on first use.
+    """
+    return build_default_registry()
@@ -0,0 +1,39 @@
+from bmrs.benchmarks.benchmark_runner import BenchmarkRunner
+
+
+def run(*args):
+    """
+    Runs the benchmark scenarios against a local BMRS stand-in server and appends
+    the results to bmrs_benchmarks.jsonl.
+
+    Arguments are passed with --script-args, e.g.
+    python manage.py runscript script_run_benchmarks --script-args day month csv concurrency=48 latency=0.05
+
+    - day, month, year: the scenarios to run. Defaults to all three.
+    - csv: request CSV instead of XML responses.
+    - concurrency=<n>: MAX_CONCURRENT_TASKS of the retriever under test. Default is 24.
+    - workers=<n>: worker processes parsing and converting responses. Default is 0, parsing on the event loop.
+    - rate=<n>: requests per second allowed by the rate limiter. Defaults to the limiter's maximum.
+    - latency=<s>, jitter=<s>, error_rate=<0-1>, throttle_rate=<0-1>, retry_after=<s>, seed=<n>:
+      behaviour of the stand-in server.
+    - nomemory: skip tracing memory allocations, which slows the scenarios down.
+    """
+
+    options = dict(arg.split('=', 1) for arg in args if '=' in arg)
+    server_options = {name: float(options[key])
+                      for key, name in [('latency', 'latency'),
+                                        ('jitter', 'latency_jitter'),
+                                        ('error_rate', 'error_rate'),
+                                        ('throttle_rate', 'throttle_rate'),
+                                        ('retry_after', 'retry_after')] if key in options}
+    if 'seed' in options:
+        server_options['seed'] = int(options['seed'])
+
+    scenarios = [arg for arg in args if arg in BenchmarkRunner.SCENARIOS] or list(BenchmarkRunner.SCENARIOS)
+
+    BenchmarkRunner(service_type='csv' if 'csv' in args else 'xml',
+                    max_concurrent_tasks=int(options.get('concurrency', 24)),
+                    max_rate=float(options['rate']) if 'rate' in options else None,
+                    server_options=server_options,
+                    trace_memory='nomemory' not in args,
+                    cpu_workers=int(options.get('workers', 0))).run(scenarios=scenarios)
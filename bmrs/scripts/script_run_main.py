@@ -1,7 +1,7 @@
 from bmrs.services.service_run_main import ServiceRunMain
 
 
-def run():
+def run(*args):
     """
     Executes the ServiceRunMain which is designed to test the 
     underlying features of the codebase.
@@ -9,5 +9,11 @@ def run():
     The primary purpose of this function is to create an instance 
     of the ServiceRunMain class and trigger its run method, 
     facilitating the testing of the code's core functionalities.
+
+    Passing --script-args headless renders the plots to output_images
+    instead of opening interactive windows, e.g. for cron jobs.
+    Passing --script-args metrics writes the run's latency and throughput
+    metrics to bmrs_metrics.prom in the Prometheus text format.
     """
-    ServiceRunMain().run()
\ No newline at end of file
+    ServiceRunMain(headless='headless' in args,
+                   metrics_path=ServiceRunMain.DEFAULT_METRICS_PATH if 'metrics' in args else None).run()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+
+from datetime import datetime, timedelta
+from typing import Any, Optional, AsyncIterator
+
+from bmrs.services import logger
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_bmrs_backfill_manifest import ServiceBmrsBackfillManifest
+
+
+class ServiceBmrsBackfill:
+    """
+    A service to retrieve many reports over a range of settlement dates on a single event loop.
+    Every (report, date, period) request shares the retriever's pooled session and concurrency budget.
+
+    With a manifest, the outcome of every (report, date, period) unit is checkpointed as it completes,
+    so a restarted backfill only requests the units still pending and `repair` retries the failed ones.
+    """
+
+
+    def __init__(self,
+                 data_retriever: Optional[ServiceBmrsDataRetriever] = None,
+                 manifest: Optional[ServiceBmrsBackfillManifest] = None,
+                 max_attempts: int = 5) -> None:
+        # Using dependency injection to allow a preconfigured retriever.
+        self.data_retriever = data_retriever if data_retriever else ServiceBmrsDataRetriever()
+        # Persisted work queue of the backfill units, if the backfill should be resumable.
+        self.manifest = manifest
+        # Failed units attempted this many times are no longer retried by repair.
+        self.max_attempts = max_attempts
+
+
+    def sync_backfill(self,
+                      reports: list[str],
+                      start_date: str,
+                      end_date: str,
+                      range_start: int = 1,
+                      range_end: int = 50) -> dict[tuple[str, str], list[dict[str, Any]]]:
+        """
+        Synchronously runs a backfill and collects the results of every report and day.
+
+        Args:
+            reports: The report identifiers to be fetched, e.g. ['B1770', 'B1780'].
+            start_date: The first settlement date to be fetched in the format 'YYYY-MM-DD' (inclusive).
+            end_date: The last settlement date to be fetched in the format 'YYYY-MM-DD' (inclusive).
+            range_start: The initial period number fetched for each day (inclusive). Default is 1.
+            range_end: The final period number fetched for each day (inclusive). Default is 50.
+        """
+
+        async def collect() -> dict[tuple[str, str], list[dict[str, Any]]]:
+            return {(report_name, settlement_date): items
+                    async for report_name, settlement_date, items in self.backfill(reports=reports,
+                                                                                   start_date=start_date,
+                                                                                   end_date=end_date,
+                                                                                   range_start=range_start,
+                                                                                   range_end=range_end)}
+
+        return asyncio.run(collect())
+
+
+    async def backfill(self,
+                       reports: list[str],
+                       start_date: str,
+                       end_date: str,
+                       range_start: int = 1,
+                       range_end: int = 50) -> AsyncIterator[tuple[str, str, list[dict[str, Any]]]]:
+        """
+        Schedules every (report, date, period) request at once under the retriever's global
+        concurrency budget and yields each (report_name, settlement_date, items) as its day completes.
+        With a manifest, only the pending units are requested, so the items of a resumed day may only
+        cover some of its periods.
+
+        Args:
+            reports: The report identifiers to be fetched, e.g. ['B1770', 'B1780'].
+            start_date: The first settlement date to be fetched in the format 'YYYY-MM-DD' (inclusive).
+            end_date: The last settlement date to be fetched in the format 'YYYY-MM-DD' (inclusive).
+            range_start: The initial period number fetched for each day (inclusive). Default is 1.
+            range_end: The final period number fetched for each day (inclusive). Default is 50.
+        """
+
+        settlement_dates = self.get_settlement_dates(start_date=start_date, end_date=end_date)
+        if not settlement_dates:
+            return
+
+        periods = list(range(range_start, range_end + 1))
+        if self.manifest is None:
+            work = {(report_name, settlement_date): None
+                    for settlement_date in settlement_dates
+                    for report_name in reports}
+        else:
+            # Registering the units of the range once, only for the periods each date has, then resuming
+            # with those still pending.
+            unit_count = 0
+            for report_name in reports:
+                dates_by_period_count = {}
+                for settlement_date in settlement_dates:
+                    period_count = self.data_retriever.get_period_count(report_name=report_name,
+                                                                        settlement_date=settlement_date)
+                    dates_by_period_count.setdefault(period_count, []).append(settlement_date)
+                for period_count, dates in dates_by_period_count.items():
+                    day_periods = [period for period in periods if period_count is None or period <= period_count]
+                    self.manifest.add_units(reports=[report_name], settlement_dates=dates, periods=day_periods)
+                    unit_count += len(dates) * len(day_periods)
+            work = self.manifest.get_units(status='pending', reports=reports, settlement_dates=settlement_dates)
+            logger.info(f"{self.__class__.__name__}: {sum(map(len, work.values()))} of {unit_count} units pending")
+
+        async for result in self._run(work=work, range_start=range_start, range_end=range_end):
+            yield result
+
+
+    async def repair(self,
+                     reports: Optional[list[str]] = None,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> AsyncIterator[tuple[str, str, list[dict[str, Any]]]]:
+        """
+        Retries the failed units of the manifest that have attempts left, yielding each
+        (report_name, settlement_date, items) as its day completes. The items only cover the retried periods.
+
+        Args:
+            reports: Restricts the repair to these reports. Defaults to every report in the manifest.
+            start_date: The first settlement date to repair in the format 'YYYY-MM-DD'. Requires end_date.
+            end_date: The last settlement date to repair in the format 'YYYY-MM-DD'. Requires start_date.
+        """
+
+        if self.manifest is None:
+            logger.error(f"{self.__class__.__name__}: A manifest is required to repair a backfill.")
+            return
+
+        settlement_dates = self.get_settlement_dates(start_date=start_date, end_date=end_date) \
+                                if start_date and end_date else None
+        work = self.manifest.get_units(status='failed',
+                                       reports=reports,
+                                       max_attempts=self.max_attempts,
+                                       settlement_dates=settlement_dates)
+        logger.info(f"{self.__class__.__name__}: Repairing {sum(map(len, work.values()))} failed units")
+
+        async for result in self._run(work=work):
+            yield result
+
+
+    def sync_repair(self,
+                    reports: Optional[list[str]] = None,
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> dict[tuple[str, str], list[dict[str, Any]]]:
+        """
+        Synchronously runs a repair pass and collects the results of every repaired report and day.
+        """
+
+        async def collect() -> dict[tuple[str, str], list[dict[str, Any]]]:
+            return {(report_name, settlement_date): items
+                    async for report_name, settlement_date, items in self.repair(reports=reports,
+                                                                                 start_date=start_date,
+                                                                                 end_date=end_date)}
+
+        return asyncio.run(collect())
+
+
+    async def _run(self,
+                   work: dict[tuple[str, str], Optional[list[int]]],
+                   range_start: int = 1,
+                   range_end: int = 50) -> AsyncIterator[tuple[str, str, list[dict[str, Any]]]]:
+        """
+        Retrieves every (report_name, settlement_date) of the work concurrently, yielding each day as it completes.
+        A day mapped to None is retrieved over the whole period range; otherwise only its listed periods are
+        retrieved and their outcomes recorded in the manifest.
+        """
+
+        if not work:
+            return
+
+        async def retrieve_day(report_name: str,
+                               settlement_date: str,
+                               periods: Optional[list[int]]) -> tuple[str, str, list[dict[str, Any]]]:
+            if periods is None:
+                items = await self.data_retriever.retrieve_all_data(range_end=range_end,
+                                                                    report_name=report_name,
+                                                                    range_start=range_start,
+                                                                    settlement_date=settlement_date)
+                return report_name, settlement_date, items
+
+            results = await self.data_retriever.retrieve_periods(periods=periods,
+                                                                 report_name=report_name,
+                                                                 settlement_date=settlement_date)
+            failed_periods = [period for period in periods if period not in results]
+            self.manifest.record(report_name=report_name,
+                                 done_periods=results.keys(),
+                                 failed_periods=failed_periods,
+                                 settlement_date=settlement_date,
+                                 error='Request failed' if failed_periods else None)
+            return report_name, settlement_date, self.data_retriever.merge_periods(results=results, report_name=report_name)
+
+        # Days are scheduled in date order so that the earliest days tend to complete first.
+        async for result in self.data_retriever.retrieve_concurrently(
+                                        days=[retrieve_day(report_name, settlement_date, periods)
+                                              for (report_name, settlement_date), periods in work.items()],
+                                        description=f"{len(work)} report days"):
+            yield result
+
+        if self.manifest is not None:
+            logger.info(f"{self.__class__.__name__}: Manifest units {self.manifest.snapshot()}")
+
+
+    def get_settlement_dates(self,
+                             start_date: str,
+                             end_date: str) -> list[str]:
+        """
+        Returns every settlement date between start_date and end_date (inclusive) in the format 'YYYY-MM-DD'.
+
+        Args:
+            start_date: The first settlement date in the format 'YYYY-MM-DD'.
+            end_date: The last settlement date in the format 'YYYY-MM-DD'.
+        """
+
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            logger.error(f"{self.__class__.__name__}: Invalid date range. Dates should be in the format YYYY-MM-DD.")
+            return []
+
+        if end < start:
+            logger.error(f"{self.__class__.__name__}: Invalid date range. 'end_date' is before 'start_date'.")
+            return []
+
+        return [(start + timedelta(days=offset)).strftime('%Y-%m-%d')
+                for offset in range((end - start).days + 1)]
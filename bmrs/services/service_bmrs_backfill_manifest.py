@@ -0,0 +1,204 @@
+import time
+import sqlite3
+
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from bmrs.services import logger
+
+
+class ServiceBmrsBackfillManifest:
+    """
+    A persistent SQLite work queue of backfill units, one per (report_name, settlement_date, period).
+
+    Every unit is 'pending' until a backfill attempts it, after which it is either 'done' (the period
+    was retrieved, or is known to have no published data) or 'failed'. Attempts are counted per unit,
+    so an interrupted backfill resumes with the pending units only and a repair pass retries the
+    failed ones until they run out of attempts.
+    """
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent.parent / 'bmrs_backfill.sqlite3'
+    STATUSES = ('pending', 'done', 'failed')
+
+
+    def __init__(self,
+                 path: Union[str, Path, None] = None) -> None:
+        self.path = str(path if path else self.DEFAULT_PATH)
+
+        # The database is opened on first use, so constructing the manifest creates no file.
+        self._open_connection: Optional[sqlite3.Connection] = None
+
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The SQLite connection, opened and set up on first use.
+        """
+
+        if self._open_connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_units (
+                    report_name TEXT NOT NULL,
+                    settlement_date TEXT NOT NULL,
+                    period INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (report_name, settlement_date, period)
+                )""")
+            connection.execute("CREATE INDEX IF NOT EXISTS backfill_units_status "
+                               "ON backfill_units (status)")
+            connection.commit()
+            self._open_connection = connection
+        return self._open_connection
+
+
+    def add_units(self,
+                  reports: Iterable[str],
+                  settlement_dates: Iterable[str],
+                  periods: Iterable[int]) -> int:
+        """
+        Registers every (report, date, period) unit as pending, leaving units already in the manifest untouched.
+
+        Args:
+            reports: The report identifiers, e.g. ['B1770', 'B1780'].
+            settlement_dates: The settlement dates in the format 'YYYY-MM-DD'.
+            periods: The settlement periods of each day.
+
+        Returns:
+            The number of units added.
+        """
+
+        now = time.time()
+        periods = [int(period) for period in periods]
+        settlement_dates = list(settlement_dates)
+        rows = [(report_name, settlement_date, period, now)
+                for report_name in reports
+                for settlement_date in settlement_dates
+                for period in periods]
+
+        before = self._connection.total_changes
+        self._connection.executemany("INSERT OR IGNORE INTO backfill_units "
+                                     "(report_name, settlement_date, period, updated_at) "
+                                     "VALUES (?, ?, ?, ?)", rows)
+        self._connection.commit()
+        return self._connection.total_changes - before
+
+
+    def get_units(self,
+                  status: str,
+                  reports: Optional[Iterable[str]] = None,
+                  settlement_dates: Optional[Iterable[str]] = None,
+                  max_attempts: Optional[int] = None) -> dict[tuple[str, str], list[int]]:
+        """
+        Returns the periods in the given status, grouped by (report_name, settlement_date) in date order.
+
+        Args:
+            status: One of 'pending', 'done' or 'failed'.
+            reports: Restricts the units to these reports. Defaults to every report.
+            settlement_dates: Restricts the units to these settlement dates. Defaults to every date.
+            max_attempts: Leaves out units that have already been attempted this many times.
+        """
+
+        if status not in self.STATUSES:
+            logger.error(f"{self.__class__.__name__}: Invalid status '{status}'. Allowed values are {self.STATUSES}.")
+            return {}
+
+        query = "SELECT report_name, settlement_date, period FROM backfill_units WHERE status = ?"
+        params: list = [status]
+        if max_attempts is not None:
+            query += " AND attempts < ?"
+            params.append(max_attempts)
+        query += " ORDER BY settlement_date, report_name, period"
+
+        reports = set(reports) if reports is not None else None
+        settlement_dates = set(settlement_dates) if settlement_dates is not None else None
+
+        units: dict[tuple[str, str], list[int]] = {}
+        for report_name, settlement_date, period in self._connection.execute(query, params):
+            if reports is not None and report_name not in reports:
+                continue
+            if settlement_dates is not None and settlement_date not in settlement_dates:
+                continue
+            units.setdefault((report_name, settlement_date), []).append(period)
+        return units
+
+
+    def record(self,
+               report_name: str,
+               settlement_date: str,
+               done_periods: Iterable[int] = (),
+               failed_periods: Iterable[int] = (),
+               error: Optional[str] = None) -> None:
+        """
+        Records the outcome of one attempt at some periods of a report and day, counting the attempt.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            done_periods: The periods that were retrieved or are known to have no data.
+            failed_periods: The periods whose requests failed.
+            error: A description of the failure, stored with the failed periods.
+        """
+
+        now = time.time()
+        update = ("UPDATE backfill_units SET status = ?, attempts = attempts + 1, last_error = ?, updated_at = ? "
+                  "WHERE report_name = ? AND settlement_date = ? AND period = ?")
+
+        with self._connection:
+            self._connection.executemany(update, [('done', None, now, report_name, settlement_date, int(period))
+                                                  for period in done_periods])
+            self._connection.executemany(update, [('failed', error, now, report_name, settlement_date, int(period))
+                                                  for period in failed_periods])
+
+
+    def reset(self,
+              status: str = 'failed') -> int:
+        """
+        Returns every unit in the given status to pending with its attempts cleared, e.g. to start
+        a fresh repair cycle for units that ran out of attempts.
+
+        Returns:
+            The number of units reset.
+        """
+
+        cursor = self._connection.execute("UPDATE backfill_units SET status = 'pending', attempts = 0, "
+                                          "last_error = NULL, updated_at = ? WHERE status = ?",
+                                          (time.time(), status))
+        self._connection.commit()
+        return cursor.rowcount
+
+
+    def clear(self) -> None:
+        """
+        Removes every unit from the manifest.
+        """
+
+        self._connection.execute("DELETE FROM backfill_units")
+        self._connection.commit()
+
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection, if it was opened.
+        """
+
+        if self._open_connection is None:
+            return
+        self._open_connection.close()
+        self._open_connection = None
+
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        Returns the number of units in each status.
+        """
+
+        counts = dict.fromkeys(self.STATUSES, 0)
+        counts.update(self._connection.execute("SELECT status, COUNT(*) FROM backfill_units "
+                                               "GROUP BY status").fetchall())
+        return counts
@@ -1,19 +1,56 @@
 import re
+import dataclasses
+import pandas as pd
 
-from typing import Optional
+from typing import Iterable, Optional, Union
+from datetime import date
 
 from bmrs.services import logger
-from bmrs.decorators.decorator_bmrs_api_vars_required import \
-                                        bmrs_api_vars_required
+from bmrs.objects.object_bmrs_settings import ObjectBmrsSettings, get_default_bmrs_settings
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar, get_default_calendar
+
+
+_REPORT_NAME_PATTERN = re.compile(r'^B\d+$')
+_SETTLEMENT_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_SERVICE_TYPES = frozenset({'csv', 'xml'})
 
 
 class ServiceBmrsBuildUrl:
+    """
+    Builds BMRS report URLs from settings loaded once, through a template compiled when the builder is created.
+    """
+
+
+    def __init__(self,
+                 settings: Optional[ObjectBmrsSettings] = None,
+                 calendar: Optional[ServiceSettlementCalendar] = None) -> None:
+        # Defaults to the settings loaded from the environment, the Django settings and the .env file.
+        self.settings = settings if settings is not None else get_default_bmrs_settings()
+        # Number of settlement periods of every date, for building the URLs of exactly the periods that exist.
+        self.calendar = calendar if calendar else get_default_calendar()
+        self._template = self._compile_template(settings=self.settings)
+
+
+    @staticmethod
+    def _compile_template(settings: ObjectBmrsSettings) -> Optional[str]:
+        """
+        Returns the URL format string with {ReportName}, {SettlementDate}, {Period} and {ServiceType}
+        fields, or None if some settings are missing.
+        """
+
+        if not settings.is_complete:
+            return None
+
+        def escape(value: str) -> str:
+            return value.replace('{', '{{').replace('}', '}}')
+
+        return (f"{escape(settings.host)}{{ReportName}}/{escape(settings.version)}"
+                f"?APIKey={escape(settings.api_scripting_key)}&{settings.url_end_str}")
 
 
-    @bmrs_api_vars_required
     def build_url(self,
                   period: str,
-                  report_name: str, 
+                  report_name: str,
                   settlement_date: str,
                   host: Optional[str] = None,
                   version: Optional[str] = None,
@@ -22,53 +59,134 @@ class ServiceBmrsBuildUrl:
                   service_type: str = "xml") -> Optional[str]:
         """
         Constructs the BMRS URL based on provided parameters.
-        
+
         Args:
             report_name: Name of the report to fetch.
-            period: Specific period for the report.
+            period: Specific period for the report, or '*' for every period of the settlement date.
             settlement_date: Settlement date for the report.
-            host: Base BMRS API URL (typically injected by decorator).
-            version: API version (typically injected by decorator).
-            url_end_str: URL ending format string (typically injected by decorator).
-            api_scripting_key: API key for BMRS (typically injected by decorator).
+            host: Base BMRS API URL, overriding the settings.
+            version: API version, overriding the settings.
+            url_end_str: URL ending format string, overriding the settings.
+            api_scripting_key: API key for BMRS, overriding the settings.
             service_type: Desired response format ('csv' or 'xml'). Default is 'xml'.
         """
-        
+
         # Checks
                 # Validating the 'period' parameter
         try:
-            # Ensure 'period' is an integer between 1 and 50 (inclusive)
-            if not 1 <= int(period) <= 50:
-                logger.error(f"{self.__class__.__name__}: Invalid 'period'. It should be a number in the range 1-50.")
+            # Ensure 'period' is either '*' (every period of the day) or an integer between 1 and 50 (inclusive)
+            if str(period) != '*' and not 1 <= int(period) <= 50:
+                logger.error(f"{self.__class__.__name__}: Invalid 'period'. It should be '*' or a number in the range 1-50.")
                 return None
         except ValueError:
             # Catch the error if 'period' is not convertible to an integer
             logger.error(f"{self.__class__.__name__}: 'period' should be a string representation of a number.")
             return None
 
+        # Validate the 'settlement_date' format using regex matching
+        if not settlement_date or not isinstance(settlement_date, str) \
+                                        or not _SETTLEMENT_DATE_PATTERN.match(settlement_date):
+            logger.error(f"{self.__class__.__name__}: Invalid 'settlement_date'. It should be in the format YYYY-MM-DD.")
+            return None
+
+        template = self._get_template(report_name=report_name,
+                                      service_type=service_type,
+                                      overrides={'host': host,
+                                                 'version': version,
+                                                 'url_end_str': url_end_str,
+                                                 'api_scripting_key': api_scripting_key})
+        if template is None:
+            return None
+
+        # Construct the URL using the provided parameters
+        return template.format(ReportName=report_name,
+                               SettlementDate=settlement_date,
+                               Period=period,
+                               ServiceType=service_type)
+
+
+    def build_urls(self,
+                   report_name: str,
+                   settlement_dates: Iterable[Union[str, date]],
+                   periods: Optional[Iterable[Union[int, str]]] = None,
+                   service_type: str = "xml") -> Optional[list[str]]:
+        """
+        Constructs the URLs of the periods of every settlement date, date by date, e.g. for a backfill:
+
+            builder.build_urls(report_name='B1770', settlement_dates=pd.date_range('2022-01-01', '2023-12-31'))
+
+        The report, periods and service type are validated once and the dates are formatted in one
+        vectorised call, so tens of thousands of URLs are built in milliseconds.
+
+        Args:
+            report_name: Name of the report to fetch.
+            settlement_dates: The settlement dates, as dates or 'YYYY-MM-DD' strings.
+            periods: The periods of each date, each a number in the range 1-50 or '*'. Defaults to the periods
+                     each date has in the settlement calendar, i.e. 48, or 46 and 50 on clock-change days.
+            service_type: Desired response format ('csv' or 'xml'). Default is 'xml'.
+        """
+
+        periods_by_calendar = periods is None
+        periods = [str(period) for period in (periods if periods is not None else range(1, 51))]
+        if not all(period == '*' or (period.isdigit() and 1 <= int(period) <= 50) for period in periods):
+            logger.error(f"{self.__class__.__name__}: Invalid 'periods'. Each should be '*' or a number in the range 1-50.")
+            return None
+
+        try:
+            settlement_dates = pd.DatetimeIndex(pd.to_datetime(list(settlement_dates), format='%Y-%m-%d'))
+            period_counts = self.calendar.get_period_counts(settlement_dates=settlement_dates.values) \
+                                        if periods_by_calendar else None
+            settlement_dates = settlement_dates.strftime('%Y-%m-%d')
+        except (TypeError, ValueError):
+            logger.error(f"{self.__class__.__name__}: Invalid 'settlement_dates'. They should be in the format YYYY-MM-DD.")
+            return None
+
+        template = self._get_template(report_name=report_name, service_type=service_type)
+        if template is None:
+            return None
+
+        # Filling in the report and service type once, leaving positional fields for the date and period.
+        template = template.format(ReportName=report_name,
+                                   SettlementDate='{0}',
+                                   Period='{1}',
+                                   ServiceType=service_type)
+        if periods_by_calendar:
+            return [template.format(settlement_date, period)
+                    for settlement_date, period_count in zip(settlement_dates, period_counts.tolist())
+                    for period in periods[:period_count]]
+        return [template.format(settlement_date, period)
+                for settlement_date in settlement_dates
+                for period in periods]
+
+
+    def _get_template(self,
+                      report_name: str,
+                      service_type: str,
+                      overrides: Optional[dict[str, Optional[str]]] = None) -> Optional[str]:
+        """
+        Validates the report name and service type, and returns the URL template of the settings
+        with any overrides applied, or None with an error logged.
+        """
+
         # Validate the 'report_name' parameter to ensure it's a non-empty string
         if not report_name or not isinstance(report_name, str) \
-                                        or not re.match(r'^B\d+$', report_name):
+                                        or not _REPORT_NAME_PATTERN.match(report_name):
             logger.error(f"{self.__class__.__name__}: Invalid 'report_name'. It should be a non-empty string starting with 'B' followed by numbers.")
             return None
 
-        # Validate the 'settlement_date' format using regex matching
-        if not settlement_date or not re.match(r"^\d{4}-\d{2}-\d{2}$", settlement_date):
-            logger.error(f"{self.__class__.__name__}: Invalid 'settlement_date'. It should be in the format YYYY-MM-DD.")
-            return None
-
         # Check that 'service_type' is either 'csv' or 'xml'
-        if service_type not in ['csv', 'xml']:
+        if service_type not in _SERVICE_TYPES:
             logger.error(f"{self.__class__.__name__}: Invalid 'service_type'. Allowed values are 'csv' and 'xml'.")
             return None
 
+        template = self._template
+        overrides = {name: value for name, value in (overrides or {}).items() if value}
+        if overrides:
+            template = self._compile_template(settings=dataclasses.replace(self.settings, **overrides))
+
         # Check for missing or empty essential parameters
-        if not all([host, version, url_end_str, api_scripting_key]):
+        if template is None:
             logger.error(f"{self.__class__.__name__}: Some essential parameters are missing or empty.")
             return None
-        
-        # Construct the URL using the provided parameters
-        url = (f"{host}{report_name}/{version}?APIKey={api_scripting_key}&"
-               f"{url_end_str.format(SettlementDate=settlement_date, Period=period, ServiceType=service_type)}")
-        
-        return url
\ No newline at end of file
+
+        return template
@@ -1,19 +1,40 @@
 import ssl 
 import time
 import asyncio
-import xmltodict
+import functools
+import pandas as pd
 
-from typing import Any, Union, Optional
-from aiohttp import ClientResponseError, ClientSession, ClientTimeout
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Union, Optional, Callable, Iterable, Awaitable, AsyncIterator, TypeVar
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 
 from bmrs.services import logger
 from bmrs.decorators.decorator_aiohttp_params_required import \
                                         aiohttp_params_required
+from bmrs.services.service_rate_limiter import ServiceRateLimiter
+from bmrs.services.service_retry_policy import ServiceRetryPolicy
+from bmrs.services.service_metrics import ServiceMetrics, default_metrics
+from bmrs.services.service_cpu_offload import ServiceCpuOffload
+from bmrs.services.service_bmrs_response_cache import ServiceBmrsResponseCache
 from bmrs.services.service_bmrs_build_url import ServiceBmrsBuildUrl
+from bmrs.converters.converter_csv_to_dataframe import ConverterCsvToDataFrame
+from bmrs.converters.converter_xml_stream_to_dict import ConverterXmlStreamToDict
+from bmrs.objects.object_period_records import ObjectPeriodRecords
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar, get_default_calendar
 
 
+# Marks a period whose request failed, as opposed to a period without published data.
+_FAILED = object()
+
+_T = TypeVar('_T')
+
 class ServiceBmrsDataRetriever:
     
+    # Size of the chunks in which response bodies are streamed into the parser.
+    READ_CHUNK_SIZE = 64 * 1024
+    
     
     @aiohttp_params_required
     def __init__(self,
@@ -21,16 +42,172 @@ class ServiceBmrsDataRetriever:
                  max_tries, 
                  max_concurrent_tasks,
                  rate_limit_sleep_time,
-                 url_builder=None) -> None:
+                 url_builder=None,
+                 rate_limiter=None,
+                 retry_policy: Optional[ServiceRetryPolicy] = None,
+                 metrics: Optional[ServiceMetrics] = None,
+                 response_cache: Optional[ServiceBmrsResponseCache] = None,
+                 bypass_cache: bool = False,
+                 service_type: str = 'xml',
+                 xml_converter: Optional[ConverterXmlStreamToDict] = None,
+                 csv_converter: Optional[ConverterCsvToDataFrame] = None,
+                 cpu_offload: Optional[ServiceCpuOffload] = None,
+                 compact_records: bool = True,
+                 registry: Optional[RegistryReports] = None,
+                 bulk_reports: Optional[Iterable[str]] = None,
+                 calendar: Optional[ServiceSettlementCalendar] = None,
+                 conditional_requests: bool = False,
+                 max_validators: int = 1024,
+                 max_throttled_tries: int = 100,
+                 keepalive_timeout: int = 30,
+                 dns_cache_ttl: int = 300) -> None:
         self.timeout = timeout
         self.max_retries = max_tries
         # Limit the number of concurrent tasks to avoid overloading resources.
         self.max_concurrent_tasks = max_concurrent_tasks
-        # Time to sleep if rate-limited.
+        # Time to pause all requests for when rate-limited without a Retry-After. An advertised Retry-After is honoured.
         self.rate_limit_sleep_time = rate_limit_sleep_time
+        # Rate-limited attempts do not count against max_tries, as the limiter paces them, up to this many per request.
+        self.max_throttled_tries = max_throttled_tries
         # Using dependency injection to allow custom URL builders. 
         # Defaults to ServiceBmrsBuildUrl if none is provided.
         self.service_build_url = url_builder if url_builder else ServiceBmrsBuildUrl()
+        # Latency, size and error metrics of every request are recorded here.
+        self.metrics = metrics if metrics else default_metrics
+        # A single adaptive rate limiter paces every in-flight request of this retriever.
+        self.rate_limiter = rate_limiter if rate_limiter else \
+                                ServiceRateLimiter(default_retry_after=self.rate_limit_sleep_time, metrics=self.metrics)
+        # An injected limiter records its rate with the request metrics unless it reports elsewhere.
+        if self.rate_limiter.metrics is None:
+            self.rate_limiter.metrics = self.metrics
+        # A single retry policy backs off failed attempts and caps retries across every request of this retriever.
+        self.retry_policy = retry_policy if retry_policy else ServiceRetryPolicy(max_attempts=self.max_retries,
+                                                                                 metrics=self.metrics)
+        # Retries themselves are counted as retries_total by the retriever, labelled by error.
+        if self.retry_policy.metrics is None:
+            self.retry_policy.metrics = self.metrics
+        # Optional persistent cache of parsed items; no caching takes place when it is None.
+        self.response_cache = response_cache
+        # When set, cached items are never read although fresh items are still stored.
+        self.bypass_cache = bypass_cache
+        # Value columns and Period=* support of every report.
+        self.registry = registry if registry else get_default_registry()
+        # Streams XML responses, keeping only the settlement fields and registered value columns.
+        self.xml_converter = xml_converter if xml_converter else ConverterXmlStreamToDict(registry=self.registry)
+        # Parses CSV responses in bulk straight into typed DataFrame columns.
+        self.csv_converter = csv_converter if csv_converter else ConverterCsvToDataFrame(registry=self.registry)
+        # When set, raw response bodies are parsed into typed columns in its worker processes instead of on the
+        # event loop, and items of either format are returned as DataFrames.
+        self.cpu_offload = cpu_offload
+        # The merged periods of registered reports are returned as ObjectPeriodRecords, the one type the pipeline
+        # consumes. When unset, the raw items of the responses are returned instead.
+        self.compact_records = compact_records
+        # Response format requested when a call does not specify one, either 'csv' or 'xml'.
+        self.service_type = service_type
+        # Fetches currently in flight, keyed by request, so identical concurrent calls share one.
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        # Number of calls that were served by joining an identical in-flight fetch.
+        self.coalesced_count = 0
+        # Reports whose API accepts Period=* to return a whole settlement date in one call. Defaults to the registry's.
+        self.bulk_reports = frozenset(bulk_reports) if bulk_reports is not None else self.registry.bulk_reports
+        # Number of settlement periods of every date, so periods a date does not have are never requested.
+        self.calendar = calendar if calendar else get_default_calendar()
+        # When set, URLs fetched before are requested with If-None-Match/If-Modified-Since, and a
+        # 304 Not Modified response returns the items parsed from the earlier body.
+        self.conditional_requests = conditional_requests
+        # The ETag and Last-Modified validators and parsed items of the most recently fetched URLs.
+        self._validators: OrderedDict[str, tuple[dict[str, str], Any]] = OrderedDict()
+        self.max_validators = max_validators
+        # Number of conditional requests answered with 304 Not Modified.
+        self.not_modified_count = 0
+        # Number of HTTP requests sent, including retries.
+        self.request_count = 0
+        # Idle pooled connections are kept alive for this many seconds between requests.
+        self.keepalive_timeout = keepalive_timeout
+        # Resolved host addresses are cached for this many seconds.
+        self.dns_cache_ttl = dns_cache_ttl
+        # A single SSL context is shared by every connection the session opens.
+        self.ssl_context = self._create_ssl_context()
+        # The pooled session is bound to an event loop, so it is opened lazily inside one.
+        self._session: Optional[ClientSession] = None
+        # Concurrency budget shared by every request made while the session is open.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Number of session_scope blocks sharing a session they opened themselves.
+        self._scope_count = 0
+
+
+    async def __aenter__(self) -> 'ServiceBmrsDataRetriever':
+        await self.open()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+    async def open(self) -> ClientSession:
+        """
+        Opens the pooled ClientSession shared by every request made through this retriever,
+        together with the semaphore that bounds concurrent requests across all callers.
+        Calling it while a session is already open returns the existing session.
+        """
+        
+        if self._session is None or self._session.closed:
+            self._semaphore = asyncio.Semaphore(int(self.max_concurrent_tasks))
+            connector = TCPConnector(ssl=self.ssl_context,
+                                     use_dns_cache=True,
+                                     ttl_dns_cache=self.dns_cache_ttl,
+                                     limit=int(self.max_concurrent_tasks),
+                                     limit_per_host=int(self.max_concurrent_tasks),
+                                     keepalive_timeout=self.keepalive_timeout)
+            
+            self._session = ClientSession(connector=connector,
+                                          timeout=ClientTimeout(total=self.timeout))
+        return self._session
+
+
+    async def close(self) -> None:
+        """
+        Closes the pooled ClientSession and releases its connections.
+        """
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[ClientSession]:
+        """
+        Yields the open pooled session, or opens one for the duration of the block 
+        when the retriever is used outside of its async context manager. A session opened 
+        this way is shared by every concurrent block and closed when the last of them exits.
+        """
+        
+        if self._session is not None and not self._session.closed and self._scope_count == 0:
+            yield self._session
+            return
+        
+        session = await self.open()
+        self._scope_count += 1
+        try:
+            yield session
+        finally:
+            self._scope_count -= 1
+            if self._scope_count == 0:
+                await self.close()
+
+
+    def _create_ssl_context(self) -> ssl.SSLContext:
+        """
+        Creates the SSL context used by the pooled connector.
+        """
+        
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        return ssl_context
 
 
     def sync_retrieve_all_data(self,
@@ -38,9 +215,10 @@ class ServiceBmrsDataRetriever:
                                settlement_date: str,
                                range_start: Optional[int] = 1,
                                range_end : Optional[int] = 50,
-                               ) -> list[Union[dict[str, Any], list[dict[str, Any]]]]:
+                               ) -> Union[ObjectPeriodRecords, list[dict[str, Any]], pd.DataFrame]:
         """
-        Synchronously retrieves BMRS data for all periods by calling the asynchronous retrieve_all_data method.
+        Synchronously retrieves BMRS data for all periods by calling the asynchronous retrieve_all_data method,
+        returning the same ObjectPeriodRecords for registered reports.
         
         Args:
             report_name: The identifier for the specific report to be fetched.
@@ -51,12 +229,14 @@ class ServiceBmrsDataRetriever:
         
         # A wrapper to run async function in a synchronous context.
         start_time = time.time()
+        request_count = self.request_count
         ts_data = asyncio.run(self.retrieve_all_data(range_end=range_end,
                                                      range_start=range_start,
                                                      report_name=report_name,
                                                      settlement_date=settlement_date)) 
         elapsed_time = time.time() - start_time
-        logger.info(f"{self.__class__.__name__}: {report_name} - {len(ts_data)} api calls in {elapsed_time:.2f} seconds via Asyncio")
+        logger.info(f"{self.__class__.__name__}: {report_name} - {len(ts_data)} periods from "
+                    f"{self.request_count - request_count} api calls in {elapsed_time:.2f} seconds via Asyncio")
     
         return ts_data
 
@@ -66,7 +246,8 @@ class ServiceBmrsDataRetriever:
                                 report_name: str, 
                                 range_start: int,
                                 settlement_date: str,
-                                ) -> list[Union[dict[str, Any], list[dict[str, Any]]]]:
+                                file_format: Optional[str] = None,
+                                ) -> Union[ObjectPeriodRecords, list[dict[str, Any]], pd.DataFrame]:
         """
         Concurrently retrieves BMRS data for a range of periods using asynchronous requests.
         
@@ -75,39 +256,331 @@ class ServiceBmrsDataRetriever:
             report_name: The identifier for the specific report to be fetched.
             range_start: The initial period number to start fetching the data from (inclusive).
             settlement_date: The date for which the data needs to be fetched in the format 'YYYY-MM-DD'.
+            file_format: The format in which the responses are requested. Defaults to the retriever's service_type.
+
+        Returns:
+            ObjectPeriodRecords holding the settlement date, period and value columns of every period of a registered
+            report, whatever the format and wherever it is parsed. Only a retriever built with compact_records=False,
+            or a report that is not registered, returns the raw items instead: a list of item dictionaries for 'xml',
+            or a single typed DataFrame for 'csv' or when parsing is offloaded to worker processes.
+        """
+        
+        file_format = file_format if file_format else self.service_type
+        
+        results = await self.retrieve_periods(report_name=report_name,
+                                              file_format=file_format,
+                                              settlement_date=settlement_date,
+                                              periods=range(range_start, range_end + 1))
+        
+        return self.merge_periods(results=results, file_format=file_format, report_name=report_name)
+    
+    
+    def merge_periods(self,
+                      results: dict[int, Union[dict[str, Any], pd.DataFrame, None]],
+                      file_format: Optional[str] = None,
+                      report_name: Optional[str] = None
+                      ) -> Union[ObjectPeriodRecords, list[dict[str, Any]], pd.DataFrame]:
+        """
+        Merges the per-period results of retrieve_periods into the output of retrieve_all_data.
+        
+        Args:
+            results: The items keyed by period, as returned by retrieve_periods.
+            file_format: The format the items were retrieved in. Defaults to the retriever's service_type.
+            report_name: The report the items belong to. Required for compact records.
+        """
+        
+        file_format = file_format if file_format else self.service_type
+        
+        # Holding only typed settlement and value columns, so long backfills do not keep a dictionary per period.
+        if self.compact_records and report_name in self.registry:
+            return ObjectPeriodRecords.from_items(report_name=report_name,
+                                                  items=results.values(),
+                                                  value_columns=self.registry.get(report_name=report_name).value_columns)
+        
+        # CSV periods, and periods parsed in worker processes, are already typed DataFrames,
+        # so they are concatenated without a dict-per-row stage.
+        if file_format == 'csv' or self.cpu_offload is not None:
+            # Items of either kind may come from the cache, so any dictionaries are framed as well.
+            frames = [item if isinstance(item, pd.DataFrame) else pd.DataFrame([item])
+                      for item in results.values() if item is not None and len(item) > 0]
+            return pd.concat(frames, ignore_index=True) if frames else \
+                        pd.DataFrame(columns=['settlementDate', 'settlementPeriod'])
+        
+        # Flattening the results in period order, dropping periods without data.
+        return [item for item in results.values() if item is not None]
+    
+    
+    async def retrieve_concurrently(self,
+                                    days: Iterable[Awaitable[_T]],
+                                    description: str) -> AsyncIterator[_T]:
+        """
+        Runs the retrievals of many report days concurrently on one pooled session, under the shared
+        concurrency budget, and yields each result as it completes. Outstanding days are cancelled if
+        the consumer stops early or an error occurs.
+        
+        Args:
+            days: The retrievals, e.g. coroutines returning (report_name, settlement_date, items), in the
+                  order they should be scheduled.
+            description: Describes the work in the completion log, e.g. '12 report days'.
+        """
+        
+        start_time = time.time()
+        request_count = self.request_count
+        
+        # Keeping the pooled session open for the whole run so all days share it.
+        async with self.session_scope():
+            tasks = [asyncio.ensure_future(day) for day in days]
+            try:
+                for next_completed in asyncio.as_completed(tasks):
+                    yield await next_completed
+            finally:
+                for task in tasks:
+                    task.cancel()
+        
+        elapsed_time = time.time() - start_time
+        logger.info(f"{self.__class__.__name__}: {description} - "
+                    f"{self.request_count - request_count} api calls in {elapsed_time:.2f} seconds via Asyncio")
+    
+    
+    async def retrieve_periods(self,
+                               report_name: str,
+                               settlement_date: str,
+                               periods: Iterable[int],
+                               file_format: Optional[str] = None,
+                               bypass_cache: Optional[bool] = None
+                               ) -> dict[int, Union[dict[str, Any], pd.DataFrame, None]]:
+        """
+        Retrieves the given settlement periods of one report and day.
+        
+        For reports in bulk_reports the whole day is requested in a single call and split into 
+        periods locally; only periods missing from that response are then requested one by one.
+        Other reports are requested per period, concurrently.
+        
+        Args:
+            report_name: The identifier for the specific report to be fetched.
+            settlement_date: The date for which the data needs to be fetched in the format 'YYYY-MM-DD'.
+            periods: The settlement periods to be fetched.
+            file_format: The format in which the responses are requested. Defaults to the retriever's service_type.
+            bypass_cache: If True the response cache is not read. Defaults to the retriever's bypass_cache setting.
+
+        Returns:
+            A dictionary mapping each requested period to its item, or None where no data is published.
+            Periods whose requests failed are left out.
+        """
+        
+        periods = list(periods)
+        results = {}
+        async for batch in self.stream_periods(periods=periods,
+                                               report_name=report_name,
+                                               file_format=file_format,
+                                               bypass_cache=bypass_cache,
+                                               window=max(len(periods), 1),
+                                               settlement_date=settlement_date):
+            results.update(batch)
+        
+        return {period: results[period] for period in periods if period in results}
+    
+    
+    async def stream_periods(self,
+                             report_name: str,
+                             settlement_date: str,
+                             periods: Iterable[int],
+                             file_format: Optional[str] = None,
+                             ordered: bool = False,
+                             window: Optional[int] = None,
+                             bypass_cache: Optional[bool] = None
+                             ) -> AsyncIterator[dict[int, Union[dict[str, Any], pd.DataFrame, None]]]:
+        """
+        Retrieves the given settlement periods of one report and day like retrieve_periods, yielding
+        batches of periods as their requests complete, so consumers can start before the slowest request.
+        
+        At most window periods are requested or held unconsumed at once; further requests are only
+        sent as the consumer takes batches, so a slow consumer slows retrieval down instead of
+        buffering without bound.
+        
+        Args:
+            report_name: The identifier for the specific report to be fetched.
+            settlement_date: The date for which the data needs to be fetched in the format 'YYYY-MM-DD'.
+            periods: The settlement periods to be fetched.
+            file_format: The format in which the responses are requested. Defaults to the retriever's service_type.
+            ordered: If True, periods are yielded in the order given, holding early completions in a reorder
+                     buffer; otherwise in completion order.
+            window: The number of periods in flight or awaiting the consumer. Defaults to twice 
+                    max_concurrent_tasks.
+            bypass_cache: If True the response cache is not read. Defaults to the retriever's bypass_cache setting.
+
+        Yields:
+            Dictionaries mapping each newly completed period to its item, or None where no data is published.
+            A whole-day response is yielded as a single batch. Periods whose requests failed are left out.
+        """
+        
+        file_format = file_format if file_format else self.service_type
+        window = window if window else 2 * int(self.max_concurrent_tasks)
+        bypass_cache = self.bypass_cache if bypass_cache is None else bypass_cache
+        periods = list(periods)
+        
+        # All requests share the same pooled session, so connections are reused across requests.
+        # The session scope also owns the semaphore, so concurrent callers share one concurrency budget.
+        async with self.session_scope():
+            # Periods the settlement date does not have, e.g. 47 to 50 on a 46 period day, hold no data.
+            period_count = self.get_period_count(report_name=report_name, settlement_date=settlement_date)
+            known = {period: None for period in periods if period_count is not None and int(period) > period_count}
+            if report_name in self.bulk_reports and len(periods) - len(known) > 1:
+                day_items = await self.retrieve_day(report_name=report_name,
+                                                    file_format=file_format,
+                                                    bypass_cache=bypass_cache,
+                                                    settlement_date=settlement_date)
+                if day_items is not None:
+                    # Periods after the last one published are not available yet if they have not ended,
+                    # while ended ones missing from the response, e.g. of a truncated day, are requested
+                    # individually like the interior gaps.
+                    last_period = max(day_items, default=0)
+                    ended_count = self.get_ended_period_count(report_name=report_name,
+                                                              settlement_date=settlement_date)
+                    known.update({period: day_items.get(period) for period in periods
+                                  if period in day_items or period > max(last_period, ended_count or 0)})
+            
+            pending_periods = iter([period for period in periods if period not in known])
+            in_flight: dict[asyncio.Future, int] = {}
+            completed = {}
+            
+            def fill() -> None:
+                # Requesting the remaining periods one by one while the window has room.
+                while len(in_flight) + len(completed) < window:
+                    period = next(pending_periods, None)
+                    if period is None:
+                        return
+                    in_flight[asyncio.ensure_future(self._retrieve_period(period=str(period),
+                                                                          report_name=report_name,
+                                                                          file_format=file_format,
+                                                                          bypass_cache=bypass_cache,
+                                                                          settlement_date=settlement_date))] = period
+            
+            async def collect() -> None:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    completed[in_flight.pop(task)] = task.result()
+            
+            try:
+                fill()
+                if not ordered:
+                    if known:
+                        yield known
+                    while in_flight:
+                        await collect()
+                        batch = {period: item for period, item in completed.items() if item is not _FAILED}
+                        completed.clear()
+                        fill()
+                        if batch:
+                            yield batch
+                    return
+                
+                # Yielding the longest run of consecutive periods that is ready, waiting on the head of the order.
+                index = 0
+                while index < len(periods):
+                    batch = {}
+                    while index < len(periods) and (periods[index] in known or periods[index] in completed):
+                        period = periods[index]
+                        item = known[period] if period in known else completed.pop(period)
+                        if item is not _FAILED:
+                            batch[period] = item
+                        index += 1
+                    fill()
+                    if batch:
+                        yield batch
+                    elif index < len(periods):
+                        await collect()
+            finally:
+                # Cancelling outstanding periods if the consumer stops early or an error occurs.
+                for task in in_flight:
+                    task.cancel()
+    
+    
+    def get_period_count(self,
+                         report_name: str,
+                         settlement_date: str) -> Optional[int]:
+        """
+        Returns the number of settlement periods of a report and date from the calendar, e.g. 46 on the
+        spring clock-change day, or None if the date is invalid.
+        
+        Args:
+            report_name: The identifier for the specific report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+        """
+        
+        try:
+            return self.calendar.get_period_count(settlement_date=settlement_date,
+                                                  granularity=self._get_granularity(report_name=report_name))
+        except (TypeError, ValueError):
+            # Invalid dates are reported by the URL builder.
+            return None
+    
+    
+    def get_ended_period_count(self,
+                               report_name: str,
+                               settlement_date: str) -> Optional[int]:
+        """
+        Returns the number of settlement periods of a report and date that have ended by now, i.e. all
+        of them for a past date, or None if the date is invalid.
+        
+        Args:
+            report_name: The identifier for the specific report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+        """
+        
+        try:
+            return self.calendar.get_ended_period_count(settlement_date=settlement_date,
+                                                        granularity=self._get_granularity(report_name=report_name))
+        except (TypeError, ValueError):
+            return None
+    
+    
+    def _get_granularity(self,
+                         report_name: str) -> Optional[str]:
+        """
+        Returns the period length of a registered report, or None for the calendar's default.
         """
         
-        # Using a semaphore to manage the max number of concurrent tasks
-        semaphore = asyncio.Semaphore(int(self.max_concurrent_tasks))
-        # This inner function fetches data for a specific period 
-        # while respecting the concurrency limits set by the semaphore.
-        async def bound_retrieve(period: int) -> Union[dict[str, Any], list[dict[str, Any]]]:
-            async with semaphore:
-                return await self.retrieve_data(str(period), report_name, settlement_date)
+        return self.registry.get(report_name=report_name).granularity if report_name in self.registry else None
+    
+    
+    async def retrieve_day(self,
+                           report_name: str,
+                           settlement_date: str,
+                           file_format: Optional[str] = None,
+                           bypass_cache: Optional[bool] = None
+                           ) -> Optional[dict[int, Union[dict[str, Any], pd.DataFrame]]]:
+        """
+        Retrieves every settlement period of a report and day in a single request.
         
-        # Creating tasks for all desired periods.
-        tasks = [bound_retrieve(period) for period in range(range_start, range_end + 1)]
+        Args:
+            report_name: The identifier for the specific report to be fetched.
+            settlement_date: The date for which the data needs to be fetched in the format 'YYYY-MM-DD'.
+            file_format: The format in which the response is expected. Defaults to the retriever's service_type.
+            bypass_cache: If True the response cache is not read. Defaults to the retriever's bypass_cache setting.
 
-        # Concurrently running all tasks.
-        results = await asyncio.gather(*tasks)
+        Returns:
+            A dictionary mapping each published period to its last item (or, for 'csv', its rows as a DataFrame).
+            None if the request failed.
+        """
         
-        # Flattening the results.
-        # Some responses might return a list of items, so we ensure they're all flattened into a single list.
-        flattened_results = [
-                            item for sublist in results
-                            for item in (sublist if isinstance(sublist, list) else [sublist])
-                            if item is not None
-                            ]
+        file_format = file_format if file_format else self.service_type
+        bypass_cache = self.bypass_cache if bypass_cache is None else bypass_cache
         
-        return flattened_results
+        return await self._coalesce(key=(report_name, settlement_date, '*', file_format, bypass_cache),
+                                    fetch=lambda: self._retrieve_day(report_name=report_name,
+                                                                     file_format=file_format,
+                                                                     bypass_cache=bypass_cache,
+                                                                     settlement_date=settlement_date))
     
     
     async def retrieve_data(self,
                             period: str,
                             report_name: str, 
                             settlement_date: str, 
-                            file_format: str = 'xml'
-                            ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+                            file_format: Optional[str] = None,
+                            bypass_cache: Optional[bool] = None
+                            ) -> Union[dict[str, Any], pd.DataFrame, None]:
         """
         Retrieves BMRS data for a specific period and report asynchronously.
 
@@ -115,18 +588,89 @@ class ServiceBmrsDataRetriever:
             period: The specific period number for which the data needs to be fetched.
             report_name: The identifier for the specific report to be fetched.
             settlement_date: The date for which the data needs to be fetched in the format 'YYYY-MM-DD'.
-            file_format: The format in which the response is expected. Can be either 'csv' or 'xml'. Default is 'xml'.
+            file_format: The format in which the response is expected. Can be either 'csv' or 'xml'. 
+                         Defaults to the retriever's service_type.
+            bypass_cache: If True the response cache is not read, although the fresh item is still stored in it.
+                          Defaults to the retriever's bypass_cache setting.
 
         Returns:
-            A dictionary containing data for the specified period. If the data consists of multiple items, a list of 
-            dictionaries is returned.
+            For 'xml', a dictionary containing data for the specified period. For 'csv', a typed DataFrame holding 
+            the last row of each period in the response. None if no data is available.
+            
+        Concurrent calls for the same (report_name, settlement_date, period, file_format) share a single
+        in-flight fetch and receive the same parsed result.
+        """
+        
+        file_format = file_format if file_format else self.service_type
+        bypass_cache = self.bypass_cache if bypass_cache is None else bypass_cache
+        
+        item = await self._retrieve_period(period=period,
+                                           report_name=report_name,
+                                           file_format=file_format,
+                                           bypass_cache=bypass_cache,
+                                           settlement_date=settlement_date)
+        return None if item is _FAILED else item
+    
+    
+    async def _retrieve_period(self,
+                               period: str,
+                               report_name: str, 
+                               settlement_date: str, 
+                               file_format: str,
+                               bypass_cache: bool) -> Any:
+        """
+        Coalesced fetch of a single period, returning _FAILED if the request failed.
+        """
+        
+        return await self._coalesce(key=(report_name, settlement_date, str(period), file_format, bypass_cache),
+                                    fetch=lambda: self._retrieve_data(period=period,
+                                                                      report_name=report_name,
+                                                                      file_format=file_format,
+                                                                      bypass_cache=bypass_cache,
+                                                                      settlement_date=settlement_date))
+    
+    
+    async def _coalesce(self,
+                        key: tuple,
+                        fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs fetch once for all concurrent callers using the same key, returning its result to each of them.
+        """
+        
+        loop = asyncio.get_running_loop()
+        
+        # Joining an identical fetch already running on this event loop.
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and not in_flight.done() and in_flight.get_loop() is loop:
+            self.coalesced_count += 1
+            return await asyncio.shield(in_flight)
+        
+        # The fetch runs as its own task, so a cancelled caller does not cancel it for the others.
+        task = loop.create_task(fetch())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done_task: self._in_flight.pop(key, None) 
+                                                if self._in_flight.get(key) is done_task else None)
+        
+        return await asyncio.shield(task)
+    
+    
+    async def _retrieve_data(self,
+                             period: str,
+                             report_name: str, 
+                             settlement_date: str, 
+                             file_format: str,
+                             bypass_cache: bool
+                             ) -> Union[dict[str, Any], pd.DataFrame, None]:
+        """
+        Fetches and parses BMRS data for a specific period and report, returning _FAILED if the
+        request failed. Callers should use retrieve_data, which coalesces identical concurrent requests.
         """
         
         # Ensuring that the file format is valid.
         if file_format not in ['csv', 'xml']:
             logger.error(f"{self.__class__.__name__}:Invalid file format '{file_format}'. "
                          "Allowed values are 'csv' and 'xml'.")
-            return
+            return _FAILED
 
         # Constructing the URL.
         url = self.service_build_url.build_url(period=period,
@@ -135,51 +679,266 @@ class ServiceBmrsDataRetriever:
                                                settlement_date=settlement_date)
         
         if not url: 
+            return _FAILED
+        
+        # Serving the item from the persistent cache when possible.
+        if self.response_cache is not None and not bypass_cache:
+            found, cached_item = await self._run_cache(self.response_cache.get,
+                                                       period=period,
+                                                       report_name=report_name,
+                                                       service_type=file_format,
+                                                       settlement_date=settlement_date,
+                                                       fields=self.registry.get_fields(report_name=report_name))
+            if found:
+                return cached_item
+        
+        fetched, items = await self._fetch(url=url, report_name=report_name, file_format=file_format)
+        if not fetched:
+            return _FAILED
+        
+        if isinstance(items, pd.DataFrame):
+            # Keeping the last row of each period, in line with the XML items.
+            item = items.drop_duplicates(subset='settlementPeriod', keep='last') \
+                                        .reset_index(drop=True) if not items.empty else None
+        else:
+            # A response without items means no data has been published for this period.
+            # If there are several items, return the last one.
+            # Assumption: The last item is the most relevant, but this could be tailored based on requirements.
+            item = items[-1] if items else None
+
+        if self.response_cache is not None:
+            await self._run_cache(self.response_cache.put,
+                                  item=item,
+                                  period=period,
+                                  report_name=report_name,
+                                  service_type=file_format,
+                                  settlement_date=settlement_date,
+                                  fields=self.registry.get_fields(report_name=report_name))
+        return item
+    
+    
+    async def _retrieve_day(self,
+                            report_name: str,
+                            settlement_date: str,
+                            file_format: str,
+                            bypass_cache: bool
+                            ) -> Optional[dict[int, Union[dict[str, Any], pd.DataFrame]]]:
+        """
+        Fetches every period of a report and day in one request and splits the items into periods.
+        Callers should use retrieve_day, which coalesces identical concurrent requests.
+        """
+        
+        url = self.service_build_url.build_url(period='*',
+                                               report_name=report_name,
+                                               service_type=file_format,
+                                               settlement_date=settlement_date)
+        if not url:
             return None
         
-        # Creating an SSL context
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+        # Serving the day from the persistent cache when all of its periods are known.
+        if self.response_cache is not None and not bypass_cache:
+            cached_items = await self._run_cache(self.response_cache.get_day,
+                                                 report_name=report_name,
+                                                 service_type=file_format,
+                                                 settlement_date=settlement_date,
+                                                 fields=self.registry.get_fields(report_name=report_name))
+            if cached_items is not None:
+                return cached_items
+        
+        fetched, items = await self._fetch(url=url, report_name=report_name, file_format=file_format)
+        if not fetched:
+            return None
+        
+        # Splitting the day into periods, keeping the last item of each period.
+        if isinstance(items, pd.DataFrame):
+            day_items = {int(period): period_rows.reset_index(drop=True)
+                         for period, period_rows in items.drop_duplicates(subset='settlementPeriod', keep='last')
+                                                         .groupby('settlementPeriod')} if not items.empty else {}
+        else:
+            day_items = {}
+            for item in items:
+                try:
+                    day_items[int(item['settlementPeriod'])] = item
+                except (KeyError, TypeError, ValueError):
+                    logger.warning(f"{self.__class__.__name__}: Skipping {report_name} item without a valid settlementPeriod.")
+        
+        # Caching each period in one transaction, plus the list of the day's periods if none is missing.
+        if self.response_cache is not None:
+            await self._run_cache(self.response_cache.put_day,
+                                  items=day_items,
+                                  report_name=report_name,
+                                  service_type=file_format,
+                                  settlement_date=settlement_date,
+                                  fields=self.registry.get_fields(report_name=report_name),
+                                  period_count=self.get_period_count(report_name=report_name,
+                                                                     settlement_date=settlement_date))
+        
+        return day_items
+    
+    
+    async def _run_cache(self,
+                         method: Callable[..., _T],
+                         **kwargs: Any) -> _T:
+        """
+        Runs a call of the response cache on its worker thread, so SQLite reads and commits never block the event loop.
+        """
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.response_cache.executor, functools.partial(method, **kwargs))
+    
+    
+    async def _fetch(self,
+                     url: str,
+                     report_name: str,
+                     file_format: str) -> tuple[bool, Union[list[dict[str, Any]], pd.DataFrame, None]]:
+        """
+        Requests a URL within the shared concurrency budget and rate limit, retrying failed attempts,
+        and parses the response body.
 
-        # Setting a timeout for the request.
-        timeout = ClientTimeout(total=self.timeout)
-        for attempt in range(self.max_retries):
-            try:
-                async with ClientSession(timeout=timeout) as session:
-                    response = await session.get(url, ssl=ssl_context)
+        Returns:
+            A tuple of (fetched, items). fetched is False if the request failed; otherwise items holds every
+            parsed item (a list of dictionaries for 'xml', a DataFrame for 'csv' or when parsing is offloaded).
+        """
+        
+        self.retry_policy.on_request()
+        labels = {'report': report_name, 'format': file_format}
+        
+        # The session is acquired once so that retries reuse the pooled connections.
+        async with self.session_scope() as session:
+            attempt = 0
+            throttled_count = 0
+            while attempt < self.retry_policy.max_attempts and throttled_count < self.max_throttled_tries:
+                try:
+                    # Waiting for the shared rate limiter before every attempt, without holding a concurrency slot.
+                    with self.metrics.timer('rate_limiter_wait_seconds', **labels):
+                        await self.rate_limiter.acquire()
+                    
+                    # The concurrency slot is only held while a request is in flight, not during backoffs.
+                    queued_at = time.perf_counter()
+                    async with self._semaphore:
+                        self.metrics.observe('semaphore_wait_seconds', time.perf_counter() - queued_at, **labels)
+                        
+                        self.request_count += 1
+                        sent_at = time.perf_counter()
+                        parse_time = 0.0
+                        validated = self._validators.get(url) if self.conditional_requests else None
+                        async with session.get(url, headers=validated[0] if validated else None) as response:
+                            self.metrics.increment('requests_total', status=str(response.status), **labels)
+                            
+                            # If unchanged since the last request, reuse its items without downloading or parsing.
+                            if response.status == 304 and validated:
+                                self.not_modified_count += 1
+                                self.rate_limiter.on_success()
+                                self._validators.move_to_end(url)
+                                self.metrics.observe('request_seconds', time.perf_counter() - sent_at, **labels)
+                                return True, validated[1]
+                            
+                            # If rate limited, slow down every in-flight request and retry once the limiter allows it,
+                            # without using up an attempt.
+                            if response.status == 429:
+                                self.metrics.increment('throttled_total', **labels)
+                                self.rate_limiter.on_throttled(retry_after=response.headers.get('Retry-After'))
+                                throttled_count += 1
+                                continue
+
+                            # If any other non-successful HTTP status code, raise an exception.
+                            response.raise_for_status()  
+                            
+                            if self.cpu_offload is not None:
+                                # The raw body is parsed in a worker process once the concurrency slot is released.
+                                content = await response.read()
+                                response_bytes = len(content)
+                            elif file_format == 'csv':
+                                # CSV bodies are parsed in bulk into typed columns.
+                                content = await response.read()
+                                response_bytes = len(content)
+                                parse_start = time.perf_counter()
+                                items = self.csv_converter.convert(report_name=report_name, content=content)
+                                parse_time = time.perf_counter() - parse_start
+                            else:
+                                # Parsing the body as it streams in, so only the wanted fields of each item are kept.
+                                parser = self.xml_converter.create_parser(report_name=report_name)
+                                response_bytes = 0
+                                async for chunk in response.content.iter_chunked(self.READ_CHUNK_SIZE):
+                                    response_bytes += len(chunk)
+                                    parse_start = time.perf_counter()
+                                    parser.feed(chunk)
+                                    parse_time += time.perf_counter() - parse_start
+                                parse_start = time.perf_counter()
+                                items = parser.close()
+                                parse_time += time.perf_counter() - parse_start
+                            self.rate_limiter.on_success()
+                        
+                        # Request latency covers sending and downloading, excluding the time spent parsing.
+                        self.metrics.observe('request_seconds', time.perf_counter() - sent_at - parse_time, **labels)
+                    
+                    if self.cpu_offload is not None:
+                        parse_start = time.perf_counter()
+                        items = await self._parse_offloaded(report_name=report_name,
+                                                            file_format=file_format,
+                                                            content=content)
+                        parse_time = time.perf_counter() - parse_start
+                    self.metrics.observe('parse_seconds', parse_time, **labels)
+                    self.metrics.increment('response_bytes_total', response_bytes, **labels)
                     
-                    # If rate limited, log it, sleep for specified time, and retry.
-                    if response.status == 429:
-                        logger.warning(f"{self.__class__.__name__}: Rate limit hit. Sleeping for 30 seconds.")
-                        await asyncio.sleep(self.rate_limit_sleep_time)
-                        continue
-
-                    # If any other non-successful HTTP status code, raise an exception.
-                    response.raise_for_status()  
-                    content_str = await response.text()
-                    if not content_str.strip():
-                        pass
-                    content_data = xmltodict.parse(content_str)
-                    items = content_data['response']['responseBody']['responseList']['item']
-                    # Handling various types of returned data.
-                    if isinstance(items, dict): 
-                        return items
-                    elif isinstance(items, list):
-                        # If it's a list, return the last item. 
-                        # Assumption: The last item is the most relevant, but this could be tailored based on requirements.
-                        return items[-1]
-                    else:
-                        logger.error(f"{self.__class__.__name__}: Unexpected type for 'items' in XML structure.")
-                        return None
-
-            except ClientResponseError as e:
-                logger.warning(f"{self.__class__.__name__}: Error on attempt {attempt + 1} - {e}.")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(1)  
-                else:
-                    logger.error(f"{self.__class__.__name__}: Max retries reached. Giving up on {url}.")
-            except Exception as unexpected_e:
-                if 'responseBody' not in str(unexpected_e):
-                    logger.error(f"{self.__class__.__name__}: Unexpected error: {unexpected_e}")
-                return
\ No newline at end of file
+                    if self.conditional_requests and items is not None:
+                        self._store_validators(url=url, headers=response.headers, items=items)
+
+                    return items is not None, items
+
+                except Exception as e:
+                    delay = self.retry_policy.get_retry_delay(error=e, attempt=attempt)
+                    if delay is None:
+                        self.metrics.increment('failed_requests_total', error=type(e).__name__, **labels)
+                        logger.error(f"{self.__class__.__name__}: Giving up on {url} after attempt {attempt + 1} - "
+                                     f"{type(e).__name__}: {e}")
+                        return False, None
+                    
+                    self.metrics.increment('retries_total', error=type(e).__name__, **labels)
+                    logger.warning(f"{self.__class__.__name__}: Error on attempt {attempt + 1} - "
+                                   f"{type(e).__name__}: {e}. Retrying in {delay:.2f} seconds.")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+
+        error = 'Throttled' if throttled_count >= self.max_throttled_tries else 'MaxRetries'
+        self.metrics.increment('failed_requests_total', error=error, **labels)
+        logger.error(f"{self.__class__.__name__}: Max retries reached after {throttled_count} rate-limited attempts. "
+                     f"Giving up on {url}.")
+        return False, None
+    
+    
+    def _store_validators(self,
+                          url: str,
+                          headers: Any,
+                          items: Any) -> None:
+        """
+        Keeps the validators of a response with its parsed items, evicting the least recently used URL
+        once max_validators are held.
+        """
+        
+        validators = {}
+        if headers.get('ETag'):
+            validators['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = headers['Last-Modified']
+        if not validators:
+            return
+        
+        self._validators[url] = (validators, items)
+        self._validators.move_to_end(url)
+        while len(self._validators) > self.max_validators:
+            self._validators.popitem(last=False)
+    
+    
+    async def _parse_offloaded(self,
+                               report_name: str,
+                               file_format: str,
+                               content: bytes) -> Optional[pd.DataFrame]:
+        """
+        Parses a raw response body into typed columns in a worker process of cpu_offload
+        and frames them, without creating a dictionary per item on the event loop.
+        """
+        
+        converter = self.csv_converter if file_format == 'csv' else self.xml_converter
+        columns = await self.cpu_offload.run(converter.convert_columns, report_name=report_name, content=content)
+        return pd.DataFrame(columns) if columns is not None else None
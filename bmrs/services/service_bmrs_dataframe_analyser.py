@@ -1,107 +1,78 @@
 import pandas as pd
 
+from typing import Optional
+
 from bmrs.services import logger
-from bmrs.decorators.decorator_report_column_headers_required import \
-                                        report_column_headers_required
+from bmrs.objects.object_imbalance_summary import ObjectImbalanceSummary
+from bmrs.services.service_bmrs_incremental_analyser import ServiceBmrsIncrementalAnalyser
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
 
 
 class ServiceBmrsDataframeAnalyser:
     
     
-    @report_column_headers_required
     def __init__(self, 
-                 b1770_column: str, 
-                 b1780_column: str) -> None:
-        # Initializing the columns for the reports B1770 and B1780
-        self.b1770_column = b1770_column
-        self.b1780_column = b1780_column
+                 registry: Optional[RegistryReports] = None) -> None:
+        # Value columns and reported aggregations of every report.
+        self.registry = registry if registry else get_default_registry()
         
         
     def calculate_imbalances(self,
                         report_name: str,
-                        report_ts_dataframe: pd.DataFrame) -> pd.DataFrame:
+                        report_ts_dataframe: pd.DataFrame) -> Optional[list[ObjectImbalanceSummary]]:
         """
-        Print a formatted statement based on the provided report name and dataframe.
+        Summarises each settlement date of a report's time series with the aggregations registered
+        for the report, e.g. the total daily imbalance cost of B1770 or the daily imbalance unit rate
+        and peak hour of B1780, and logs every aggregate with its registered message.
 
         Args:
-        - report_name (str): Name of the report, either 'B1770' or 'B1780'.
+        - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
         - report_ts_dataframe (pd.DataFrame): Timeseries dataframe of the report data.
-        
-        Logic:
-        For B1770:
-        - `total_daily_imbalance_cost` is computed by summing up all the values 
-        under the column specified by `b1770_column`.
 
-        For B1780:
-        - First, the `sum_of_imbalances` is calculated by summing up all the values 
-        under the column specified by `b1780_column`.
-        - `daily_imbalance_unit_rate` is then derived by dividing the `sum_of_imbalances`
-        by the number of entries (rows) in the dataframe. This gives the average
-        imbalance per unit time for that day.
+        Returns one ObjectImbalanceSummary per settlement date in the dataframe, in date order, holding
+        the aggregates by name. None if the report is not registered.
         """
         
-        # Get the first datetime index from the DataFrame
-        first_datetime_index = report_ts_dataframe.index[0]
-
-        # Format the datetime to a pretty string ('dd-mm-yyyy')
-        pretty_date = self.get_pretty_date(timestamp=first_datetime_index)
-
-        # Handle calculations for report B1770
-        if report_name == 'B1770':
-            column_name = self.b1770_column
-            total_daily_imbalance_cost = report_ts_dataframe[column_name].sum()
-            logger.info(f"{self.__class__.__name__}: {pretty_date} total daily imbalance cost £{total_daily_imbalance_cost:.2f}")
-
-        # Handle calculations for report B1780
-        elif report_name == 'B1780':
-            column_name = self.b1780_column
-            sum_of_imbalances = report_ts_dataframe[column_name].sum()
-            daily_imbalance_unit_rate = sum_of_imbalances / len(report_ts_dataframe)
-            logger.info(f"{self.__class__.__name__}: {pretty_date} daily imbalance unit rate {daily_imbalance_unit_rate:.2f} Mwh")
-            
-            # Calculate absolute imbalance volumes
-            self._calculate_absolute_imbalance_volumes(column=column_name,
-                                                       volumes_ts_dataframe=report_ts_dataframe)
-            
-            return report_ts_dataframe
-            
-            
-        else:
-            logger.error(f"{self.__class__.__name__}: Invalid report name provided: {report_name}")
+        definition = self.registry.get(report_name=report_name)
+        if definition is None:
             return None
+        column_name = definition.value_columns[0]
         
+        # Fold the whole dataframe into a fresh aggregator to compute its daily metrics
+        summaries = ServiceBmrsIncrementalAnalyser(registry=self.registry).update(column=column_name,
+                                                            report_name=report_name,
+                                                            report_ts_dataframe=report_ts_dataframe)
         
-    def _calculate_absolute_imbalance_volumes(self,
-                                              column: str,
-                                              volumes_ts_dataframe: pd.DataFrame)-> pd.DataFrame:
-        
+        for summary in summaries:
+            self.log_summary(summary=summary)
+            
+        return summaries
+    
+    
+    def log_summary(self,
+                    summary: ObjectImbalanceSummary) -> None:
         """
-        Calculate and return the hour with the highest absolute imbalance volume.
-
-        Logic:
-        - The absolute value of each imbalance is computed to represent the magnitude without considering 
-          direction (positive or negative).
-        - The dataframe is resampled on an hourly basis, and the absolute imbalances are aggregated to provide
-           the total absolute imbalance for each hour.
-        - The hour with the maximum absolute imbalance is identified. This is significant as it indicates the
-           period with the highest deviation from equilibrium.
+        Logs each aggregate of a summary with the message its report registers for it.
 
         Args:
-        - column (str): The name of the column in the dataframe that represents the imbalance values.
-        - volumes_ts
+        - summary (ObjectImbalanceSummary): The metrics of one report over one settlement date.
         """
-        # Calculate absolute imbalance for each entry
-        volumes_ts_dataframe.loc[:, 'AbsoluteImbalance'] = volumes_ts_dataframe[column].abs()
         
-        # Resample to hourly data and sum the absolute imbalances
-        hourly_abs_imbalance = volumes_ts_dataframe.resample('H').sum()['AbsoluteImbalance']
-        # Identify the hour with the maximum absolute imbalance
-        max_hour = hourly_abs_imbalance.idxmax()
+        definition = self.registry.get(report_name=summary.report_name)
+        if definition is None:
+            return
         
-        pretty_date = self.get_pretty_date(timestamp=max_hour, granularity='HH')
-        logger.info(f"{self.__class__.__name__}: {pretty_date} highest absolute hourly imbalance volume occured at {pretty_date}")
+        # Format the datetime to a pretty string ('dd-mm-yyyy')
+        pretty_date = self.get_pretty_date(timestamp=summary.settlement_date)
         
-        return volumes_ts_dataframe
+        # Log each aggregation the report registers, e.g. the total daily imbalance cost of B1770
+        for name, aggregation in definition.aggregations.items():
+            value = summary.aggregates.get(name)
+            if value is None:
+                continue
+            if isinstance(value, pd.Timestamp):
+                value = self.get_pretty_date(timestamp=value, granularity='HH')
+            logger.info(f"{self.__class__.__name__}: {pretty_date} {aggregation.message.format(value=value)}")
    
    
     def get_pretty_date(self,
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Union, AsyncIterator
+
+from bmrs.services import logger
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+from bmrs.objects.object_period_records import ObjectPeriodRecords
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar, get_default_calendar
+
+
+class ServiceBmrsGapIndex:
+    """
+    A service computing exactly which (report, date, period) slots are missing or stale against the
+    settlement calendar, i.e. 48 periods a day, 46 and 50 on the clock-change days, and refetching only those.
+
+    A slot is missing when no row holds it and stale when its row has no value, e.g. a period stored
+    before it was published. Missing periods are left as gaps by the pipelines rather than filled in,
+    so a nightly reconciliation costs a request per gapped day instead of re-pulling whole ranges:
+
+        async for report_name, settlement_date, report_output in gap_index.reconcile(reports=['B1770'],
+                                                                                     start_date='2023-11-01',
+                                                                                     end_date='2023-11-30'):
+            ...
+    """
+
+    def __init__(self,
+                 data_retriever: Optional[ServiceBmrsDataRetriever] = None,
+                 parquet_store: Optional[ServiceBmrsParquetStore] = None,
+                 registry: Optional[RegistryReports] = None,
+                 calendar: Optional[ServiceSettlementCalendar] = None) -> None:
+        # Using dependency injection to allow a preconfigured retriever.
+        self.data_retriever = data_retriever if data_retriever else ServiceBmrsDataRetriever()
+        # The store reconciled against the calendar.
+        self.parquet_store = parquet_store if parquet_store else ServiceBmrsParquetStore()
+        # Value columns and period granularity of every report.
+        self.registry = registry if registry else get_default_registry()
+        # Number of periods and start time of every settlement date.
+        self.calendar = calendar if calendar else get_default_calendar()
+
+
+    def get_expected_periods(self,
+                             report_name: str,
+                             settlement_date: Union[str, date],
+                             now: Optional[datetime] = None) -> list[int]:
+        """
+        Returns the periods of a report and date that should be published, i.e. those that have ended by now.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            settlement_date: The settlement date, as a date or in the format 'YYYY-MM-DD'.
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        definition = self.registry.get(report_name=report_name)
+        granularity = definition.granularity if definition is not None else '30min'
+        return list(range(1, self.calendar.get_ended_period_count(settlement_date=settlement_date,
+                                                                  granularity=granularity,
+                                                                  now=now) + 1))
+
+
+    def find_gaps(self,
+                  report_name: str,
+                  settlement_date: str,
+                  report_output: Union[ObjectPeriodRecords, pd.DataFrame, list[dict], dict[int, Any], None],
+                  now: Optional[datetime] = None) -> list[int]:
+        """
+        Returns the expected periods of a report and date that are missing from retrieved data or have no value.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            settlement_date (str): The settlement date in the format 'YYYY-MM-DD'.
+            report_output: The retrieved data, as returned by retrieve_all_data or retrieve_periods.
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        value_columns = self.registry.get_value_columns(report_name=report_name)
+        if value_columns is None:
+            return []
+
+        if isinstance(report_output, dict):
+            report_output = list(report_output.values())
+        if not isinstance(report_output, ObjectPeriodRecords):
+            report_output = ObjectPeriodRecords.from_items(report_name=report_name,
+                                                           items=report_output if report_output is not None else [],
+                                                           value_columns=value_columns)
+
+        # A period is present when a row of the date holds every value column.
+        present = (report_output.settlement_dates == np.datetime64(settlement_date, 'D'))
+        for column in value_columns:
+            present &= ~np.isnan(report_output.values[column])
+        present_periods = set(report_output.settlement_periods[present].tolist())
+
+        return [period for period in self.get_expected_periods(report_name=report_name,
+                                                               settlement_date=settlement_date,
+                                                               now=now)
+                if period not in present_periods]
+
+
+    def find_stored_gaps(self,
+                         reports: Iterable[str],
+                         start_date: str,
+                         end_date: str,
+                         now: Optional[datetime] = None) -> dict[tuple[str, str], list[int]]:
+        """
+        Returns the missing or stale periods of every report and settlement date of the store between
+        start_date and end_date (inclusive), leaving out the days without gaps.
+
+        Args:
+            reports: The reports to reconcile, e.g. ['B1770', 'B1780'].
+            start_date (str): The first settlement date in the format 'YYYY-MM-DD'.
+            end_date (str): The last settlement date in the format 'YYYY-MM-DD'.
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        settlement_dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        gaps = {}
+
+        for report_name in reports:
+            definition = self.registry.get(report_name=report_name)
+            if definition is None:
+                continue
+            granularity = definition.granularity
+
+            stored = None
+            if (self.parquet_store.root / f"report={report_name}").exists():
+                # Reading from the start of the first date until just before the start of the day after the last.
+                bounds = self.calendar.to_timestamps(granularity=granularity,
+                                                     settlement_dates=settlement_dates[[0, -1]],
+                                                     settlement_periods=[1, self.calendar.get_period_count(
+                                                                                settlement_date=settlement_dates[-1],
+                                                                                granularity=granularity) + 1])
+                stored = self.parquet_store.read(report_name=report_name,
+                                                 start=bounds[0],
+                                                 end=bounds[1] - pd.Timedelta(1, 'ns'),
+                                                 columns=list(definition.value_columns))
+
+            # Mapping the stored rows back to their settlement date and period through the calendar.
+            present = {}
+            if stored is not None and not stored.empty:
+                stored = stored.dropna()
+                days, periods = self.calendar.to_settlement_periods(timestamps=stored.index, granularity=granularity)
+                for day, period in zip(np.datetime_as_string(days), periods.tolist()):
+                    present.setdefault(day, set()).add(period)
+
+            for settlement_date in settlement_dates.strftime('%Y-%m-%d'):
+                missing = [period for period in self.get_expected_periods(report_name=report_name,
+                                                                          settlement_date=settlement_date,
+                                                                          now=now)
+                           if period not in present.get(settlement_date, ())]
+                if missing:
+                    gaps[(report_name, settlement_date)] = missing
+
+        logger.info(f"{self.__class__.__name__}: {sum(map(len, gaps.values()))} missing or stale periods "
+                    f"over {len(gaps)} report days")
+        return gaps
+
+
+    async def reconcile(self,
+                        reports: Iterable[str],
+                        start_date: str,
+                        end_date: str,
+                        now: Optional[datetime] = None) -> AsyncIterator[tuple[str, str, Any]]:
+        """
+        Finds the gaps of the store between start_date and end_date (inclusive) and refetches only
+        those periods, yielding each (report_name, settlement_date, report_output) as its day completes.
+
+        Args:
+            reports: The reports to reconcile, e.g. ['B1770', 'B1780'].
+            start_date (str): The first settlement date in the format 'YYYY-MM-DD'.
+            end_date (str): The last settlement date in the format 'YYYY-MM-DD'.
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        gaps = self.find_stored_gaps(reports=reports, start_date=start_date, end_date=end_date, now=now)
+        async for result in self.refetch(gaps=gaps):
+            yield result
+
+
+    async def refetch(self,
+                      gaps: dict[tuple[str, str], list[int]]) -> AsyncIterator[tuple[str, str, Any]]:
+        """
+        Retrieves the given periods of every (report_name, settlement_date) concurrently, bypassing the
+        response cache, and yields each (report_name, settlement_date, report_output) as its day completes.
+        The output only covers the refetched periods.
+
+        Args:
+            gaps: The periods to refetch, keyed by (report_name, settlement_date), as returned by find_stored_gaps.
+        """
+
+        if not gaps:
+            return
+
+        async def retrieve_day(report_name: str,
+                               settlement_date: str,
+                               periods: list[int]) -> tuple[str, str, Any]:
+            results = await self.data_retriever.retrieve_periods(periods=periods,
+                                                                 bypass_cache=True,
+                                                                 report_name=report_name,
+                                                                 settlement_date=settlement_date)
+            # Periods still unpublished come back as None and stay gaps until the next reconciliation.
+            results = {period: item for period, item in results.items() if item is not None}
+            return report_name, settlement_date, self.data_retriever.merge_periods(results=results,
+                                                                                   report_name=report_name)
+
+        async for result in self.data_retriever.retrieve_concurrently(
+                                        days=[retrieve_day(report_name, settlement_date, periods)
+                                              for (report_name, settlement_date), periods in gaps.items()],
+                                        description=f"{sum(map(len, gaps.values()))} periods over "
+                                                    f"{len(gaps)} report days"):
+            yield result
@@ -0,0 +1,175 @@
+import math
+import pandas as pd
+
+from typing import Optional
+
+from bmrs.objects.object_imbalance_summary import ObjectImbalanceSummary
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry, get_hourly_absolute
+
+
+class ServiceBmrsIncrementalAnalyser:
+    """
+    An incremental aggregator of the daily metrics of each report.
+
+    New or restated settlement periods are folded into the values held for their settlement date,
+    a restated period replacing its previous value. Only the dates an update touches are summarised
+    again, by applying the aggregations registered for the report to their values, so each update
+    costs O(new periods) plus at most 50 periods per touched date, rather than O(history).
+
+    Only the dates within `retention_days` of the latest folded date are held, so a long stream or
+    live session keeps a bounded window. Periods of dates older than the window are no longer folded.
+    """
+
+
+    def __init__(self,
+                 registry: Optional[RegistryReports] = None,
+                 retention_days: int = 7) -> None:
+        # Value columns of every report.
+        self.registry = registry if registry else get_default_registry()
+        # Dates more than this many days before the latest folded date of a report are evicted.
+        self.retention_days = retention_days
+        # Per report and settlement date: the value of every folded period, keyed by its timestamp.
+        self._period_values: dict[str, dict[pd.Timestamp, dict[pd.Timestamp, float]]] = {}
+        # Per report: the latest settlement date folded so far.
+        self._latest_dates: dict[str, pd.Timestamp] = {}
+
+
+    def update(self,
+               report_name: str,
+               report_ts_dataframe: pd.DataFrame,
+               column: Optional[str] = None) -> list[ObjectImbalanceSummary]:
+        """
+        Folds new or restated settlement periods into the running aggregates.
+
+        Args:
+        - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        - report_ts_dataframe (pd.DataFrame): Timeseries dataframe holding only the new periods.
+        - column (str): The value column to aggregate. Defaults to the report's first registered value column.
+
+        Returns the summaries of every settlement date touched by the update, in date order. Periods of
+        dates that had already gone past the retention window are left out.
+        """
+
+        column_name = column if column else self.get_column(report_name=report_name)
+        if column_name is None:
+            return []
+
+        period_values = self._period_values.setdefault(report_name, {})
+        cutoff_date = self._get_cutoff_date(report_name=report_name)
+        touched_dates = set()
+
+        for timestamp, value in zip(report_ts_dataframe.index, report_ts_dataframe[column_name].to_numpy()):
+            if value is None or math.isnan(value):
+                continue
+
+            # Keyed by the local settlement date; a restated period replaces its previous value.
+            settlement_date = timestamp.normalize().tz_localize(None)
+            if cutoff_date is not None and settlement_date < cutoff_date:
+                continue
+            period_values.setdefault(settlement_date, {})[timestamp] = float(value)
+            touched_dates.add(settlement_date)
+
+        summaries = [self._build_summary(report_name=report_name, settlement_date=settlement_date)
+                     for settlement_date in sorted(touched_dates)]
+
+        if touched_dates:
+            self._latest_dates[report_name] = max(max(touched_dates), self._latest_dates.get(report_name, pd.Timestamp.min))
+            self._evict(report_name=report_name)
+        return summaries
+
+
+    def get_summary(self,
+                    report_name: str,
+                    settlement_date: str) -> Optional[ObjectImbalanceSummary]:
+        """
+        Returns the current summary of a report for one settlement date, or None if no periods were folded.
+
+        Args:
+        - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        - settlement_date (str): The settlement date in the format 'YYYY-MM-DD'.
+        """
+
+        settlement_date = pd.Timestamp(settlement_date).normalize()
+        if settlement_date not in self._period_values.get(report_name, {}):
+            return None
+        return self._build_summary(report_name=report_name, settlement_date=settlement_date)
+
+
+    def get_hourly_absolute_imbalances(self,
+                                       report_name: str,
+                                       settlement_date: str) -> pd.Series:
+        """
+        Returns the absolute imbalance of each hour of a settlement date.
+
+        Args:
+        - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        - settlement_date (str): The settlement date in the format 'YYYY-MM-DD'.
+        """
+
+        return get_hourly_absolute(values=self._get_values(report_name=report_name,
+                                                           settlement_date=pd.Timestamp(settlement_date).normalize()))
+
+
+    def get_column(self,
+                   report_name: str) -> Optional[str]:
+        """
+        Returns the first registered value column of a report.
+
+        Args:
+        - report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+        """
+
+        value_columns = self.registry.get_value_columns(report_name=report_name)
+        return value_columns[0] if value_columns else None
+
+
+    def _get_cutoff_date(self,
+                         report_name: str) -> Optional[pd.Timestamp]:
+        """
+        Returns the earliest settlement date of a report still held, or None before any period was folded.
+        """
+
+        latest_date = self._latest_dates.get(report_name)
+        return latest_date - pd.Timedelta(days=self.retention_days) if latest_date is not None else None
+
+
+    def _evict(self,
+               report_name: str) -> None:
+        """
+        Drops the values of the dates of a report that have gone past the retention window.
+        """
+
+        cutoff_date = self._get_cutoff_date(report_name=report_name)
+        period_values = self._period_values.get(report_name, {})
+        for settlement_date in [settlement_date for settlement_date in period_values if settlement_date < cutoff_date]:
+            del period_values[settlement_date]
+
+
+    def _build_summary(self,
+                       report_name: str,
+                       settlement_date: pd.Timestamp) -> ObjectImbalanceSummary:
+        """
+        Builds the summary of a settlement date by applying the report's registered aggregations
+        to the values of its at most 50 periods, independent of the history length.
+        """
+
+        values = self._get_values(report_name=report_name, settlement_date=settlement_date)
+        definition = self.registry.get(report_name=report_name) if report_name in self.registry else None
+        aggregations = definition.aggregations if definition is not None else {}
+
+        return ObjectImbalanceSummary(report_name=report_name,
+                                      settlement_date=settlement_date,
+                                      period_count=len(values),
+                                      aggregates={name: aggregation.apply(values)
+                                                  for name, aggregation in aggregations.items()})
+
+
+    def _get_values(self,
+                    report_name: str,
+                    settlement_date: pd.Timestamp) -> pd.Series:
+        """
+        Returns the folded values of a settlement date, indexed by the start of each period.
+        """
+
+        day_values = self._period_values.get(report_name, {}).get(settlement_date, {})
+        return pd.Series(day_values, dtype=float).sort_index()
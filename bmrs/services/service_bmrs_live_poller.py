@@ -0,0 +1,302 @@
+import asyncio
+import inspect
+import pandas as pd
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Optional, AsyncIterator
+
+from bmrs.services import logger
+from bmrs.objects.object_live_update import ObjectLiveUpdate
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar
+
+
+class ServiceBmrsLivePoller:
+    """
+    A long-running poller tracking the latest published settlement period of each report and
+    pushing newly published periods to its subscribers as ObjectLiveUpdate instances.
+
+    Only the periods after the latest published one that have ended are requested. Once a report is
+    up to date the poller sleeps until publish_delay after the next period boundary, and while an
+    ended period is still unpublished it retries every poll_interval seconds. The retriever sends
+    the validators of earlier responses, so unchanged periods cost a 304 Not Modified and no parse:
+
+        poller = ServiceBmrsLivePoller(reports=['B1770'])
+        poller.subscribe(lambda update: print(update.report_name, update.periods, update.lag_seconds))
+        await poller.run()
+    """
+
+    def __init__(self,
+                 data_retriever: Optional[ServiceBmrsDataRetriever] = None,
+                 reports: Iterable[str] = ('B1770', 'B1780'),
+                 calendar: Optional[ServiceSettlementCalendar] = None,
+                 publish_delay: float = 60.0,
+                 poll_interval: float = 15.0) -> None:
+        # Using dependency injection to allow a preconfigured retriever; the default one sends conditional requests.
+        self.data_retriever = data_retriever if data_retriever else \
+                                ServiceBmrsDataRetriever(conditional_requests=True)
+        self.reports = list(reports)
+        # Number of periods and start time of every settlement date, shared with the retriever by default.
+        self.calendar = calendar if calendar else self.data_retriever.calendar
+        # Seconds after a period ends before it is first requested, as BMRS publishes with a delay.
+        self.publish_delay = publish_delay
+        # Seconds between requests while an ended period is still unpublished.
+        self.poll_interval = poll_interval
+        # The latest published (settlement_date, period) of every report; period 0 when none of the date is.
+        self.latest_periods: dict[str, tuple[str, int]] = {}
+        self._subscribers: list[Callable[[ObjectLiveUpdate], Any]] = []
+        self.poll_count = 0
+        self.update_count = 0
+
+
+    def subscribe(self,
+                  callback: Callable[[ObjectLiveUpdate], Any]) -> Callable[[], None]:
+        """
+        Registers a callback, plain or async, called with every update. Returns a function unsubscribing it.
+        """
+
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+
+    async def updates(self,
+                      max_queue_size: int = 100) -> AsyncIterator[ObjectLiveUpdate]:
+        """
+        Yields the updates published while the generator is consumed, for use alongside run():
+
+            async for update in poller.updates():
+                ...
+
+        At most max_queue_size updates are held for a slow consumer; the oldest are dropped beyond that.
+        """
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+
+        def put(update: ObjectLiveUpdate) -> None:
+            if queue.full():
+                dropped = queue.get_nowait()
+                logger.warning(f"{self.__class__.__name__}: Dropping the {dropped.report_name} update of "
+                               f"{dropped.settlement_date} for a slow consumer")
+            queue.put_nowait(update)
+
+        unsubscribe = self.subscribe(put)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            unsubscribe()
+
+
+    def get_expected_periods(self,
+                             report_name: str,
+                             now: Optional[datetime] = None) -> list[tuple[str, list[int]]]:
+        """
+        Returns the (settlement_date, periods) that have ended by now and are not published yet, i.e. those
+        after the latest published period, across every date up to today. The first call for a report
+        covers the ended periods of the day.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        granularity = self._get_granularity(report_name=report_name)
+        end_date, end_period = self._get_last_ended_period(granularity=granularity, now=now)
+
+        latest = self.latest_periods.get(report_name)
+        if latest is None:
+            # Bootstrapping from the start of the day; earlier days are left to the reconciliation.
+            latest = (end_date, 0)
+        latest_date, latest_period = latest
+
+        # Finishing every day since the latest published period before starting the current one, including
+        # the days a restarted poller missed while it was down.
+        settlement_dates = pd.date_range(start=latest_date, end=end_date, freq='D').strftime('%Y-%m-%d').tolist()
+        period_counts = self.calendar.get_period_counts(settlement_dates=settlement_dates, granularity=granularity)
+        expected = [(settlement_date,
+                     list(range(latest_period + 1 if settlement_date == latest_date else 1,
+                                end_period + 1 if settlement_date == end_date else int(period_count) + 1)))
+                    for settlement_date, period_count in zip(settlement_dates, period_counts)]
+
+        return [(settlement_date, periods) for settlement_date, periods in expected if periods]
+
+
+    def get_next_poll_time(self,
+                           now: Optional[datetime] = None) -> datetime:
+        """
+        Returns when to poll next: poll_interval from now while an ended period is unpublished,
+        otherwise publish_delay after the earliest next period boundary of the reports.
+
+        Args:
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        now = self._get_now(now=now)
+        if any(self.get_expected_periods(report_name=report_name, now=now) for report_name in self.reports):
+            return now + timedelta(seconds=self.poll_interval)
+
+        boundaries = []
+        for report_name in self.reports:
+            granularity = self._get_granularity(report_name=report_name)
+            end_date, end_period = self._get_last_ended_period(granularity=granularity, now=now)
+            # The period in progress ends at the start of the one after it.
+            boundaries.append(self.calendar.to_timestamps(settlement_dates=[end_date],
+                                                          settlement_periods=[end_period + 2],
+                                                          granularity=granularity)[0])
+        return min(boundaries).to_pydatetime().astimezone(timezone.utc) + timedelta(seconds=self.publish_delay)
+
+
+    async def poll(self,
+                   now: Optional[datetime] = None) -> list[ObjectLiveUpdate]:
+        """
+        Requests the expected periods of every report once, publishing and returning the updates.
+
+        Args:
+            now (datetime): The current time. Defaults to the system clock.
+        """
+
+        self.poll_count += 1
+        async with self.data_retriever.session_scope():
+            results = await asyncio.gather(*[self._poll_report(report_name=report_name, now=now)
+                                             for report_name in self.reports])
+
+        updates = [update for report_updates in results for update in report_updates]
+        for update in updates:
+            await self._publish(update=update)
+        return updates
+
+
+    async def run(self,
+                  stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Polls on the schedule of get_next_poll_time until stop_event is set, on one pooled session.
+
+        Args:
+            stop_event (asyncio.Event): Stops the poller when set. Defaults to running until cancelled.
+        """
+
+        stop_event = stop_event if stop_event else asyncio.Event()
+
+        async with self.data_retriever.session_scope():
+            while not stop_event.is_set():
+                try:
+                    await self.poll()
+                except Exception as e:
+                    # A failed poll is retried on the next schedule rather than ending the poller.
+                    logger.error(f"{self.__class__.__name__}: Poll failed - {e}")
+
+                delay = (self.get_next_poll_time() - datetime.now(timezone.utc)).total_seconds()
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
+
+
+    async def _poll_report(self,
+                           report_name: str,
+                           now: Optional[datetime]) -> list[ObjectLiveUpdate]:
+        """
+        Requests the expected periods of one report, advancing its latest period past the periods published in order.
+        """
+
+        granularity = self._get_granularity(report_name=report_name)
+        expected = self.get_expected_periods(report_name=report_name, now=now)
+        if report_name not in self.latest_periods and expected:
+            self.latest_periods[report_name] = (expected[0][0], 0)
+
+        updates = []
+        for settlement_date, periods in expected:
+            # Polling for the latest data, so cached responses of unpublished periods are not read.
+            results = await self.data_retriever.retrieve_periods(periods=periods,
+                                                                 bypass_cache=True,
+                                                                 report_name=report_name,
+                                                                 settlement_date=settlement_date)
+            # Advancing only over the periods published in order, so a late period is polled again
+            # rather than skipped for good once a later one is published.
+            published = {}
+            for period in periods:
+                if results.get(period) is None:
+                    break
+                published[period] = results[period]
+            if not published:
+                break
+
+            latest_period = max(published)
+            self.latest_periods[report_name] = (settlement_date, latest_period)
+
+            received_at = self._get_now(now=now)
+            period_end = self.calendar.to_timestamps(settlement_dates=[settlement_date],
+                                                     settlement_periods=[latest_period + 1],
+                                                     granularity=granularity)[0]
+            lag_seconds = (pd.Timestamp(received_at) - period_end).total_seconds()
+            self.data_retriever.metrics.observe('live_lag_seconds', lag_seconds, report=report_name)
+
+            updates.append(ObjectLiveUpdate(report_name=report_name,
+                                            settlement_date=settlement_date,
+                                            periods=tuple(sorted(published)),
+                                            report_output=self.data_retriever.merge_periods(results=published,
+                                                                                            report_name=report_name),
+                                            received_at=received_at,
+                                            lag_seconds=lag_seconds))
+
+            # A date is published in order, so the next one is only polled once this one is complete.
+            if latest_period < periods[-1]:
+                break
+
+        return updates
+
+
+    async def _publish(self,
+                       update: ObjectLiveUpdate) -> None:
+        """
+        Calls every subscriber with an update, logging rather than raising their errors.
+        """
+
+        self.update_count += 1
+        logger.info(f"{self.__class__.__name__}: {update.report_name} {update.settlement_date} "
+                    f"period {update.latest_period} published, {update.lag_seconds:.0f} seconds after it ended")
+
+        for callback in list(self._subscribers):
+            try:
+                result = callback(update)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"{self.__class__.__name__}: Subscriber {callback!r} failed - {e}")
+
+
+    def _get_granularity(self,
+                         report_name: str) -> str:
+        """
+        Returns the period length of a report, half-hourly when it is not registered.
+        """
+
+        registry = self.data_retriever.registry
+        return registry.get(report_name=report_name).granularity if report_name in registry else '30min'
+
+
+    def _get_last_ended_period(self,
+                               granularity: str,
+                               now: Optional[datetime]) -> tuple[str, int]:
+        """
+        Returns the (settlement_date, period) of the last period ended by now, with period 0 when none of the date has.
+        """
+
+        settlement_dates, periods = self.calendar.to_settlement_periods(timestamps=[pd.Timestamp(self._get_now(now=now))],
+                                                                        granularity=granularity)
+        return str(settlement_dates[0]), int(periods[0]) - 1
+
+
+    @staticmethod
+    def _get_now(now: Optional[datetime]) -> datetime:
+        """
+        Returns now as a timezone-aware datetime, defaulting to the system clock.
+        """
+
+        now = now if now else datetime.now(timezone.utc)
+        return now if now.tzinfo is not None else now.replace(tzinfo=timezone.utc)
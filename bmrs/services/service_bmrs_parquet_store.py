@@ -0,0 +1,167 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from typing import Optional, Union
+
+from bmrs.services import logger
+
+
+class ServiceBmrsParquetStore:
+    """
+    A columnar time-series store persisting converted report DataFrames as Parquet files
+    partitioned by report, year and month (report=B1770/year=2023/month=11/data.parquet).
+    Series are stored with their timezone-aware Europe/London index, as converted with the
+    settlement calendar, so the repeated hour of the autumn clock change keeps its own rows.
+
+    Writes upsert on the datetime index, so restated periods replace previously stored
+    values. Reads prune partitions and push the date range predicate down to Parquet,
+    loading only the requested columns.
+    """
+
+    DEFAULT_ROOT = Path(__file__).resolve().parent.parent.parent / 'bmrs_store'
+    INDEX_COLUMN = 'datetime'
+    FILE_NAME = 'data.parquet'
+
+
+    def __init__(self,
+                 root: Union[str, Path, None] = None) -> None:
+        self.root = Path(root if root else self.DEFAULT_ROOT)
+
+
+    def write(self,
+              report_name: str,
+              report_ts_dataframe: pd.DataFrame) -> int:
+        """
+        Upserts a report time series into its monthly partitions.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            report_ts_dataframe (pd.DataFrame): Timeseries dataframe of the report data indexed by timezone-aware datetime.
+
+        Returns:
+            The number of rows written.
+        """
+
+        if report_ts_dataframe is None or report_ts_dataframe.empty:
+            return 0
+
+        if not isinstance(report_ts_dataframe.index, pd.DatetimeIndex) or report_ts_dataframe.index.tz is None:
+            logger.error(f"{self.__class__.__name__}: {report_name} dataframe must be indexed by timezone-aware datetime")
+            return 0
+
+        frame = report_ts_dataframe.rename_axis(self.INDEX_COLUMN).reset_index()
+        months = frame[self.INDEX_COLUMN].dt.year * 100 + frame[self.INDEX_COLUMN].dt.month
+
+        rows_written = 0
+        for year_month, month_frame in frame.groupby(months, sort=True):
+            partition = self._get_partition_path(report_name=report_name,
+                                                 year=year_month // 100,
+                                                 month=year_month % 100)
+            file_path = partition / self.FILE_NAME
+
+            # Restated periods replace the stored rows that share their datetime.
+            if file_path.exists():
+                stored = pq.read_table(file_path).to_pandas()
+                stored = stored[~stored[self.INDEX_COLUMN].isin(month_frame[self.INDEX_COLUMN])]
+                month_frame = pd.concat([stored, month_frame], ignore_index=True)
+
+            month_frame = month_frame.sort_values(self.INDEX_COLUMN, ignore_index=True)
+
+            # Writing to a temporary file first so readers never see a partially written partition.
+            partition.mkdir(parents=True, exist_ok=True)
+            temp_path = partition / f".{self.FILE_NAME}.tmp"
+            pq.write_table(pa.Table.from_pandas(month_frame, preserve_index=False), temp_path)
+            os.replace(temp_path, file_path)
+            rows_written += len(month_frame)
+
+        logger.info(f"{self.__class__.__name__}: {report_name} - {len(frame)} rows upserted into {self.root}")
+        return rows_written
+
+
+    def read(self,
+             report_name: str,
+             start: Optional[Union[str, pd.Timestamp]] = None,
+             end: Optional[Union[str, pd.Timestamp]] = None,
+             columns: Optional[list[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Reads a report time series between start and end (inclusive), touching only the
+        partitions and columns needed.
+
+        Args:
+            report_name (str): Name of the report, e.g. 'B1770' or 'B1780'.
+            start: The first datetime to include. Defaults to the start of the stored data.
+            end: The last datetime to include. Defaults to the end of the stored data.
+            columns (list[str]): The value columns to load. Defaults to all stored columns.
+
+        Returns:
+            A dataframe indexed by datetime, or None if nothing is stored for the report.
+        """
+
+        report_path = self.root / f"report={report_name}"
+        if not report_path.exists():
+            logger.error(f"{self.__class__.__name__}: No stored data for {report_name}")
+            return None
+
+        dataset = ds.dataset(report_path, format='parquet', partitioning='hive')
+        datetime_field = ds.field(self.INDEX_COLUMN)
+        timestamp_type = dataset.schema.field(self.INDEX_COLUMN).type
+
+        predicate = None
+        if start is not None:
+            start = self._localize(timestamp=pd.Timestamp(start), timezone=timestamp_type.tz, earliest=True)
+            predicate = self._and(predicate, self._month_bound(start, lower=True))
+            predicate = self._and(predicate, datetime_field >= pa.scalar(start, type=timestamp_type))
+        if end is not None:
+            end = self._localize(timestamp=pd.Timestamp(end), timezone=timestamp_type.tz, earliest=False)
+            predicate = self._and(predicate, self._month_bound(end, lower=False))
+            predicate = self._and(predicate, datetime_field <= pa.scalar(end, type=timestamp_type))
+
+        value_columns = columns if columns else [name for name in dataset.schema.names
+                                                 if name not in (self.INDEX_COLUMN, 'year', 'month')]
+        table = dataset.to_table(columns=[self.INDEX_COLUMN, *value_columns], filter=predicate)
+
+        return table.to_pandas().set_index(self.INDEX_COLUMN).sort_index()
+
+
+    def _localize(self,
+                  timestamp: pd.Timestamp,
+                  timezone: str,
+                  earliest: bool) -> pd.Timestamp:
+        """
+        Localizes a naive bound to the timezone of the stored index, taking the earliest or latest
+        instant of a wall time repeated when the clocks go back.
+        """
+
+        if timestamp.tzinfo is not None:
+            return timestamp
+        return timestamp.tz_localize(timezone, ambiguous=earliest, nonexistent='shift_forward')
+
+
+    def _get_partition_path(self,
+                            report_name: str,
+                            year: int,
+                            month: int) -> Path:
+        return self.root / f"report={report_name}" / f"year={year}" / f"month={month}"
+
+
+    def _month_bound(self,
+                     timestamp: pd.Timestamp,
+                     lower: bool) -> ds.Expression:
+        """
+        Builds a partition filter keeping only the months on the given side of the timestamp.
+        """
+
+        year, month = ds.field('year'), ds.field('month')
+        if lower:
+            return (year > timestamp.year) | ((year == timestamp.year) & (month >= timestamp.month))
+        return (year < timestamp.year) | ((year == timestamp.year) & (month <= timestamp.month))
+
+
+    def _and(self,
+             predicate: Optional[ds.Expression],
+             expression: ds.Expression) -> ds.Expression:
+        return expression if predicate is None else predicate & expression
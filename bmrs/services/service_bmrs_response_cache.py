@@ -0,0 +1,464 @@
+import io
+import json
+import time
+import sqlite3
+import pandas as pd
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Mapping, Optional, Union
+
+from bmrs.services import logger
+
+
+class ServiceBmrsResponseCache:
+    """
+    A persistent SQLite cache of parsed BMRS items keyed by (report_name, settlement_date, period, service_type, fields),
+    where fields are the value columns kept from each item, so items reduced to other columns are never served.
+
+    Settlement data older than `immutable_after_days` no longer changes, so it is cached forever.
+    More recent dates may still be restated and expire after `recent_ttl` seconds, as do periods
+    without data of any date, which may come from a transient empty response. When the stored
+    payloads exceed `max_size_bytes` the least recently used entries are evicted. Access times of
+    hits are held in memory and written in batches, so reads never wait for a commit.
+
+    The database is opened on first use, so constructing the cache creates no file. Every call is
+    blocking; coroutines run them on the cache's single worker thread through `executor`.
+    """
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent.parent / 'bmrs_cache.sqlite3'
+
+
+    def __init__(self,
+                 path: Union[str, Path, None] = None,
+                 recent_ttl: int = 300,
+                 immutable_after_days: int = 2,
+                 max_size_bytes: int = 256 * 1024 * 1024,
+                 access_flush_size: int = 1024) -> None:
+        self.path = str(path if path else self.DEFAULT_PATH)
+        # Seconds for which entries of recent settlement dates are considered fresh.
+        self.recent_ttl = recent_ttl
+        # Settlement dates at least this many days old are cached without expiry.
+        self.immutable_after_days = immutable_after_days
+        # Total payload size above which least recently used entries are evicted.
+        self.max_size_bytes = max_size_bytes
+        # Number of pending access times above which they are written to the database.
+        self.access_flush_size = access_flush_size
+        # Access times of hits not yet written, keyed by (report_name, settlement_date, period, service_type, fields).
+        self._accessed: dict[tuple[str, str, str, str, str], float] = {}
+        # A single worker thread runs the calls of coroutines, off the event loop and one at a time.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bmrs-cache')
+
+        self.hits = 0
+        self.misses = 0
+
+        self._total_size = 0
+        self._open_connection: Optional[sqlite3.Connection] = None
+
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The SQLite connection, opened and set up on first use.
+        """
+
+        if self._open_connection is None:
+            self._open_connection = self._connect()
+        return self._open_connection
+
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens the database, creating the table if needed. A table from before the fields were part
+        of the key is dropped, as its entries cannot tell which columns they were reduced to.
+        """
+
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(response_cache)")]
+        if columns and 'fields' not in columns:
+            connection.execute("DROP TABLE response_cache")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                report_name TEXT NOT NULL,
+                settlement_date TEXT NOT NULL,
+                period TEXT NOT NULL,
+                service_type TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (report_name, settlement_date, period, service_type, fields)
+            )""")
+        connection.execute("CREATE INDEX IF NOT EXISTS response_cache_accessed_at "
+                           "ON response_cache (accessed_at)")
+        connection.commit()
+
+        self._total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        return connection
+
+
+    def get(self,
+            report_name: str,
+            settlement_date: str,
+            period: str,
+            service_type: str = 'xml',
+            fields: Optional[Iterable[str]] = None) -> tuple[bool, Optional[Any]]:
+        """
+        Looks up a cached item.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            period: The settlement period.
+            service_type: The response format the item was retrieved in.
+            fields: The value columns the item was reduced to, or None if it keeps every field.
+
+        Returns:
+            A tuple of (found, item). An item of None with found set to True means the
+            period is known to have no data.
+        """
+
+        items = self.get_many(report_name=report_name,
+                              settlement_date=settlement_date,
+                              periods=[period],
+                              service_type=service_type,
+                              fields=fields)
+        period = str(period)
+        return (True, items[period]) if period in items else (False, None)
+
+
+    def get_many(self,
+                 report_name: str,
+                 settlement_date: str,
+                 periods: Iterable[str],
+                 service_type: str = 'xml',
+                 fields: Optional[Iterable[str]] = None) -> dict[str, Optional[Any]]:
+        """
+        Looks up the cached items of several periods of a report and day in one query.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            periods: The settlement periods.
+            service_type: The response format the items were retrieved in.
+            fields: The value columns the items were reduced to, or None if they keep every field.
+
+        Returns:
+            The items found, keyed by period. An item of None means the period is known to have no data.
+        """
+
+        periods = [str(period) for period in periods]
+        if not periods:
+            return {}
+
+        fields_key = self._get_fields_key(fields=fields)
+        rows = self._connection.execute("SELECT period, payload, expires_at FROM response_cache "
+                                        "WHERE report_name = ? AND settlement_date = ? "
+                                        "AND service_type = ? AND fields = ? "
+                                        f"AND period IN ({', '.join('?' * len(periods))})",
+                                        (report_name, settlement_date, service_type, fields_key, *periods)).fetchall()
+        now = time.time()
+
+        items = {}
+        for period, payload, expires_at in rows:
+            if expires_at is not None and expires_at <= now:
+                continue
+            self._accessed[(report_name, settlement_date, period, service_type, fields_key)] = now
+            items[period] = self._deserialise(payload=payload)
+
+        self.hits += len(items)
+        self.misses += len(periods) - len(items)
+        if len(self._accessed) >= self.access_flush_size:
+            self.flush()
+        return items
+
+
+    def get_day(self,
+                report_name: str,
+                settlement_date: str,
+                service_type: str = 'xml',
+                fields: Optional[Iterable[str]] = None) -> Optional[dict[int, Any]]:
+        """
+        Looks up every period of a report and day stored by put_day.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            service_type: The response format the items were retrieved in.
+            fields: The value columns the items were reduced to, or None if they keep every field.
+
+        Returns:
+            The items keyed by period, or None unless the day and each of its periods are cached.
+        """
+
+        found, periods = self.get(report_name=report_name,
+                                  settlement_date=settlement_date,
+                                  period='*',
+                                  service_type=service_type,
+                                  fields=fields)
+        if not found:
+            return None
+
+        items = self.get_many(report_name=report_name,
+                              settlement_date=settlement_date,
+                              periods=periods,
+                              service_type=service_type,
+                              fields=fields)
+        if len(items) < len(periods):
+            return None
+        return {int(period): item for period, item in items.items()}
+
+
+    def put(self,
+            report_name: str,
+            settlement_date: str,
+            period: str,
+            item: Optional[Any],
+            service_type: str = 'xml',
+            fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Stores a parsed item, applying the TTL rule for its settlement date and evicting
+        least recently used entries if the cache grows beyond its size limit.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            period: The settlement period.
+            item: The parsed item or DataFrame, or None when the period has no data.
+            service_type: The response format the item was retrieved in.
+            fields: The value columns the item was reduced to, or None if it keeps every field.
+        """
+
+        self.put_many(report_name=report_name,
+                      settlement_date=settlement_date,
+                      items={period: item},
+                      service_type=service_type,
+                      fields=fields)
+
+
+    def put_many(self,
+                 report_name: str,
+                 settlement_date: str,
+                 items: Mapping[str, Optional[Any]],
+                 service_type: str = 'xml',
+                 fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Stores the parsed items of several periods of a report and day in one transaction.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            items: The parsed items or DataFrames keyed by period, with None for periods without data.
+            service_type: The response format the items were retrieved in.
+            fields: The value columns the items were reduced to, or None if they keep every field.
+        """
+
+        fields_key = self._get_fields_key(fields=fields)
+        now = time.time()
+        expiry = self.get_expiry(settlement_date=settlement_date, now=now)
+
+        rows = []
+        for period, item in items.items():
+            try:
+                payload = self._serialise(item=item)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"{self.__class__.__name__}: Item for {report_name} {settlement_date} "
+                               f"period {period} is not cacheable - {e}")
+                continue
+            # A period without data may still be published, so it is only trusted for the recent TTL.
+            expires_at = now + self.recent_ttl if item is None else expiry
+            rows.append((report_name, settlement_date, str(period), service_type, fields_key,
+                         payload, len(payload), expires_at, now))
+        if not rows:
+            return
+
+        periods = [row[2] for row in rows]
+        previous_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache "
+                                                 "WHERE report_name = ? AND settlement_date = ? "
+                                                 "AND service_type = ? AND fields = ? "
+                                                 f"AND period IN ({', '.join('?' * len(periods))})",
+                                                 (report_name, settlement_date, service_type, fields_key,
+                                                  *periods)).fetchone()[0]
+
+        for row in rows:
+            self._accessed.pop(row[:5], None)
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO response_cache "
+                                         "(report_name, settlement_date, period, service_type, fields, "
+                                         "payload, size, expires_at, accessed_at) "
+                                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        self._total_size += sum(row[6] for row in rows) - previous_size
+        if self._total_size > self.max_size_bytes:
+            self._evict()
+
+
+    def put_day(self,
+                report_name: str,
+                settlement_date: str,
+                items: Mapping[int, Any],
+                period_count: Optional[int],
+                service_type: str = 'xml',
+                fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Stores the items of a whole-day response in one transaction. The list of the day's periods,
+        which get_day serves the day from, is only stored when the response covers every period of
+        the day, so a truncated response is never served in place of the full day.
+
+        Args:
+            report_name: The identifier for the report.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            items: The parsed items or DataFrames keyed by period.
+            period_count: The number of settlement periods of the day, or None if it is unknown.
+            service_type: The response format the items were retrieved in.
+            fields: The value columns the items were reduced to, or None if they keep every field.
+        """
+
+        day_items: dict[str, Any] = {str(period): item for period, item in items.items()}
+        if period_count and set(items).issuperset(range(1, period_count + 1)):
+            day_items['*'] = sorted(items)
+
+        self.put_many(report_name=report_name,
+                      settlement_date=settlement_date,
+                      items=day_items,
+                      service_type=service_type,
+                      fields=fields)
+
+
+    def get_expiry(self,
+                   settlement_date: str,
+                   now: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the expiry timestamp for an entry of the given settlement date, or None for
+        dates old enough to be immutable.
+
+        Args:
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+            now: The current unix time. Defaults to time.time().
+        """
+
+        now = now if now is not None else time.time()
+        try:
+            settlement_day = datetime.strptime(settlement_date, '%Y-%m-%d').date()
+        except ValueError:
+            return now + self.recent_ttl
+
+        if settlement_day <= date.today() - timedelta(days=self.immutable_after_days):
+            return None
+        return now + self.recent_ttl
+
+
+    def flush(self) -> None:
+        """
+        Writes the pending access times of hits to the database in one transaction.
+        """
+
+        if not self._accessed:
+            return
+        self._connection.executemany("UPDATE response_cache SET accessed_at = ? "
+                                     "WHERE report_name = ? AND settlement_date = ? "
+                                     "AND period = ? AND service_type = ? AND fields = ?",
+                                     [(accessed_at, *key) for key, accessed_at in self._accessed.items()])
+        self._connection.commit()
+        self._accessed.clear()
+
+
+    def clear(self) -> None:
+        """
+        Removes every cached entry.
+        """
+
+        self._accessed.clear()
+        self._connection.execute("DELETE FROM response_cache")
+        self._connection.commit()
+        self._total_size = 0
+
+
+    def close(self) -> None:
+        """
+        Writes the pending access times and closes the underlying SQLite connection, if it was opened.
+        """
+
+        if self._open_connection is None:
+            return
+        self.flush()
+        self._open_connection.close()
+        self._open_connection = None
+
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        Returns the cache's hit, miss and size counters.
+        """
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size_bytes': self._total_size}
+
+
+    @staticmethod
+    def _get_fields_key(fields: Optional[Iterable[str]]) -> str:
+        """
+        Encodes the value columns of an item as part of its key, '*' standing for every field.
+        """
+
+        return ','.join(sorted(fields)) if fields is not None else '*'
+
+
+    def _serialise(self,
+                   item: Optional[Any]) -> str:
+        """
+        Encodes an item as JSON. DataFrames from CSV responses are stored in pandas' split orientation.
+        """
+
+        if isinstance(item, pd.DataFrame):
+            return json.dumps({'__dataframe__': json.loads(item.to_json(orient='split', date_format='iso', index=False))})
+        return json.dumps(item)
+
+
+    def _deserialise(self,
+                     payload: str) -> Optional[Any]:
+        """
+        Decodes a stored payload, rebuilding DataFrames with a datetime64 'settlementDate' column.
+        """
+
+        item = json.loads(payload)
+        if isinstance(item, dict) and '__dataframe__' in item:
+            frame = pd.read_json(io.StringIO(json.dumps(item['__dataframe__'])), orient='split', convert_dates=False)
+            if 'settlementDate' in frame:
+                frame['settlementDate'] = pd.to_datetime(frame['settlementDate']).dt.tz_localize(None)
+            return frame
+        return item
+
+
+    def _evict(self) -> None:
+        """
+        Deletes expired entries, then least recently used entries until the cache is
+        back under 90% of its size limit.
+        """
+
+        # Ordering by the latest access times, including those of hits not yet written.
+        self.flush()
+
+        self._connection.execute("DELETE FROM response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                 (time.time(),))
+        self._total_size = self._connection.execute(
+                                "SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+
+        target_size = int(self.max_size_bytes * 0.9)
+        evicted = 0
+        rows = self._connection.execute("SELECT rowid, size FROM response_cache ORDER BY accessed_at").fetchall()
+        for rowid, size in rows:
+            if self._total_size <= target_size:
+                break
+            self._connection.execute("DELETE FROM response_cache WHERE rowid = ?", (rowid,))
+            self._total_size -= size
+            evicted += 1
+
+        self._connection.commit()
+        if evicted:
+            logger.info(f"{self.__class__.__name__}: Evicted {evicted} entries to stay under {self.max_size_bytes} bytes")
@@ -0,0 +1,130 @@
+import os
+import time
+import asyncio
+import functools
+import multiprocessing
+
+from typing import Any, Callable, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from bmrs.services import logger
+from bmrs.services.service_metrics import ServiceMetrics, default_metrics
+
+
+class ServiceCpuOffload:
+    """
+    A process pool running CPU-bound work, such as parsing response bodies and converting
+    DataFrames, off the event loop and outside of the GIL, so a backfill uses every core while
+    the event loop keeps driving sockets.
+
+    At most max_pending jobs are queued or running at once; further callers wait for a slot,
+    which applies backpressure to the network side instead of buffering raw bodies without bound.
+    Jobs should take and return compact data, e.g. raw bytes in and numpy columns out, since
+    both are pickled across the process boundary.
+
+    Usage:
+        with ServiceCpuOffload(max_workers=4) as cpu_offload:
+            retriever = ServiceBmrsDataRetriever(cpu_offload=cpu_offload)
+    """
+
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None,
+                 metrics: Optional[ServiceMetrics] = None) -> None:
+        # Number of worker processes. Defaults to the number of CPUs.
+        self.max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+        # Number of jobs queued or running at once; twice the workers keeps every process busy between jobs.
+        self.max_pending = max_pending if max_pending else 2 * self.max_workers
+        # Start method of the worker processes; defaults to the platform's.
+        self.mp_context = mp_context
+        self.metrics = metrics if metrics else default_metrics
+        # The pool is started on first use, so constructing the service is cheap.
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Semaphore bounding pending jobs, bound to the event loop it was created in.
+        self._slots: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+        self.submitted_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+
+
+    def __enter__(self) -> 'ServiceCpuOffload':
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        The process pool, started on first use.
+        """
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context)
+            logger.info(f"{self.__class__.__name__}: Started {self.max_workers} worker processes")
+        return self._executor
+
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes, waiting for running jobs to finish.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+    async def run(self,
+                  func: Callable[..., Any],
+                  **kwargs: Any) -> Any:
+        """
+        Runs func(**kwargs) in a worker process once a pending slot is free, and returns its result.
+
+        Args:
+            func: A picklable callable, e.g. a module level function or a method of a picklable object.
+            kwargs: Picklable keyword arguments of func.
+        """
+
+        name = getattr(func, '__name__', type(func).__name__)
+        queued_at = time.perf_counter()
+        async with self._get_slots():
+            self.metrics.observe('offload_wait_seconds', time.perf_counter() - queued_at, task=name)
+            self.submitted_count += 1
+            try:
+                with self.metrics.timer('offload_seconds', task=name):
+                    result = await asyncio.get_running_loop().run_in_executor(self.executor,
+                                                                              functools.partial(func, **kwargs))
+            except Exception:
+                self.failed_count += 1
+                raise
+
+        self.completed_count += 1
+        return result
+
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        Returns the job counters and the number of jobs currently pending.
+        """
+
+        return {'submitted_count': self.submitted_count,
+                'completed_count': self.completed_count,
+                'failed_count': self.failed_count,
+                'pending_count': self.submitted_count - self.completed_count - self.failed_count}
+
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """
+        Returns the semaphore bounding pending jobs on the running event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_pending))
+        return self._slots[1]
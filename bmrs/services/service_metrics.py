@@ -0,0 +1,245 @@
+import json
+import math
+import time
+import threading
+
+from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+from bmrs.services import logger
+
+
+class ServiceMetrics:
+    """
+    An in-process registry of counters, gauges and latency summaries, labelled by report, stage or status.
+
+    Summaries keep an exact count and sum plus a bounded reservoir of the most recent observations,
+    from which the p50, p95 and p99 quantiles are computed. Everything can be exported as a JSON
+    snapshot or in the Prometheus text exposition format.
+    """
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+
+    def __init__(self,
+                 namespace: str = 'bmrs',
+                 reservoir_size: int = 4096) -> None:
+        # Prefix of every exported metric name.
+        self.namespace = namespace
+        # Number of recent observations kept per summary to compute its quantiles.
+        self.reservoir_size = reservoir_size
+
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._gauges: dict[tuple[str, tuple], float] = {}
+        self._summaries: dict[tuple[str, tuple], list] = {}
+
+
+    def increment(self,
+                  name: str,
+                  value: float = 1.0,
+                  **labels: str) -> None:
+        """
+        Adds a value to a counter, e.g. increment('response_bytes_total', 1024, report='B1770').
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+
+    def set_gauge(self,
+                  name: str,
+                  value: float,
+                  **labels: str) -> None:
+        """
+        Sets a gauge to its current value, e.g. set_gauge('rate_limiter_rate', 10.0).
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+
+    def observe(self,
+                name: str,
+                value: float,
+                **labels: str) -> None:
+        """
+        Records an observation, usually a duration in seconds, in a summary.
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                # [count, sum, recent observations]
+                summary = self._summaries[key] = [0, 0.0, deque(maxlen=self.reservoir_size)]
+            summary[0] += 1
+            summary[1] += value
+            summary[2].append(value)
+
+
+    @contextmanager
+    def timer(self,
+              name: str,
+              **labels: str) -> Iterator[None]:
+        """
+        Observes the wall-clock seconds spent inside the block, e.g. `with metrics.timer('stage_seconds', stage='plot')`.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        """
+        Returns every counter, gauge and summary as JSON-serialisable dictionaries, each with its labels.
+        """
+
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            gauges = [{'name': name, 'labels': dict(labels), 'value': value}
+                      for (name, labels), value in sorted(self._gauges.items())]
+            summaries = [{'name': name,
+                          'labels': dict(labels),
+                          'count': count,
+                          'sum': total,
+                          **{f"p{int(quantile * 100)}": self._quantile(sorted(observations), quantile)
+                             for quantile in self.QUANTILES}}
+                         for (name, labels), (count, total, observations) in sorted(self._summaries.items())]
+
+        return {'counters': counters, 'gauges': gauges, 'summaries': summaries}
+
+
+    def to_json(self) -> str:
+        """
+        Returns the snapshot as a JSON document.
+        """
+
+        return json.dumps(self.snapshot(), indent=2)
+
+
+    def to_prometheus(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format, with summaries exposing their quantiles.
+        """
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        for counter in snapshot['counters']:
+            name = f"{self.namespace}_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._format_labels(counter['labels'])} {counter['value']:g}")
+
+        for gauge in snapshot['gauges']:
+            name = f"{self.namespace}_{gauge['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            lines.append(f"{name}{self._format_labels(gauge['labels'])} {gauge['value']:g}")
+
+        for summary in snapshot['summaries']:
+            name = f"{self.namespace}_{summary['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for quantile in self.QUANTILES:
+                labels = self._format_labels({**summary['labels'], 'quantile': f"{quantile:g}"})
+                lines.append(f"{name}{labels} {summary[f'p{int(quantile * 100)}']:.6g}")
+            lines.append(f"{name}_sum{self._format_labels(summary['labels'])} {summary['sum']:.6g}")
+            lines.append(f"{name}_count{self._format_labels(summary['labels'])} {summary['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+    def write(self,
+              path: Union[str, Path]) -> None:
+        """
+        Writes the metrics to a file, as JSON if the path ends in '.json' and in the Prometheus text format otherwise.
+        """
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json() if path.suffix == '.json' else self.to_prometheus())
+        logger.info(f"{self.__class__.__name__}: Metrics written to {path}")
+
+
+    def get_counter(self,
+                    name: str,
+                    **labels: str) -> float:
+        """
+        Returns the value of a counter, or 0 if it was never incremented.
+        """
+
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+    def get_gauge(self,
+                  name: str,
+                  **labels: str) -> Optional[float]:
+        """
+        Returns the value of a gauge, or None if it was never set.
+        """
+
+        with self._lock:
+            return self._gauges.get((name, tuple(sorted(labels.items()))))
+
+
+    def get_summary(self,
+                    name: str,
+                    **labels: str) -> Optional[dict[str, float]]:
+        """
+        Returns the count, sum and quantiles of a summary, or None if nothing was observed.
+        """
+
+        labels = dict(labels)
+        return next((summary for summary in self.snapshot()['summaries']
+                     if summary['name'] == name and summary['labels'] == labels), None)
+
+
+    def reset(self) -> None:
+        """
+        Removes every counter, gauge and summary.
+        """
+
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+    def _quantile(self,
+                  observations: list[float],
+                  quantile: float) -> float:
+        """
+        Returns the nearest-rank quantile of sorted observations, or NaN if there are none.
+        """
+
+        if not observations:
+            return math.nan
+        return observations[min(len(observations) - 1, max(0, math.ceil(quantile * len(observations)) - 1))]
+
+
+    def _format_labels(self,
+                       labels: dict[str, str]) -> str:
+        if not labels:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for value in labels.values())
+        return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+# Registry shared by every component that is not given its own, so all stages report to one place.
+default_metrics = ServiceMetrics()
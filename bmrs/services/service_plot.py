@@ -1,82 +1,298 @@
+import os
+import threading
+import numpy as np
 import pandas as pd
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-from scipy.ndimage.filters import gaussian_filter1d
+
+from pathlib import Path
+from typing import Optional, Union
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from scipy.ndimage import gaussian_filter1d
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from bmrs.services import logger
+from bmrs.services.service_metrics import ServiceMetrics, default_metrics
 from bmrs.services.service_bmrs_dataframe_analyser import ServiceBmrsDataframeAnalyser
+from bmrs.registries.registry_reports import RegistryReports, get_default_registry
+
+
+# Figure reused by every headless render in the current thread, so renders in executor threads never share one.
+_HEADLESS_FIGURES = threading.local()
+
+
+def _get_headless_figure() -> Figure:
+    """
+    Returns this thread's reusable Agg figure, creating it on first use.
+    """
+    figure = getattr(_HEADLESS_FIGURES, 'figure', None)
+    if figure is None:
+        figure = _HEADLESS_FIGURES.figure = Figure(figsize=(10,6))
+        FigureCanvasAgg(figure)
+    return figure
+
+
+def _render_job(job: tuple['ServicePlot', str, pd.DataFrame, str]) -> Optional[str]:
+    """
+    Renders one plot in a worker process of ServicePlot.render_batch, with the caller's configured ServicePlot.
+    """
+    service_plot, report_name, plot_dataframe, output_path = job
+    return service_plot.render(report_name=report_name,
+                               plot_dataframe=plot_dataframe,
+                               output_path=output_path)
 
 
 class ServicePlot:
     """
     A service to generate plots for BMRS data, focusing on imbalance metrics.
+
+    In headless mode plots are rendered with the Agg backend straight to image files in
+    `output_dir` instead of opening an interactive window, and batches of plots can be
+    rendered in parallel with a process pool.
     """
-    
-    
-    def __init__(self) -> None:
-        self.service_bmrs_dataframe_analyser = ServiceBmrsDataframeAnalyser()
-        
-        
-    def plot(self, 
+
+    DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent.parent.parent / 'output_images'
+
+
+    def __init__(self,
+                 headless: bool = False,
+                 output_dir: Union[str, Path, None] = None,
+                 max_points: int = 2000,
+                 metrics: Optional[ServiceMetrics] = None,
+                 registry: Optional[RegistryReports] = None) -> None:
+        # Plot titles and labels of every report.
+        self.registry = registry if registry else get_default_registry()
+        self.service_bmrs_dataframe_analyser = ServiceBmrsDataframeAnalyser(registry=self.registry)
+        # Render plots to files rather than displaying them.
+        self.headless = headless
+        # Directory the headless plots are written to.
+        self.output_dir = Path(output_dir if output_dir else self.DEFAULT_OUTPUT_DIR)
+        # Longer series are downsampled to this many points before smoothing and plotting.
+        self.max_points = max_points
+        # Render times are recorded here.
+        self.metrics = metrics if metrics else default_metrics
+
+
+    def __getstate__(self) -> dict:
+        """
+        Pickles the configuration for the worker processes of render_batch. The metrics hold a lock and
+        worker timings never reach the caller's registry, so each worker records to a registry of its own.
+        """
+        state = self.__dict__.copy()
+        state['metrics'] = None
+        return state
+
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.metrics = ServiceMetrics()
+
+
+    def plot(self,
              report_name: str,
-             plot_dataframe: pd.DataFrame) -> None:
+             plot_dataframe: pd.DataFrame) -> Optional[str]:
         """
         Plot the provided dataframe column against a datetime index.
 
         Parameters:
             report_name (str): The name of the BMRS report being plotted.
             plot_dataframe (pd.DataFrame): The dataframe containing the data to be plotted.
+
+        Returns:
+            The path of the rendered image in headless mode, otherwise None once the window is closed.
+        """
+
+        if self.headless:
+            return self.render(report_name=report_name, plot_dataframe=plot_dataframe)
+
+        # Initialize the plot with a defined size
+        fig, ax = plt.subplots(figsize=(10,6))
+        if not self._draw(ax=ax, report_name=report_name, plot_dataframe=plot_dataframe):
+            plt.close(fig)
+            return None
+
+        # Format x-axis datetime for better visualization and readability
+        fig.autofmt_xdate()
+
+        # Finalize the layout and display the plot
+        fig.tight_layout()
+        logger.info(f"{self.__class__.__name__}: Plot Generated. Please close the plot window to continue.")
+        plt.show(block=True)
+
+
+    def render(self,
+               report_name: str,
+               plot_dataframe: pd.DataFrame,
+               output_path: Union[str, Path, None] = None,
+               file_format: str = 'png') -> Optional[str]:
+        """
+        Render the plot of a report to an image file with the Agg backend, reusing this process's figure.
+
+        Parameters:
+            report_name (str): The name of the BMRS report being plotted.
+            plot_dataframe (pd.DataFrame): The dataframe containing the data to be plotted.
+            output_path (str | Path): Where to write the image. Defaults to a file named after the
+                report and its first date in `output_dir`.
+            file_format (str): Image format used for the default file name, e.g. 'png' or 'svg'.
+        """
+
+        output_path = Path(output_path) if output_path else \
+                        self.get_output_path(report_name=report_name,
+                                             plot_dataframe=plot_dataframe,
+                                             file_format=file_format)
+
+        with self.metrics.timer('stage_seconds', stage='plot', report=report_name):
+            fig = _get_headless_figure()
+            fig.clear()
+            ax = fig.add_subplot()
+            if not self._draw(ax=ax, report_name=report_name, plot_dataframe=plot_dataframe):
+                return None
+
+            fig.autofmt_xdate()
+            fig.tight_layout()
+
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            fig.savefig(output_path)
+        logger.info(f"{self.__class__.__name__}: Plot rendered to {output_path}")
+        return str(output_path)
+
+
+    def render_batch(self,
+                     plots: list[tuple[str, pd.DataFrame]],
+                     file_format: str = 'png',
+                     max_workers: Optional[int] = None) -> list[Optional[str]]:
+        """
+        Render many report plots to image files in parallel with a process pool.
+
+        Parameters:
+            plots (list[tuple[str, pd.DataFrame]]): The (report_name, plot_dataframe) pairs to render.
+            file_format (str): Image format of the rendered files, e.g. 'png' or 'svg'.
+            max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            The path of each rendered image, or None where rendering failed, in the order of `plots`.
+        """
+
+        # Every job carries this instance, so the workers render with its registry, output_dir and max_points.
+        jobs = [(self,
+                 report_name,
+                 plot_dataframe,
+                 str(self.get_output_path(report_name=report_name,
+                                          plot_dataframe=plot_dataframe,
+                                          file_format=file_format)))
+                for report_name, plot_dataframe in plots]
+
+        # A pool is not worth starting for a single plot.
+        if len(jobs) <= 1 or max_workers == 1:
+            return [_render_job(job) for job in jobs]
+
+        # Worker processes have their own registries, so the batch is timed as a whole here.
+        with self.metrics.timer('stage_seconds', stage='plot_batch'), \
+                ProcessPoolExecutor(max_workers=min(len(jobs), max_workers or os.cpu_count() or 1)) as executor:
+            return list(executor.map(_render_job, jobs))
+
+
+    def render_daily(self,
+                     report_name: str,
+                     plot_dataframe: pd.DataFrame,
+                     file_format: str = 'png',
+                     max_workers: Optional[int] = None) -> list[Optional[str]]:
+        """
+        Split a multi-day time series into one plot per day and render them in parallel.
+
+        Parameters:
+            report_name (str): The name of the BMRS report being plotted.
+            plot_dataframe (pd.DataFrame): The dataframe containing the data to be plotted.
+            file_format (str): Image format of the rendered files, e.g. 'png' or 'svg'.
+            max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+        """
+
+        plots = [(report_name, day_dataframe)
+                 for _, day_dataframe in plot_dataframe.groupby(plot_dataframe.index.normalize())]
+
+        return self.render_batch(plots=plots, file_format=file_format, max_workers=max_workers)
+
+
+    def get_output_path(self,
+                        report_name: str,
+                        plot_dataframe: pd.DataFrame,
+                        file_format: str = 'png') -> Path:
+        """
+        Returns the default image path of a plot, named after the report and its first date.
+        """
+        first_date = plot_dataframe.index[0].strftime('%Y%m%d')
+        return self.output_dir / f"bmrs_data_{report_name.lower()}_{first_date}_plot.{file_format}"
+
+
+    def downsample(self,
+                   series: pd.Series) -> pd.Series:
         """
-        
+        Reduce a series to at most `max_points` points by averaging consecutive equal-sized buckets.
+        Each bucket is indexed by the timestamp of its first point.
+        """
+
+        if len(series) <= self.max_points:
+            return series
+
+        bucket_size = -(-len(series) // self.max_points)
+        starts = np.arange(0, len(series), bucket_size)
+        values = series.to_numpy(dtype=float)
+        means = np.add.reduceat(values, starts) / np.diff(np.append(starts, len(values)))
+
+        return pd.Series(means, index=series.index[starts], name=series.name)
+
+
+    def _draw(self,
+              ax: Axes,
+              report_name: str,
+              plot_dataframe: pd.DataFrame) -> bool:
+        """
+        Draw a report's smoothed series, mean line and labels onto the given axes.
+        Returns False if the report is not supported.
+        """
+
         # Get the first datetime index from the DataFrame
         first_datetime_index = plot_dataframe.index[0]
 
         # Format the datetime to a pretty string ('dd-mm-yyyy')
         pretty_date = self.service_bmrs_dataframe_analyser.get_pretty_date(\
                                                         timestamp=first_datetime_index)
-        
-        # Determine the title and column name based on the report type
-        if report_name == 'B1770':
-            title = f"{pretty_date}: {report_name} Bi-Hourly Imbalance Cost (GBP) "
-            column_name = 'Imbalance Cost (GBP)'
-        elif report_name == 'B1780':
-            title = f"{pretty_date}: {report_name} Bi-Hourly Imbalance rate (MWh) "
-            column_name = 'Imbalance rate (MWh)'
-        else:
-            logger.error(f"{self.__class__.__name__}:Invalid report name provided: {report_name}")
-            return None
-        
-        # Initialize the plot with a defined size
-        fig, ax = plt.subplots(figsize=(10,6))
+
+        # Determine the title and column name from the report's registry definition
+        definition = self.registry.get(report_name=report_name)
+        if definition is None:
+            return False
+        title = f"{pretty_date}: {report_name} {definition.plot_title or ''} "
+        column_name = definition.plot_label or self._clean_column_name(col=plot_dataframe.columns[0])
+
         ax.set_facecolor('#f5f5f5')
-        
-        # Apply a Gaussian filter to smooth the plotted data
+
+        # Apply a Gaussian filter to smooth the plotted data, after downsampling long series
         col = plot_dataframe.columns[0]
-        y_smoothed = gaussian_filter1d(plot_dataframe[col], sigma=1)
-        ax.plot(plot_dataframe.index, y_smoothed, label=column_name)
-        
+        series = self.downsample(series=plot_dataframe[col])
+        y_smoothed = gaussian_filter1d(series.to_numpy(dtype=float), sigma=1)
+        ax.plot(series.index, y_smoothed, label=column_name)
+
         # Plot the mean value of the column as a dashed red line
         mean_value = plot_dataframe[col].mean()
         ax.axhline(mean_value, color='red', linestyle='--', label='Mean')
-        
-        # Plot the mean value of the column as a dashed red line
-        plt.title(title)
-        plt.xlabel('Datetime')
-        plt.ylabel(column_name)
-        ax.grid(True, which='both', linestyle='--', linewidth=0.1, alpha=0.6) 
+
+        # Set the title and axis labels
+        ax.set_title(title)
+        ax.set_xlabel('Datetime')
+        ax.set_ylabel(column_name)
+        ax.grid(True, which='both', linestyle='--', linewidth=0.1, alpha=0.6)
         ax.minorticks_on()
-        
+
         # Add a legend for plot details
-        plt.legend(loc='upper left')
-        
-        # Format x-axis datetime for better visualization and readability
-        ax.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%Y-%m-%d %H:%M'))
-        plt.gcf().autofmt_xdate()
+        ax.legend(loc='upper left')
 
-        # Finalize the layout and display the plot
-        plt.tight_layout()
-        logger.info(f"{self.__class__.__name__}: Plot Generated. Please close the plot window to continue.")
-        plt.show(block=True)
+        # Format x-axis datetime for better visualization and readability
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d %H:%M'))
+        return True
 
     def _clean_column_name(self, col: str) -> str:
         """Clean and format the column name for presentation."""
-        return col.replace("_", " ").title()
\ No newline at end of file
+        return col.replace("_", " ").title()
@@ -0,0 +1,192 @@
+import time
+import asyncio
+
+from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from bmrs.services import logger
+from bmrs.services.service_metrics import ServiceMetrics
+
+
+class ServiceRateLimiter:
+    """
+    An adaptive token-bucket rate limiter shared by every in-flight request of a retriever.
+
+    The request rate follows an AIMD (additive increase, multiplicative decrease) policy:
+    each successful response raises the rate by a fixed step up to max_rate, while a
+    rate-limited (429) response cuts the rate for all callers and pauses the bucket for
+    the duration advertised by the server's Retry-After header, or for default_retry_after
+    seconds when the response carries none.
+    """
+
+
+    def __init__(self,
+                 max_rate: float = 20.0,
+                 min_rate: float = 0.5,
+                 burst: Optional[float] = None,
+                 increase_step: float = 0.5,
+                 decrease_factor: float = 0.5,
+                 max_retry_after: Optional[float] = None,
+                 default_retry_after: float = 0.0,
+                 metrics: Optional[ServiceMetrics] = None) -> None:
+        # Requests per second allowed when no rate limiting has been observed.
+        self.max_rate = float(max_rate)
+        # Floor below which the rate is never cut.
+        self.min_rate = float(min_rate)
+        # Maximum number of requests that can be released back to back.
+        self.burst = float(burst) if burst else max(1.0, self.max_rate)
+        self.increase_step = float(increase_step)
+        self.decrease_factor = float(decrease_factor)
+        # Upper bound for a server advertised Retry-After pause.
+        self.max_retry_after = max_retry_after
+        # Pause for a rate-limited response without a Retry-After header, so retries do not follow back to back.
+        self.default_retry_after = float(default_retry_after)
+
+        self.rate = self.max_rate
+        self._tokens = self.burst
+        # Time from which tokens accrue; it is pushed into the future while the bucket is paused.
+        self._updated_at = time.monotonic()
+        self._last_decrease_at = float('-inf')
+
+        self.acquired_count = 0
+        self.throttled_count = 0
+
+        # If set, the current rate is recorded as the rate_limiter_rate gauge whenever it changes.
+        self.metrics = metrics
+        self._record_rate()
+
+
+    @property
+    def current_rate(self) -> float:
+        """
+        The number of requests per second currently allowed.
+        """
+        return self.rate
+
+
+    async def acquire(self) -> None:
+        """
+        Waits until a request may be sent under the current rate.
+
+        Each call reserves a token immediately, so concurrent callers are released in
+        the order they arrived, spaced out by the current rate.
+        """
+
+        now = time.monotonic()
+        self._refill(now=now)
+        self._tokens -= 1
+        self.acquired_count += 1
+
+        wait = max(0.0, self._updated_at - now) + max(0.0, -self._tokens) / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+    def on_success(self) -> None:
+        """
+        Additively increases the rate after a successful response.
+        """
+
+        self._refill(now=time.monotonic())
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+        self._record_rate()
+
+
+    def on_throttled(self,
+                     retry_after: Optional[str] = None) -> float:
+        """
+        Multiplicatively decreases the rate after a rate-limited response and pauses
+        the bucket for every caller for the advertised Retry-After, or default_retry_after without one.
+
+        Args:
+            retry_after: The raw Retry-After header value, either in seconds or as an HTTP date.
+
+        Returns:
+            The number of seconds the bucket is paused for.
+        """
+
+        now = time.monotonic()
+        self._refill(now=now)
+        self.throttled_count += 1
+
+        # Responses to requests sent before the last decrease are already accounted for.
+        if now - self._last_decrease_at >= 1.0 / self.rate:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._last_decrease_at = now
+            # Dropping any accumulated burst so the slower rate applies immediately.
+            self._tokens = min(self._tokens, 0.0)
+            self._record_rate()
+
+        pause = self.parse_retry_after(retry_after=retry_after) if retry_after else self.default_retry_after
+        if self.max_retry_after is not None:
+            pause = min(pause, float(self.max_retry_after))
+
+        if pause > 0:
+            self._updated_at = max(self._updated_at, now + pause)
+            self._tokens = min(self._tokens, 0.0)
+
+        logger.warning(f"{self.__class__.__name__}: Rate limit hit. Request rate reduced to {self.rate:.2f}/s"
+                       f"{f', paused for {pause:.2f} seconds' if pause > 0 else ''}.")
+        return pause
+
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Returns the limiter's current state as a dictionary of metrics.
+        """
+
+        return {'current_rate': self.rate,
+                'max_rate': self.max_rate,
+                'acquired_count': self.acquired_count,
+                'throttled_count': self.throttled_count,
+                'paused_for': max(0.0, self._updated_at - time.monotonic())}
+
+
+    def parse_retry_after(self,
+                          retry_after: Optional[str]) -> float:
+        """
+        Converts a Retry-After header value into a number of seconds. Invalid or missing
+        values produce no pause.
+
+        Args:
+            retry_after: The raw Retry-After header value, either in seconds or as an HTTP date.
+        """
+
+        if not retry_after:
+            return 0.0
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            logger.warning(f"{self.__class__.__name__}: Ignoring invalid Retry-After header: {retry_after}")
+            return 0.0
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+    def _refill(self,
+                now: float) -> None:
+        """
+        Adds the tokens accrued since the last update, up to the burst size.
+        """
+
+        if now > self._updated_at:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+
+    def _record_rate(self) -> None:
+        """
+        Records the current rate in the metrics registry, if one is set.
+        """
+
+        if self.metrics is not None:
+            self.metrics.set_gauge('rate_limiter_rate', self.rate)
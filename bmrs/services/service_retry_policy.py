@@ -0,0 +1,160 @@
+import random
+import asyncio
+
+from typing import Optional, Iterable
+from aiohttp import ClientConnectionError, ClientPayloadError, ClientResponseError
+
+from bmrs.services import logger
+from bmrs.services.service_metrics import ServiceMetrics
+
+
+class ServiceRetryPolicy:
+    """
+    A retry policy shared by every request of a retriever.
+
+    Failed attempts are retried after an exponential backoff with full jitter, i.e. a delay drawn
+    uniformly between zero and min(max_delay, base_delay * 2 ** attempt), which spreads retries of
+    concurrent requests apart. Only transient errors are retried: timeouts, connection errors and
+    5xx (or 408) responses.
+
+    Retries are limited by a global budget so they cannot amplify load during an outage: every
+    request deposits `budget_ratio` tokens (up to `budget_max_tokens`) and every retry withdraws one,
+    so retries stay below roughly `budget_ratio` of the request volume once the initial tokens are spent.
+    """
+
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 budget_ratio: float = 0.2,
+                 budget_max_tokens: float = 10.0,
+                 retryable_statuses: Optional[Iterable[int]] = None,
+                 metrics: Optional[ServiceMetrics] = None) -> None:
+        # Attempts per request, including the first one.
+        self.max_attempts = max(1, int(max_attempts))
+        # Upper bound of the first backoff; it doubles with every further attempt.
+        self.base_delay = float(base_delay)
+        # Upper bound of any single backoff.
+        self.max_delay = float(max_delay)
+        # Retry tokens earned by every request.
+        self.budget_ratio = float(budget_ratio)
+        # Retry tokens that can be saved up, which is also the number available at start.
+        self.budget_max_tokens = float(budget_max_tokens)
+        # Response statuses that are retried, in addition to timeouts and connection errors.
+        self.retryable_statuses = frozenset(retryable_statuses) if retryable_statuses is not None else \
+                                    frozenset([408, *range(500, 600)])
+
+        self._budget_tokens = self.budget_max_tokens
+
+        self.request_count = 0
+        self.retry_count = 0
+        self.retryable_error_count = 0
+        self.non_retryable_error_count = 0
+        self.attempts_exhausted_count = 0
+        self.budget_exhausted_count = 0
+
+        # If set, requests that give up are counted and the remaining budget is recorded as a gauge.
+        self.metrics = metrics
+        self._record_budget()
+
+
+    def on_request(self) -> None:
+        """
+        Records a new request, i.e. its first attempt, and deposits its share of the retry budget.
+        """
+
+        self.request_count += 1
+        self._budget_tokens = min(self.budget_max_tokens, self._budget_tokens + self.budget_ratio)
+        self._record_budget()
+
+
+    def is_retryable(self,
+                     error: BaseException) -> bool:
+        """
+        Returns True if the error is transient: a timeout, a connection or payload error, or a
+        response with one of the retryable statuses.
+        """
+
+        if isinstance(error, ClientResponseError):
+            return error.status in self.retryable_statuses
+        return isinstance(error, (asyncio.TimeoutError, ClientConnectionError, ClientPayloadError))
+
+
+    def get_retry_delay(self,
+                        error: BaseException,
+                        attempt: int) -> Optional[float]:
+        """
+        Decides whether a failed attempt is retried.
+
+        Args:
+            error: The exception raised by the attempt.
+            attempt: The zero-based number of the failed attempt.
+
+        Returns:
+            The number of seconds to wait before the next attempt, or None if the request should give up.
+        """
+
+        if not self.is_retryable(error=error):
+            self.non_retryable_error_count += 1
+            self._increment('retry_non_retryable_errors_total')
+            return None
+
+        self.retryable_error_count += 1
+        if attempt + 1 >= self.max_attempts:
+            self.attempts_exhausted_count += 1
+            self._increment('retry_attempts_exhausted_total')
+            return None
+
+        if self._budget_tokens < 1.0:
+            self.budget_exhausted_count += 1
+            self._increment('retry_budget_exhausted_total')
+            logger.warning(f"{self.__class__.__name__}: Retry budget exhausted, not retrying.")
+            return None
+
+        self._budget_tokens -= 1.0
+        self.retry_count += 1
+        self._record_budget()
+        return self.get_backoff(attempt=attempt)
+
+
+    def get_backoff(self,
+                    attempt: int) -> float:
+        """
+        Returns a full-jitter exponential backoff for the given zero-based attempt.
+        """
+
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Returns the policy's counters and remaining retry budget as a dictionary of metrics.
+        """
+
+        return {'request_count': self.request_count,
+                'retry_count': self.retry_count,
+                'retryable_error_count': self.retryable_error_count,
+                'non_retryable_error_count': self.non_retryable_error_count,
+                'attempts_exhausted_count': self.attempts_exhausted_count,
+                'budget_exhausted_count': self.budget_exhausted_count,
+                'budget_tokens': self._budget_tokens}
+
+
+    def _increment(self,
+                   name: str) -> None:
+        """
+        Increments a counter in the metrics registry, if one is set.
+        """
+
+        if self.metrics is not None:
+            self.metrics.increment(name)
+
+
+    def _record_budget(self) -> None:
+        """
+        Records the remaining retry tokens in the metrics registry, if one is set.
+        """
+
+        if self.metrics is not None:
+            self.metrics.set_gauge('retry_budget_tokens', self._budget_tokens)
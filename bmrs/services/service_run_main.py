@@ -1,21 +1,50 @@
-from typing import Optional
+import asyncio
+import pandas as pd
+
+from pathlib import Path
+from typing import Optional, Union, AsyncIterator
 from datetime import datetime, timedelta
 
+from bmrs.services import logger
 from bmrs.services.service_plot import ServicePlot
+from bmrs.services.service_metrics import default_metrics
 from bmrs.services.service_bmrs_dataframe_analyser import \
                                 ServiceBmrsDataframeAnalyser
+from bmrs.services.service_bmrs_backfill import ServiceBmrsBackfill
+from bmrs.services.service_bmrs_backfill_manifest import ServiceBmrsBackfillManifest
 from bmrs.services.service_bmrs_build_url import ServiceBmrsBuildUrl
+from bmrs.services.service_bmrs_gap_index import ServiceBmrsGapIndex
+from bmrs.services.service_bmrs_live_poller import ServiceBmrsLivePoller
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+from bmrs.services.service_bmrs_incremental_analyser import ServiceBmrsIncrementalAnalyser
+from bmrs.services.service_bmrs_response_cache import ServiceBmrsResponseCache
 from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.objects.object_live_update import ObjectLiveUpdate
 from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
 
 
 class ServiceRunMain:
     
-    def __init__(self) -> None:
-        self.service_plot = ServicePlot()
+    DEFAULT_METRICS_PATH = Path(__file__).resolve().parent.parent.parent / 'bmrs_metrics.prom'
+    
+    def __init__(self,
+                 headless: bool = False,
+                 metrics_path: Union[str, Path, None] = None) -> None:
+        # Headless runs render plots to output_images instead of opening a window.
+        self.service_plot = ServicePlot(headless=headless)
+        # Stage timings are recorded in the registry shared with the retriever and the plot service.
+        self.metrics = default_metrics
+        # If set, the metrics are written to this file (Prometheus text, or JSON for '.json') after each run.
+        self.metrics_path = metrics_path
         self.service_bmrs_analyser = ServiceBmrsDataframeAnalyser()
         self.converter_dict_to_dataframe = ConverterDictToDataFrame()
-        self.data_retriever = ServiceBmrsDataRetriever(url_builder=ServiceBmrsBuildUrl())
+        self.data_retriever = ServiceBmrsDataRetriever(url_builder=ServiceBmrsBuildUrl(),
+                                                       response_cache=ServiceBmrsResponseCache())
+        self.service_bmrs_backfill = ServiceBmrsBackfill(data_retriever=self.data_retriever,
+                                                         manifest=ServiceBmrsBackfillManifest())
+        self.service_bmrs_parquet_store = ServiceBmrsParquetStore()
+        self.service_bmrs_gap_index = ServiceBmrsGapIndex(data_retriever=self.data_retriever,
+                                                          parquet_store=self.service_bmrs_parquet_store)
         
 
     def run(self, 
@@ -30,32 +59,195 @@ class ServiceRunMain:
         - service_bmrs_analyser: Service responsible for analyzing and processing BMRS data.
         - converter_dict_to_dataframe: Converter to transform dictionary BMRS data into a DataFrame.
         - data_retriever: Service responsible for fetching BMRS data.
+        - service_bmrs_parquet_store: Service persisting the converted time series as partitioned Parquet files.
+        - service_bmrs_gap_index: Service finding the periods missing from the store and refetching only those.
 
         Methods:
         - run(reports: Optional[List[str]]): Orchestrates the workflow for the provided reports. 
         By default, it processes the 'B1770' and 'B1780' reports. It retrieves the report 
         data for a specified day (defaulted to one day prior to the current day), converts 
-        the data into a DataFrame, calculates imbalances if required, and plots the results.
+        the data into a DataFrame, stores it, calculates imbalances if required, and plots the results.
 
         Usage:
         service_runner = ServiceRunMain()
         service_runner.run(['B1770', 'B1780'])
+        
+        ServiceRunMain(headless=True) renders the plots to image files instead of displaying them.
         """
         
         previous_day = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
 
         for report_name in reports:
             
-            report_dict = self.data_retriever.sync_retrieve_all_data(report_name=report_name,
-                                                                     settlement_date=previous_day)
+            with self.metrics.timer('stage_seconds', stage='fetch', report=report_name):
+                report_dict = self.data_retriever.sync_retrieve_all_data(report_name=report_name,
+                                                                         settlement_date=previous_day)
             
-            report_dataframe = self.converter_dict_to_dataframe.convert(report_name=report_name,
-                                                                        report_output=report_dict)
+            # Periods missing after retries are left as gaps, to be refetched by run_reconcile.
+            gaps = self.service_bmrs_gap_index.find_gaps(report_name=report_name,
+                                                         report_output=report_dict,
+                                                         settlement_date=previous_day)
+            if gaps:
+                logger.warning(f"{self.__class__.__name__}: {report_name} {previous_day} is missing periods {gaps}")
             
-            self.service_bmrs_analyser.calculate_imbalances(report_name=report_name, 
-                                                            report_ts_dataframe=report_dataframe)
+            with self.metrics.timer('stage_seconds', stage='convert', report=report_name):
+                report_dataframe = self.converter_dict_to_dataframe.convert(report_name=report_name,
+                                                                            report_output=report_dict)
+            
+            with self.metrics.timer('stage_seconds', stage='store', report=report_name):
+                self.service_bmrs_parquet_store.write(report_name=report_name,
+                                                      report_ts_dataframe=report_dataframe)
+            
+            with self.metrics.timer('stage_seconds', stage='analyse', report=report_name):
+                self.service_bmrs_analyser.calculate_imbalances(report_name=report_name, 
+                                                                report_ts_dataframe=report_dataframe)
             
             self.service_plot.plot(report_name=report_name,
                                    plot_dataframe=report_dataframe)
+        
+        self.report_metrics()
+
+
+    def run_backfill(self,
+                     start_date: str,
+                     end_date: str,
+                     reports: Optional[list[str]] = ['B1770','B1780']) -> dict[str, pd.DataFrame]:
+        """
+        Retrieves the reports for every settlement date between start_date and end_date on a single
+        event loop, converting and storing each day as soon as it completes. Units completed by an
+        earlier, interrupted run are not requested again.
+
+        Args:
+        - start_date (str): The first settlement date in the format 'YYYY-MM-DD' (inclusive).
+        - end_date (str): The last settlement date in the format 'YYYY-MM-DD' (inclusive).
+        - reports (Optional[List[str]]): The reports to be fetched. Defaults to 'B1770' and 'B1780'.
+
+        Returns a dictionary mapping each report name to its stored time series dataframe over the whole range.
+        """
+        
+        asyncio.run(self._store_days(self.service_bmrs_backfill.backfill(reports=reports,
+                                                                         start_date=start_date,
+                                                                         end_date=end_date)))
+        self.report_metrics()
+        
+        # Days completed by earlier runs are not yielded again, so the range is read back from the store.
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(minutes=30)
+        report_dataframes = {report_name: self.service_bmrs_parquet_store.read(report_name=report_name,
+                                                                               start=start,
+                                                                               end=end)
+                             for report_name in reports}
+        
+        return {report_name: report_dataframe for report_name, report_dataframe in report_dataframes.items()
+                if report_dataframe is not None and not report_dataframe.empty}
+    
+    
+    def run_repair(self,
+                   reports: Optional[list[str]] = None) -> dict:
+        """
+        Retries the failed units of earlier backfills and stores the repaired periods.
+
+        Args:
+        - reports (Optional[List[str]]): Restricts the repair to these reports. Defaults to every report.
+
+        Returns the manifest's number of units in each status after the repair.
+        """
+        
+        asyncio.run(self._store_days(self.service_bmrs_backfill.repair(reports=reports)))
+        self.report_metrics()
+        return self.service_bmrs_backfill.manifest.snapshot()
+    
+    
+    def run_reconcile(self,
+                      start_date: str,
+                      end_date: str,
+                      reports: Optional[list[str]] = ['B1770','B1780']) -> dict[tuple[str, str], list[int]]:
+        """
+        Compares the store with the settlement calendar between start_date and end_date, refetches only
+        the missing or stale periods and stores them. Intended to run nightly over the recent days.
+
+        Args:
+        - start_date (str): The first settlement date in the format 'YYYY-MM-DD' (inclusive).
+        - end_date (str): The last settlement date in the format 'YYYY-MM-DD' (inclusive).
+        - reports (Optional[List[str]]): The reports to be reconciled. Defaults to 'B1770' and 'B1780'.
+
+        Returns the periods still missing after the reconciliation, keyed by (report_name, settlement_date).
+        """
+        
+        asyncio.run(self._store_days(self.service_bmrs_gap_index.reconcile(reports=reports,
+                                                                           start_date=start_date,
+                                                                           end_date=end_date)))
+        self.report_metrics()
+        return self.service_bmrs_gap_index.find_stored_gaps(reports=reports, start_date=start_date, end_date=end_date)
+    
+    
+    def run_live(self,
+                 reports: Optional[list[str]] = ['B1770','B1780']) -> None:
+        """
+        Polls the reports for newly published settlement periods until interrupted, storing each
+        update as it arrives and logging the running daily imbalance metrics of its date.
+
+        Args:
+        - reports (Optional[List[str]]): The reports to be followed. Defaults to 'B1770' and 'B1780'.
+        """
+        
+        # A retriever of its own, revalidating unchanged responses instead of downloading them again.
+        poller = ServiceBmrsLivePoller(data_retriever=ServiceBmrsDataRetriever(
+                                                            url_builder=self.data_retriever.service_build_url,
+                                                            conditional_requests=True),
+                                       reports=reports)
+        incremental_analyser = ServiceBmrsIncrementalAnalyser()
+        
+        def store(update: ObjectLiveUpdate) -> None:
+            report_dataframe = self.converter_dict_to_dataframe.convert(report_name=update.report_name,
+                                                                        report_output=update.report_output)
+            if report_dataframe is None:
+                return
+            self.service_bmrs_parquet_store.write(report_name=update.report_name,
+                                                  report_ts_dataframe=report_dataframe)
+            for summary in incremental_analyser.update(report_name=update.report_name,
+                                                       report_ts_dataframe=report_dataframe):
+                logger.info(f"{self.__class__.__name__}: {summary.report_name} {summary.settlement_date:%Y-%m-%d} - "
+                            f"{summary.period_count} periods")
+                self.service_bmrs_analyser.log_summary(summary=summary)
+        
+        poller.subscribe(store)
+        try:
+            asyncio.run(poller.run())
+        except KeyboardInterrupt:
+            logger.info(f"{self.__class__.__name__}: Live polling stopped after {poller.poll_count} polls")
+        self.report_metrics()
+    
+    
+    async def _store_days(self,
+                          days: AsyncIterator[tuple[str, str, list[dict]]]) -> None:
+        """
+        Converts each (report_name, settlement_date, items) day as it arrives and upserts it into the Parquet store.
+        """
+        
+        async for report_name, _, report_dict in days:
+            if report_dict is None or len(report_dict) == 0:
+                continue
             
-            
\ No newline at end of file
+            with self.metrics.timer('stage_seconds', stage='convert', report=report_name):
+                report_dataframe = self.converter_dict_to_dataframe.convert(report_name=report_name,
+                                                                            report_output=report_dict)
+            if report_dataframe is not None:
+                with self.metrics.timer('stage_seconds', stage='store', report=report_name):
+                    self.service_bmrs_parquet_store.write(report_name=report_name,
+                                                          report_ts_dataframe=report_dataframe)
+    
+    
+    def report_metrics(self) -> None:
+        """
+        Logs the median and p95 of every stage and request summary, and writes all metrics to metrics_path if set.
+        """
+        
+        for summary in self.metrics.snapshot()['summaries']:
+            if summary['name'] in ('stage_seconds', 'request_seconds', 'parse_seconds', 'semaphore_wait_seconds'):
+                labels = ', '.join(f"{name}={value}" for name, value in summary['labels'].items())
+                logger.info(f"{self.__class__.__name__}: {summary['name']} [{labels}] - count {summary['count']}, "
+                            f"p50 {summary['p50']:.4f}s, p95 {summary['p95']:.4f}s")
+        
+        if self.metrics_path:
+            self.metrics.write(path=self.metrics_path)
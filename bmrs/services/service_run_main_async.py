@@ -0,0 +1,317 @@
+import asyncio
+import functools
+import pandas as pd
+
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from bmrs.services import logger
+from bmrs.services.service_plot import ServicePlot
+from bmrs.services.service_metrics import ServiceMetrics, default_metrics
+from bmrs.services.service_cpu_offload import ServiceCpuOffload
+from bmrs.services.service_bmrs_dataframe_analyser import \
+                                ServiceBmrsDataframeAnalyser
+from bmrs.services.service_bmrs_backfill import ServiceBmrsBackfill
+from bmrs.services.service_bmrs_incremental_analyser import ServiceBmrsIncrementalAnalyser
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.objects.object_report_result import ObjectReportResult
+from bmrs.objects.object_imbalance_summary import ObjectImbalanceSummary
+
+
+class ServiceRunMainAsync:
+    """
+    An async-native equivalent of ServiceRunMain that runs fetch, convert, store, analyse and plot
+    for many reports concurrently inside the caller's event loop, e.g. from a Django ASGI view or
+    a Jupyter notebook, without creating an event loop per report.
+
+    Network I/O runs on the loop while the CPU-bound stages (conversion, Parquet writes, analysis
+    and rendering) are offloaded to an executor, so they never stall in-flight requests. With a
+    ServiceCpuOffload, response parsing and conversion run in worker processes instead, using every core.
+
+    Usage:
+        async with ServiceRunMainAsync() as pipeline:
+            results = await pipeline.run(reports=['B1770', 'B1780'])
+    """
+
+
+    def __init__(self,
+                 data_retriever: Optional[ServiceBmrsDataRetriever] = None,
+                 parquet_store: Optional[ServiceBmrsParquetStore] = None,
+                 service_plot: Optional[ServicePlot] = None,
+                 executor: Optional[Executor] = None,
+                 max_workers: Optional[int] = None,
+                 cpu_offload: Optional[ServiceCpuOffload] = None,
+                 metrics: Optional[ServiceMetrics] = None) -> None:
+        # Using dependency injection to allow preconfigured components.
+        self.data_retriever = data_retriever if data_retriever else \
+                                ServiceBmrsDataRetriever(cpu_offload=cpu_offload)
+        # Process pool converting retrieved items; defaults to the retriever's, and conversion runs in the
+        # executor when neither has one.
+        self.cpu_offload = cpu_offload if cpu_offload else self.data_retriever.cpu_offload
+        # Converted reports are upserted here; nothing is stored when it is None.
+        self.service_bmrs_parquet_store = parquet_store
+        # Plots are rendered headlessly to image files; nothing is plotted when it is None.
+        self.service_plot = service_plot
+        self.service_bmrs_analyser = ServiceBmrsDataframeAnalyser()
+        self.converter_dict_to_dataframe = ConverterDictToDataFrame()
+        self.service_bmrs_backfill = ServiceBmrsBackfill(data_retriever=self.data_retriever)
+        # Executor running the CPU-bound stages; one is created, and later shut down, if none is given.
+        self._owns_executor = executor is None
+        self.executor = executor if executor else ThreadPoolExecutor(max_workers=max_workers,
+                                                                     thread_name_prefix=self.__class__.__name__)
+        self.metrics = metrics if metrics else default_metrics
+        # Serialises the read-modify-write Parquet upserts of each report.
+        self._store_locks: dict[str, asyncio.Lock] = {}
+
+
+    async def __aenter__(self) -> 'ServiceRunMainAsync':
+        await self.data_retriever.open()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.data_retriever.close()
+        self.close()
+
+
+    def close(self) -> None:
+        """
+        Shuts down the executor if it was created by this pipeline.
+        """
+
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+
+    async def run(self,
+                  reports: Iterable[str] = ('B1770', 'B1780'),
+                  settlement_date: Optional[str] = None) -> dict[str, ObjectReportResult]:
+        """
+        Runs every report through the pipeline concurrently for one settlement date.
+
+        Args:
+            reports: The reports to be processed. Defaults to 'B1770' and 'B1780'.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'. Defaults to yesterday.
+
+        Returns a dictionary mapping each report name to its result.
+        """
+
+        settlement_date = settlement_date if settlement_date else \
+                            (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+        async with self.data_retriever.session_scope():
+            results = await asyncio.gather(*[self.process_report(report_name=report_name,
+                                                                 settlement_date=settlement_date)
+                                             for report_name in reports])
+
+        return {result.report_name: result for result in results}
+
+
+    async def process_report(self,
+                             report_name: str,
+                             settlement_date: str) -> ObjectReportResult:
+        """
+        Fetches one report and day, then converts, stores, analyses and plots it off the event loop.
+
+        Args:
+            report_name: The report to be processed, e.g. 'B1770'.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'.
+        """
+
+        with self.metrics.timer('stage_seconds', stage='fetch', report=report_name):
+            report_output = await self.data_retriever.retrieve_all_data(range_end=50,
+                                                                        range_start=1,
+                                                                        report_name=report_name,
+                                                                        settlement_date=settlement_date)
+
+        report_dataframe = await self.convert(report_name=report_name, report_output=report_output)
+        return await self.analyse(report_name=report_name, report_dataframe=report_dataframe)
+
+
+    async def stream_report(self,
+                            report_name: str,
+                            settlement_date: Optional[str] = None,
+                            ordered: bool = False,
+                            window: Optional[int] = None) -> AsyncIterator[ObjectImbalanceSummary]:
+        """
+        Streams one report and day, converting each batch of periods as it arrives and folding it into
+        running imbalance metrics, so the first summary is available as soon as the first period completes
+        rather than once the whole day has.
+
+        Args:
+            report_name: The report to be processed, e.g. 'B1770'.
+            settlement_date: The settlement date in the format 'YYYY-MM-DD'. Defaults to yesterday.
+            ordered: If True, periods are processed in order; otherwise as they complete.
+            window: The number of periods in flight or awaiting conversion, see ServiceBmrsDataRetriever.stream_periods.
+
+        Yields the summary of the settlement date, updated with every batch of periods.
+        """
+
+        settlement_date = settlement_date if settlement_date else \
+                            (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        service_bmrs_incremental_analyser = ServiceBmrsIncrementalAnalyser()
+
+        async for batch in self.data_retriever.stream_periods(periods=range(1, 51),
+                                                              ordered=ordered,
+                                                              window=window,
+                                                              report_name=report_name,
+                                                              settlement_date=settlement_date):
+            report_output = self.data_retriever.merge_periods(results=batch, report_name=report_name)
+            if len(report_output) == 0:
+                continue
+
+            # Batches may leave gaps that later batches fill.
+            with self.metrics.timer('stage_seconds', stage='convert', report=report_name):
+                report_dataframe = await self._convert(report_name=report_name,
+                                                       report_output=report_output)
+            if report_dataframe is None or report_dataframe.empty:
+                continue
+
+            for summary in service_bmrs_incremental_analyser.update(report_name=report_name,
+                                                                    report_ts_dataframe=report_dataframe):
+                yield summary
+
+
+    async def run_range(self,
+                        start_date: str,
+                        end_date: str,
+                        reports: Iterable[str] = ('B1770', 'B1780')) -> dict[str, ObjectReportResult]:
+        """
+        Retrieves every report over a range of settlement dates, converting each day off the event loop
+        as soon as it completes, then analyses and plots every report.
+
+        Args:
+            start_date: The first settlement date in the format 'YYYY-MM-DD' (inclusive).
+            end_date: The last settlement date in the format 'YYYY-MM-DD' (inclusive).
+            reports: The reports to be processed. Defaults to 'B1770' and 'B1780'.
+        """
+
+        reports = list(reports)
+        report_dataframes = {report_name: [] for report_name in reports}
+
+        async def convert_day(report_name: str, report_output: Any) -> None:
+            report_dataframe = await self.convert(report_name=report_name, report_output=report_output)
+            if report_dataframe is not None:
+                report_dataframes[report_name].append(report_dataframe)
+
+        # Days are converted concurrently with the retrieval of the remaining days.
+        conversions = []
+        try:
+            async for report_name, _, report_output in self.service_bmrs_backfill.backfill(reports=reports,
+                                                                                           start_date=start_date,
+                                                                                           end_date=end_date):
+                conversions.append(asyncio.ensure_future(convert_day(report_name, report_output)))
+            await asyncio.gather(*conversions)
+        finally:
+            for conversion in conversions:
+                conversion.cancel()
+
+        results = await asyncio.gather(*[self.analyse(report_name=report_name,
+                                                      report_dataframe=pd.concat(dataframes).sort_index()
+                                                                        if dataframes else None)
+                                         for report_name, dataframes in report_dataframes.items()])
+
+        return {result.report_name: result for result in results}
+
+
+    async def convert(self,
+                      report_name: str,
+                      report_output: Any) -> Optional[pd.DataFrame]:
+        """
+        Converts retrieved items into a time series in a worker process of cpu_offload, or in the executor.
+        """
+
+        if report_output is None or len(report_output) == 0:
+            logger.error(f"{self.__class__.__name__}: No data retrieved for {report_name}")
+            return None
+
+        with self.metrics.timer('stage_seconds', stage='convert', report=report_name):
+            report_dataframe = await self._convert(report_name=report_name, report_output=report_output)
+
+        if report_dataframe is not None and self.service_bmrs_parquet_store is not None:
+            await self.store(report_name=report_name, report_dataframe=report_dataframe)
+        return report_dataframe
+
+
+    async def _convert(self,
+                       report_name: str,
+                       report_output: Any) -> Optional[pd.DataFrame]:
+        """
+        Runs the converter in a worker process of cpu_offload, or in the executor.
+        """
+
+        if self.cpu_offload is not None:
+            return await self.cpu_offload.run(self.converter_dict_to_dataframe.convert,
+                                              report_name=report_name,
+                                              report_output=report_output)
+        return await self._offload(self.converter_dict_to_dataframe.convert,
+                                   report_name=report_name,
+                                   report_output=report_output)
+
+
+    async def store(self,
+                    report_name: str,
+                    report_dataframe: pd.DataFrame) -> None:
+        """
+        Upserts a time series into the Parquet store in the executor, one write per report at a time.
+        """
+
+        lock = self._store_locks.setdefault(report_name, asyncio.Lock())
+        async with lock:
+            with self.metrics.timer('stage_seconds', stage='store', report=report_name):
+                await self._offload(self.service_bmrs_parquet_store.write,
+                                    report_name=report_name,
+                                    report_ts_dataframe=report_dataframe)
+
+
+    async def analyse(self,
+                      report_name: str,
+                      report_dataframe: Optional[pd.DataFrame]) -> ObjectReportResult:
+        """
+        Calculates the imbalance metrics of a time series and renders its daily plots in the executor.
+        """
+
+        if report_dataframe is None:
+            return ObjectReportResult(report_name=report_name, report_ts_dataframe=None)
+
+        with self.metrics.timer('stage_seconds', stage='analyse', report=report_name):
+            summaries = await self._offload(self.service_bmrs_analyser.calculate_imbalances,
+                                            report_name=report_name,
+                                            report_ts_dataframe=report_dataframe)
+
+        plot_paths = []
+        if self.service_plot is not None:
+            with self.metrics.timer('stage_seconds', stage='plot', report=report_name):
+                plot_paths = await self._offload(self._render_days,
+                                                 report_name=report_name,
+                                                 report_dataframe=report_dataframe)
+
+        return ObjectReportResult(report_name=report_name,
+                                  report_ts_dataframe=report_dataframe,
+                                  summaries=summaries if summaries else [],
+                                  plot_paths=plot_paths)
+
+
+    def _render_days(self,
+                     report_name: str,
+                     report_dataframe: pd.DataFrame) -> list[str]:
+        """
+        Renders one plot per settlement date in the current executor thread.
+        """
+
+        paths = [self.service_plot.render(report_name=report_name, plot_dataframe=day_dataframe)
+                 for _, day_dataframe in report_dataframe.groupby(report_dataframe.index.normalize())]
+        return [path for path in paths if path is not None]
+
+
+    async def _offload(self,
+                       func: Callable[..., Any],
+                       **kwargs: Any) -> Any:
+        """
+        Runs a blocking call in the executor without blocking the event loop.
+        """
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, **kwargs))
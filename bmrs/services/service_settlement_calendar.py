@@ -0,0 +1,240 @@
+import functools
+import numpy as np
+import pandas as pd
+
+from datetime import date, datetime, timezone
+from typing import Any, Optional, Union
+
+
+class ServiceSettlementCalendar:
+    """
+    A settlement calendar precomputing the start of every settlement date in UTC and its number of
+    periods: 48 half hours, or 46 and 50 on the days the Europe/London clocks change.
+
+    Settlement periods count from local midnight, so period 3 of 2023-03-26 starts at 01:00 UTC
+    (02:00 BST) rather than 01:00 local. Every lookup is an array index into the precomputed days,
+    so requests can be generated for exactly the periods that exist, and (date, period) pairs map to
+    timezone-aware timestamps and positions in O(1):
+
+        calendar = get_default_calendar()
+        calendar.get_period_count(settlement_date='2023-10-29')        # 50
+        calendar.get_index(start_date='2023-10-29', end_date='2023-10-29')
+    """
+
+    LOCAL_TIMEZONE = 'Europe/London'
+
+
+    def __init__(self,
+                 start_date: str = '1990-01-01',
+                 end_date: str = '2060-12-31',
+                 granularity: str = '30min') -> None:
+        # The first settlement date covered, as the origin of every day index.
+        self.start_date = np.datetime64(start_date, 'D')
+        # The length of a settlement period, unless a lookup asks for another granularity.
+        self.granularity = pd.Timedelta(granularity)
+
+        # The UTC start of every covered date and of the day after the last one, in nanoseconds.
+        days = pd.date_range(start=start_date, end=pd.Timestamp(end_date) + pd.Timedelta(days=1), freq='D')
+        self._day_starts = days.tz_localize(self.LOCAL_TIMEZONE).tz_convert('UTC').asi8
+        self._day_lengths = np.diff(self._day_starts)
+        # Number of periods of every covered date, and the position of its first period in the calendar.
+        self.period_counts = (self._day_lengths // self.granularity.value).astype(np.int16)
+        self._offsets = np.concatenate([[0], np.cumsum(self.period_counts, dtype=np.int64)])
+
+
+    def __len__(self) -> int:
+        return len(self.period_counts)
+
+
+    def get_period_count(self,
+                         settlement_date: Union[str, date],
+                         granularity: Optional[str] = None) -> int:
+        """
+        Returns the number of settlement periods of a date: 48, or 46 and 50 on clock-change days.
+
+        Args:
+            settlement_date: The settlement date, as a date or in the format 'YYYY-MM-DD'.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        day = self._get_day(settlement_date=settlement_date)
+        if granularity is None or pd.Timedelta(granularity) == self.granularity:
+            return int(self.period_counts[day])
+        return int(self._day_lengths[day] // pd.Timedelta(granularity).value)
+
+
+    def get_period_counts(self,
+                          settlement_dates: Any,
+                          granularity: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the number of settlement periods of each date.
+
+        Args:
+            settlement_dates: The settlement dates, as dates, datetime64 values or strings in the format 'YYYY-MM-DD'.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        days = self._get_days(settlement_dates=settlement_dates)
+        if granularity is None or pd.Timedelta(granularity) == self.granularity:
+            return self.period_counts[days]
+        return (self._day_lengths[days] // pd.Timedelta(granularity).value).astype(np.int16)
+
+
+    def get_periods(self,
+                    settlement_date: Union[str, date],
+                    granularity: Optional[str] = None) -> range:
+        """
+        Returns the settlement periods of a date, e.g. range(1, 47) on the spring clock-change day.
+
+        Args:
+            settlement_date: The settlement date, as a date or in the format 'YYYY-MM-DD'.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        return range(1, self.get_period_count(settlement_date=settlement_date, granularity=granularity) + 1)
+
+
+    def get_ended_period_count(self,
+                               settlement_date: Union[str, date],
+                               now: Optional[datetime] = None,
+                               granularity: Optional[str] = None) -> int:
+        """
+        Returns the number of settlement periods of a date that have ended by now, e.g. all of them for a past date.
+
+        Args:
+            settlement_date: The settlement date, as a date or in the format 'YYYY-MM-DD'.
+            now (datetime): The current time, naive values being read as UTC. Defaults to the system clock.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        day = self._get_day(settlement_date=settlement_date)
+        now = pd.Timestamp(now if now else datetime.now(timezone.utc))
+        now = now.tz_localize(timezone.utc) if now.tzinfo is None else now
+        period_length = pd.Timedelta(granularity).value if granularity is not None else self.granularity.value
+
+        ended_count = (now.value - int(self._day_starts[day])) // period_length
+        return int(min(max(ended_count, 0), self._day_lengths[day] // period_length))
+
+
+    def to_timestamps(self,
+                      settlement_dates: Any,
+                      settlement_periods: Any,
+                      granularity: Optional[str] = None) -> pd.DatetimeIndex:
+        """
+        Returns the Europe/London start time of each (settlement date, period) pair.
+
+        Args:
+            settlement_dates: The settlement date of each pair.
+            settlement_periods: The settlement period of each pair, counting from 1.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        granularity = pd.Timedelta(granularity) if granularity is not None else self.granularity
+        days = self._get_days(settlement_dates=settlement_dates)
+        periods = np.asarray(settlement_periods, dtype=np.int64)
+
+        timestamps = self._day_starts[days] + (periods - 1) * granularity.value
+        return pd.DatetimeIndex(timestamps.astype('datetime64[ns]'), name='datetime') \
+                                        .tz_localize('UTC').tz_convert(self.LOCAL_TIMEZONE)
+
+
+    def to_settlement_periods(self,
+                              timestamps: pd.DatetimeIndex,
+                              granularity: Optional[str] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the settlement date (datetime64[D]) and period of each timestamp, inverting to_timestamps.
+
+        Args:
+            timestamps (pd.DatetimeIndex): The timezone-aware start time of each period.
+            granularity (str): The length of a settlement period as a pandas frequency. Defaults to the calendar's.
+        """
+
+        granularity = pd.Timedelta(granularity) if granularity is not None else self.granularity
+        timestamps = pd.DatetimeIndex(timestamps)
+
+        settlement_dates = timestamps.tz_convert(self.LOCAL_TIMEZONE).tz_localize(None).normalize() \
+                                        .to_numpy(dtype='datetime64[D]')
+        days = self._get_days(settlement_dates=settlement_dates)
+        periods = (timestamps.asi8 - self._day_starts[days]) // granularity.value + 1
+        return settlement_dates, periods
+
+
+    def get_index(self,
+                  start_date: Union[str, date],
+                  end_date: Union[str, date]) -> pd.DatetimeIndex:
+        """
+        Returns the Europe/London start time of every period between start_date and end_date (inclusive),
+        in settlement order, built from the precomputed days without any timezone arithmetic.
+
+        Args:
+            start_date: The first settlement date, as a date or in the format 'YYYY-MM-DD'.
+            end_date: The last settlement date, as a date or in the format 'YYYY-MM-DD'.
+        """
+
+        first, last = self._get_day(settlement_date=start_date), self._get_day(settlement_date=end_date)
+        counts = self.period_counts[first:last + 1].astype(np.int64)
+
+        # Each period starts a whole number of periods after the UTC start of its day.
+        day_starts = np.repeat(self._day_starts[first:last + 1], counts)
+        period_offsets = np.arange(counts.sum()) - np.repeat(self._offsets[first:last + 1] - self._offsets[first], counts)
+
+        timestamps = day_starts + period_offsets * self.granularity.value
+        return pd.DatetimeIndex(timestamps.astype('datetime64[ns]'), name='datetime') \
+                                        .tz_localize('UTC').tz_convert(self.LOCAL_TIMEZONE)
+
+
+    def get_locations(self,
+                      settlement_dates: Any,
+                      settlement_periods: Any,
+                      start_date: Union[str, date, None] = None) -> np.ndarray:
+        """
+        Returns the position of each (settlement date, period) pair in get_index(start_date, ...),
+        so a frame indexed by the calendar is addressed without searching its index.
+
+        Args:
+            settlement_dates: The settlement date of each pair.
+            settlement_periods: The settlement period of each pair, counting from 1.
+            start_date: The first settlement date of the index. Defaults to the first date of the calendar.
+        """
+
+        days = self._get_days(settlement_dates=settlement_dates)
+        origin = self._offsets[self._get_day(settlement_date=start_date)] if start_date is not None else 0
+        return self._offsets[days] - origin + np.asarray(settlement_periods, dtype=np.int64) - 1
+
+
+    def _get_day(self,
+                 settlement_date: Union[str, date]) -> int:
+        """
+        Returns the index of a settlement date among the covered days, raising a ValueError outside them.
+        """
+
+        day = int((np.datetime64(settlement_date).astype('datetime64[D]') - self.start_date).astype(np.int64))
+        if not 0 <= day < len(self.period_counts):
+            raise ValueError(f"Settlement date {settlement_date} is not covered by the calendar, starting "
+                             f"{self.start_date} for {len(self.period_counts)} days.")
+        return day
+
+
+    def _get_days(self,
+                  settlement_dates: Any) -> np.ndarray:
+        """
+        Returns the index of each settlement date among the covered days, raising a ValueError outside them.
+        """
+
+        settlement_dates = np.asarray(settlement_dates)
+        if settlement_dates.dtype.kind != 'M':
+            settlement_dates = pd.to_datetime(settlement_dates.ravel(), format='ISO8601').to_numpy()
+        days = (settlement_dates.astype('datetime64[D]') - self.start_date).astype(np.int64)
+
+        if days.size and (days.min() < 0 or days.max() >= len(self.period_counts)):
+            raise ValueError(f"Settlement dates should be covered by the calendar, starting {self.start_date} "
+                             f"for {len(self.period_counts)} days.")
+        return days
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_calendar() -> ServiceSettlementCalendar:
+    """
+    Returns the calendar shared by every component that is not given one, precomputed once on first use.
+    """
+    return ServiceSettlementCalendar()
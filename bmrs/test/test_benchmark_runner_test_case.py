@@ -0,0 +1,72 @@
+import os
+import asyncio
+import tempfile
+import unittest
+
+from bmrs.benchmarks.benchmark_runner import BenchmarkRunner
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class TestBenchmarkRunnerTestCase(unittest.TestCase):
+    """
+    Test cases for the benchmark harness to ensure the stand-in server is realistic and scenarios are recorded.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a temporary directory for the benchmark results before each test.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, 'benchmarks.jsonl')
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def test_stand_in_server_serves_whole_days(self):
+        """
+        Test that whole days are served in XML and CSV, with 46 periods on the spring clock change.
+        """
+        async def retrieve_days(server, service_type):
+            retriever = BenchmarkRunner(service_type=service_type).build_retriever(url_builder=server,
+                                                                                   metrics=ServiceMetrics())
+            return [await retriever.retrieve_day(report_name, settlement_date)
+                    for report_name, settlement_date in [('B1770', '2023-03-26'), ('B1780', '2023-11-03')]]
+
+        with BenchmarkBmrsStandInServer(seed=1) as server:
+            xml_days = asyncio.run(retrieve_days(server, 'xml'))
+            csv_days = asyncio.run(retrieve_days(server, 'csv'))
+
+        self.assertEqual([len(day) for day in xml_days], [46, 48])
+        self.assertEqual([len(day) for day in csv_days], [46, 48])
+        self.assertAlmostEqual(float(xml_days[1][48]['imbalanceQuantityMAW']),
+                               csv_days[1][48]['imbalanceQuantityMAW'].iloc[0])
+
+
+    def test_day_scenario_records_result(self):
+        """
+        Test that a scenario converts every period despite injected errors and appends its result.
+        """
+        runner = BenchmarkRunner(output_path=self.output_path,
+                                 server_options={'error_rate': 0.2, 'seed': 3})
+        runner.build_retriever = self._fast_retries(runner.build_retriever)
+
+        results = runner.run(scenarios=['day'], start_date='2023-11-01')
+
+        self.assertEqual(results[0].periods, 96, "Both reports should be converted for the whole day.")
+        self.assertGreaterEqual(results[0].requests, 2)
+        self.assertGreater(results[0].peak_memory_mb, 0)
+        with open(self.output_path) as output_file:
+            self.assertEqual(len(output_file.readlines()), 1, "Result was not appended to the output file.")
+
+
+    def _fast_retries(self, build_retriever):
+        def build(**kwargs):
+            retriever = build_retriever(**kwargs)
+            retriever.retry_policy.base_delay = 0.01
+            retriever.retry_policy.max_attempts = 10
+            return retriever
+        return build
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from django.test import TestCase
+
+from bmrs.converters.converter_csv_to_dataframe import ConverterCsvToDataFrame
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+
+
+class TestConverterCsvToDataframeTestCase(TestCase):
+    """Test cases for the ConverterCsvToDataFrame."""
+
+    def setUp(self):
+        """Set up test case dependencies."""
+        self.converter_csv_to_dataframe = ConverterCsvToDataFrame()
+        self.converter_dict_to_dataframe = ConverterDictToDataFrame()
+
+        # Read the raw CSV response used by the tests.
+        with open('./bmrs/test/data/bmrs_data_b1770.csv', 'rb') as f:
+            self.content = f.read()
+
+
+    def test_converter_csv_to_dataframe(self):
+        """Test that a CSV response is parsed into typed settlement and value columns."""
+        csv_dataframe = self.converter_csv_to_dataframe.convert(report_name='B1770', content=self.content)
+
+        self.assertIsInstance(csv_dataframe, pd.DataFrame)
+        self.assertListEqual(list(csv_dataframe.columns), ['settlementDate', 'settlementPeriod', 'imbalancePriceAmountGBP'])
+        self.assertEqual(len(csv_dataframe), 5)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(csv_dataframe['settlementDate']))
+        self.assertTrue(pd.api.types.is_integer_dtype(csv_dataframe['settlementPeriod']))
+        self.assertEqual(csv_dataframe['imbalancePriceAmountGBP'].iloc[0], -25.85)
+
+
+    def test_csv_dataframe_converts_to_time_series(self):
+        """Test that the typed CSV DataFrame feeds ConverterDictToDataFrame without a dict-per-row stage."""
+        csv_dataframe = self.converter_csv_to_dataframe.convert(report_name='B1770', content=self.content)
+        bmrs_dataframe = self.converter_dict_to_dataframe.convert(report_name='B1770', report_output=csv_dataframe)
+
+        self.assertEqual(len(bmrs_dataframe), 5)
+        self.assertListEqual(list(bmrs_dataframe.columns), ['imbalancePriceAmountGBP'])
+
+
+    def test_empty_csv_response(self):
+        """Test that a CSV response without rows produces an empty DataFrame."""
+        csv_dataframe = self.converter_csv_to_dataframe.convert(report_name='B1770', content=b'HDR,IMBALANCE PRICES\nFTR,0\n')
+
+        self.assertTrue(csv_dataframe.empty)
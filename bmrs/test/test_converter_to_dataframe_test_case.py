@@ -5,6 +5,7 @@ from unittest.mock import Mock
 from django.test import TestCase
 from bmrs.converters import logger
 from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.objects.object_period_records import ObjectPeriodRecords
 
 
 class TestConverterToDataframeTestCase(TestCase):
@@ -45,4 +46,55 @@ class TestConverterToDataframeTestCase(TestCase):
         self.assertIsNotNone(bbmrs_dataframe)
         self.assertIsInstance(bbmrs_dataframe, pd.DataFrame)
         self.assertEqual(len(bbmrs_dataframe), report_length)
-        self.assertListEqual(list(bbmrs_dataframe.columns), expected_columns)
\ No newline at end of file
+        self.assertListEqual(list(bbmrs_dataframe.columns), expected_columns)
+
+    def test_convert_columns_multi_day_multi_column(self):
+        """Test vectorised conversion of columnar data spanning several days with caller chosen value columns."""
+        settlement_dates = ['2023-11-01'] * 48 + ['2023-11-02'] * 48
+        settlement_periods = list(range(1, 49)) * 2
+        columns = {'settlementDate': settlement_dates,
+                   'settlementPeriod': settlement_periods,
+                   'imbalancePriceAmountGBP': [str(period) for period in range(96)],
+                   'imbalanceQuantityMAW': list(range(96))}
+
+        bmrs_dataframe = self.converter_dict_to_dataframe.convert_columns(report_name='B1770',
+                                                                          columns=columns,
+                                                                          value_columns=['imbalancePriceAmountGBP',
+                                                                                         'imbalanceQuantityMAW'])
+
+        self.assertEqual(len(bmrs_dataframe), 96)
+        self.assertListEqual(list(bmrs_dataframe.columns), ['imbalancePriceAmountGBP', 'imbalanceQuantityMAW'])
+        self.assertEqual(bmrs_dataframe.index[48], pd.Timestamp('2023-11-02 00:00', tz='Europe/London'))
+        self.assertTrue((bmrs_dataframe.dtypes == 'float64').all())
+
+
+    def test_convert_keeps_last_duplicated_period_and_gaps(self):
+        """Test that duplicated periods keep their last value and missing periods are left out, not filled."""
+        report_output = [{'settlementDate': '2023-11-03', 'settlementPeriod': '1', 'imbalancePriceAmountGBP': '1.0'},
+                         {'settlementDate': '2023-11-03', 'settlementPeriod': '1', 'imbalancePriceAmountGBP': '2.0'},
+                         {'settlementDate': '2023-11-03', 'settlementPeriod': '3', 'imbalancePriceAmountGBP': '3.0'},
+                         {'settlementDate': '2023-11-03', 'settlementPeriod': '4', 'imbalancePriceAmountGBP': None}]
+
+        bmrs_dataframe = self.converter_dict_to_dataframe.convert(report_name='B1770', report_output=report_output)
+
+        self.assertListEqual(list(bmrs_dataframe['imbalancePriceAmountGBP']), [2.0, 3.0])
+        self.assertListEqual([str(timestamp.time()) for timestamp in bmrs_dataframe.index], ['00:00:00', '01:00:00'])
+
+
+    def test_convert_compact_records(self):
+        """Test that compact records built from dictionaries and DataFrames convert like the dictionaries."""
+        report_output = [{'settlementDate': '2023-11-03', 'settlementPeriod': '1', 'imbalancePriceAmountGBP': '1.0'},
+                         {'settlementDate': '2023-11-03', 'settlementPeriod': None, 'imbalancePriceAmountGBP': '9.0'},
+                         {'settlementDate': '2023-11-03', 'settlementPeriod': '3', 'imbalancePriceAmountGBP': '3.0'}]
+        report_frame = pd.DataFrame({'settlementDate': pd.to_datetime(['2023-11-03']),
+                                     'settlementPeriod': [2],
+                                     'imbalancePriceAmountGBP': [2.0]})
+
+        records = ObjectPeriodRecords.from_items(report_name='B1770',
+                                                 items=[*report_output, report_frame],
+                                                 value_columns=['imbalancePriceAmountGBP'])
+        bmrs_dataframe = self.converter_dict_to_dataframe.convert(report_name='B1770', report_output=records)
+
+        self.assertEqual(len(records), 3, "Items without a settlement period should be dropped.")
+        self.assertEqual(records.nbytes, 3 * (8 + 2 + 8))
+        self.assertListEqual(list(bmrs_dataframe['imbalancePriceAmountGBP']), [1.0, 2.0, 3.0])
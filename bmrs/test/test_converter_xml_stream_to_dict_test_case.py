@@ -0,0 +1,62 @@
+from django.test import TestCase
+
+from bmrs.converters.converter_xml_stream_to_dict import ConverterXmlStreamToDict
+
+
+class TestConverterXmlStreamToDictTestCase(TestCase):
+    """Test cases for the ConverterXmlStreamToDict."""
+
+    def setUp(self):
+        """Set up test case dependencies."""
+        self.converter_xml_stream_to_dict = ConverterXmlStreamToDict()
+
+        # Read the raw XML response used by the tests.
+        with open('./bmrs/test/data/bmrs_data_b1770.xml', 'rb') as f:
+            self.content = f.read()
+
+
+    def test_streaming_parse_keeps_only_configured_fields(self):
+        """Test that feeding the response in small chunks extracts every item with only the wanted fields."""
+        parser = self.converter_xml_stream_to_dict.create_parser(report_name='B1770')
+
+        # Feed the response in small chunks to split tags across chunk boundaries.
+        for start in range(0, len(self.content), 97):
+            parser.feed(self.content[start:start + 97])
+        items = parser.close()
+
+        self.assertEqual(len(items), 5)
+        self.assertDictEqual(items[0], {'settlementDate': '2023-11-03',
+                                        'settlementPeriod': '1',
+                                        'imbalancePriceAmountGBP': '-25.85'})
+        self.assertListEqual([item['settlementPeriod'] for item in items], ['1', '2', '3', '4', '5'])
+
+
+    def test_empty_response_has_no_items(self):
+        """Test that a response without a body produces no items."""
+        content = (b'<?xml version="1.0" encoding="UTF-8"?><response><responseMetadata>'
+                   b'<httpCode>204</httpCode><errorType>No Content</errorType></responseMetadata></response>')
+
+        self.assertListEqual(self.converter_xml_stream_to_dict.convert(report_name='B1770', content=content), [])
+
+
+    def test_error_response_has_no_items(self):
+        """Test that items of a responseList outside the responseBody, as in error bodies, are ignored."""
+        content = (b'<?xml version="1.0" encoding="UTF-8"?><response><responseMetadata>'
+                   b'<httpCode>400</httpCode><errorType>Bad Request</errorType></responseMetadata>'
+                   b'<responseList><item><errorDescription>Invalid SettlementDate</errorDescription></item>'
+                   b'</responseList></response>')
+
+        self.assertListEqual(self.converter_xml_stream_to_dict.convert(report_name='B1770', content=content), [])
+
+
+    def test_empty_or_invalid_body_has_no_items(self):
+        """Test that an empty body, or one that is not valid XML, is read as no data rather than failing."""
+        for content in (b'', b'<html><body>Service Unavailable', self.content[:len(self.content) // 2] + b'</oops>'):
+            self.assertListEqual(self.converter_xml_stream_to_dict.convert(report_name='B1770', content=content), [])
+
+
+    def test_unknown_report_keeps_every_field(self):
+        """Test that reports without configured columns keep every field of their items."""
+        items = self.converter_xml_stream_to_dict.convert(report_name='B1610', content=self.content)
+
+        self.assertEqual(len(items[0]), 15)
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from bmrs.objects.object_aggregation import ObjectAggregation
+from bmrs.objects.object_report_definition import ObjectReportDefinition
+from bmrs.registries.registry_reports import RegistryReports, build_default_registry
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_bmrs_dataframe_analyser import ServiceBmrsDataframeAnalyser
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.converters.converter_xml_stream_to_dict import ConverterXmlStreamToDict
+
+
+class TestRegistryReportsTestCase(unittest.TestCase):
+    """
+    Test cases for the RegistryReports class to ensure reports are supported by registering a definition.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a registry holding the default reports and an extra hourly report with a float32 column.
+        """
+        self.registry = build_default_registry()
+        self.registry.register(ObjectReportDefinition(report_name='B0000',
+                                                      value_columns=('quantity',),
+                                                      dtypes={'quantity': 'float32'},
+                                                      granularity='60min',
+                                                      aggregations={'maximum': ObjectAggregation(
+                                                                        function=pd.Series.max,
+                                                                        message='maximum quantity {value:.1f}')}))
+
+
+    def test_default_reports(self):
+        """
+        Test that B1770 and B1780 are registered with their environment columns and whole-day support.
+        """
+        self.assertEqual(list(self.registry), ['B1770', 'B1780', 'B0000'])
+        self.assertEqual(self.registry.bulk_reports, frozenset({'B1770', 'B1780'}))
+        self.assertEqual(self.registry.get_fields(report_name='B1770'),
+                         frozenset({'settlementDate', 'settlementPeriod', 'imbalancePriceAmountGBP'}))
+        self.assertIsNone(self.registry.get(report_name='B9999'))
+        with self.assertRaises(ValueError):
+            self.registry.register(ObjectReportDefinition(report_name='B9999', value_columns=()))
+
+
+    def test_registered_report_runs_through_the_pipeline(self):
+        """
+        Test that a registered report is parsed, converted at its granularity and dtype, and analysed.
+        """
+        content = (b'<response><responseBody><responseList>'
+                   b'<item><settlementDate>2023-11-03</settlementDate><settlementPeriod>1</settlementPeriod>'
+                   b'<quantity>1.5</quantity><ignored>x</ignored></item>'
+                   b'<item><settlementDate>2023-11-03</settlementDate><settlementPeriod>3</settlementPeriod>'
+                   b'<quantity>3.5</quantity><ignored>y</ignored></item>'
+                   b'</responseList></responseBody></response>')
+
+        items = ConverterXmlStreamToDict(registry=self.registry).convert(report_name='B0000', content=content)
+        report_dataframe = ConverterDictToDataFrame(registry=self.registry).convert(report_name='B0000',
+                                                                                    report_output=items)
+        summaries = ServiceBmrsDataframeAnalyser(registry=self.registry).calculate_imbalances(
+                                                                                    report_name='B0000',
+                                                                                    report_ts_dataframe=report_dataframe)
+
+        self.assertNotIn('ignored', items[0])
+        self.assertEqual(report_dataframe['quantity'].dtype, np.float32)
+        self.assertEqual([str(timestamp.time()) for timestamp in report_dataframe.index],
+                         ['00:00:00', '02:00:00'], "The missing period 2 should be left as a gap.")
+        self.assertEqual(summaries[0].period_count, 2)
+        self.assertEqual(summaries[0].aggregates, {'maximum': 3.5}, "The registered aggregation was not applied.")
+        self.assertEqual(ServiceBmrsDataRetriever(timeout=10,
+                                                  max_tries=3,
+                                                  max_concurrent_tasks=5,
+                                                  rate_limit_sleep_time=30,
+                                                  registry=self.registry).bulk_reports,
+                         frozenset({'B1770', 'B1780'}))
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+from bmrs.services.service_bmrs_backfill import ServiceBmrsBackfill
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.services.service_bmrs_backfill_manifest import ServiceBmrsBackfillManifest
+
+
+class TestServiceBmrsBackfillManifestTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsBackfillManifest class to ensure backfills resume and repair only missing units.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a backfill with a manifest backed by a temporary SQLite file before each test.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest = ServiceBmrsBackfillManifest(path=os.path.join(self.temp_dir.name, 'backfill.sqlite3'))
+        self.bmrs_data_retriever = \
+                    ServiceBmrsDataRetriever(timeout=10,
+                                            max_tries=3,
+                                            max_concurrent_tasks=5,
+                                            rate_limit_sleep_time=30
+                                            )
+        self.service_bmrs_backfill = ServiceBmrsBackfill(data_retriever=self.bmrs_data_retriever,
+                                                         manifest=self.manifest,
+                                                         max_attempts=2)
+        self.requested = []
+
+
+    def tearDown(self):
+        """
+        Close the manifest and remove the temporary directory.
+        """
+        self.manifest.close()
+        self.temp_dir.cleanup()
+
+
+    async def retrieve_periods(self, report_name, settlement_date, periods, file_format=None):
+        """
+        Stand-in for ServiceBmrsDataRetriever.retrieve_periods where period 2 of 2023-11-02 always fails.
+        """
+        self.requested.append((report_name, settlement_date, list(periods)))
+        return {period: {'settlementPeriod': str(period)} for period in periods
+                if (settlement_date, period) != ('2023-11-02', 2)}
+
+
+    def test_add_units_and_record(self):
+        """
+        Test that units are registered once and their outcomes and attempts are recorded.
+        """
+        added = self.manifest.add_units(reports=['B1770'], settlement_dates=['2023-11-01'], periods=[1, 2, 3])
+        added_again = self.manifest.add_units(reports=['B1770'], settlement_dates=['2023-11-01'], periods=[1, 2, 3])
+        self.manifest.record(report_name='B1770', settlement_date='2023-11-01', done_periods=[1], failed_periods=[3])
+
+        self.assertEqual((added, added_again), (3, 0), "Units were registered more than once.")
+        self.assertEqual(self.manifest.snapshot(), {'pending': 1, 'done': 1, 'failed': 1})
+        self.assertEqual(self.manifest.get_units(status='failed'), {('B1770', '2023-11-01'): [3]})
+        self.assertEqual(self.manifest.get_units(status='failed', max_attempts=1), {},
+                         "Units out of attempts should not be returned.")
+
+
+    def test_backfill_resumes_and_repairs_missing_units(self):
+        """
+        Test that a rerun requests nothing already attempted and that repair retries only the failed units.
+        """
+        with patch.object(ServiceBmrsDataRetriever, 'retrieve_periods', side_effect=self.retrieve_periods):
+            first_run = self.service_bmrs_backfill.sync_backfill(reports=['B1770'],
+                                                                 start_date='2023-11-01',
+                                                                 end_date='2023-11-02',
+                                                                 range_end=3)
+            second_run = self.service_bmrs_backfill.sync_backfill(reports=['B1770'],
+                                                                  start_date='2023-11-01',
+                                                                  end_date='2023-11-02',
+                                                                  range_end=3)
+            self.requested.clear()
+            repaired = self.service_bmrs_backfill.sync_repair()
+            repaired_again = self.service_bmrs_backfill.sync_repair()
+
+        self.assertEqual(len(first_run[('B1770', '2023-11-02')]), 2, "Failed periods should not be returned.")
+        self.assertEqual(second_run, {}, "A resumed backfill requested units that were already attempted.")
+        self.assertEqual(self.requested, [('B1770', '2023-11-02', [2])], "Repair should only retry failed units.")
+        self.assertEqual({day: len(items) for day, items in repaired.items()}, {('B1770', '2023-11-02'): 0})
+        self.assertEqual(repaired_again, {}, "Units out of attempts should not be retried.")
+        self.assertEqual(self.manifest.snapshot(), {'pending': 0, 'done': 5, 'failed': 1})
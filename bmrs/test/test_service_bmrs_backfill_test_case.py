@@ -0,0 +1,57 @@
+import unittest
+
+from unittest.mock import patch, AsyncMock
+from bmrs.services.service_bmrs_backfill import ServiceBmrsBackfill
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+
+
+class TestServiceBmrsBackfillTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsBackfill class to ensure every report and day is scheduled and returned.
+    """
+
+
+    def setUp(self):
+        """
+        Set up the ServiceBmrsBackfill instance with a retriever before each test.
+        """
+        self.bmrs_data_retriever = \
+                    ServiceBmrsDataRetriever(timeout=10,
+                                            max_tries=3,
+                                            max_concurrent_tasks=5,
+                                            rate_limit_sleep_time=30
+                                            )
+        self.service_bmrs_backfill = ServiceBmrsBackfill(data_retriever=self.bmrs_data_retriever)
+
+
+    @patch('bmrs.services.service_bmrs_data_retriever.ServiceBmrsDataRetriever.retrieve_all_data',\
+                                                                                new_callable=AsyncMock)
+    def test_sync_backfill_all_reports_and_days(self, mock_retrieve_all_data):
+        """
+        Test that a backfill returns the data of every (report, date) pair in the range.
+        """
+        mock_retrieve_all_data.return_value = [{'data': 'mock_data'}] * 50
+
+        results = self.service_bmrs_backfill.sync_backfill(reports=['B1770', 'B1780'],
+                                                           start_date='2023-10-30',
+                                                           end_date='2023-11-01')
+
+        expected_keys = {(report_name, settlement_date)
+                         for report_name in ['B1770', 'B1780']
+                         for settlement_date in ['2023-10-30', '2023-10-31', '2023-11-01']}
+        
+        self.assertSetEqual(set(results.keys()), expected_keys, "Backfill did not return every report and day.")
+        self.assertEqual(mock_retrieve_all_data.await_count, 6, "Each report and day should be retrieved exactly once.")
+        self.assertTrue(all(len(items) == 50 for items in results.values()), "Day results do not match the retrieved data.")
+
+
+    def test_get_settlement_dates_invalid_range(self):
+        """
+        Test that an end date before the start date produces no settlement dates and logs an error.
+        """
+        with self.assertLogs('bmrs.services  ', level='ERROR') as cm:
+            settlement_dates = self.service_bmrs_backfill.get_settlement_dates(start_date='2023-11-02',
+                                                                               end_date='2023-11-01')
+
+        self.assertEqual(settlement_dates, [], "Settlement dates returned for an invalid range.")
+        self.assertIn("'end_date' is before 'start_date'", cm.output[0], "Expected error message not found in log output.")
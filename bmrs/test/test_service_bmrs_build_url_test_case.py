@@ -1,14 +1,24 @@
-from unittest import TestCase, mock
+import tempfile
 
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+
+from bmrs.objects.object_bmrs_settings import ObjectBmrsSettings, get_default_bmrs_settings
 from bmrs.services.service_bmrs_build_url import ServiceBmrsBuildUrl
 
 
 class TestServiceBmrsBuildUrlTestCase(TestCase): 
     
     
-    @mock.patch("bmrs.services.service_bmrs_build_url.bmrs_api_vars_required", lambda x: x)
     def setUp(self):
-        self._service_bmrs_build_url = ServiceBmrsBuildUrl()
+        self._service_bmrs_build_url = ServiceBmrsBuildUrl(settings=ObjectBmrsSettings(
+                            host='https://api.bmreports.com/BMRS/',
+                            version='V1',
+                            url_end_str='SettlementDate={SettlementDate}&Period={Period}&ServiceType={ServiceType}',
+                            api_scripting_key='2zsd43hl5hjii36'))
 
 
     def test_service_bmrs_build_url(self):
@@ -30,4 +40,76 @@ class TestServiceBmrsBuildUrlTestCase(TestCase):
 
         self.assertIsNotNone(url)
         self.assertIsInstance(url, str)
-        self.assertEqual(url, desired_url_outcome)
\ No newline at end of file
+        self.assertEqual(url, desired_url_outcome)
+
+
+    def test_service_bmrs_build_url_whole_day(self):
+        """Test that '*' requests every period of the settlement date."""
+        
+        url = self._service_bmrs_build_url.build_url(period='*',
+                                                     report_name='B1780', 
+                                                     service_type='csv',
+                                                     settlement_date='2023-10-01')
+        
+        self.assertEqual(url, 
+        'https://api.bmreports.com/BMRS/B1780/V1?APIKey=2zsd43hl5hjii36&SettlementDate=2023-10-01&Period=*&ServiceType=csv')
+
+
+    def test_service_bmrs_build_urls(self):
+        """Test that the URLs of a date range match the URLs built one at a time, date by date."""
+
+        settlement_dates = pd.date_range('2022-01-01', '2023-12-31')
+        
+        urls = self._service_bmrs_build_url.build_urls(report_name='B1770',
+                                                       settlement_dates=settlement_dates)
+        
+        self.assertEqual(len(urls), len(settlement_dates) * 48, "Clock-change days should have 46 and 50 periods.")
+        self.assertEqual(urls[49], self._service_bmrs_build_url.build_url(period='2',
+                                                                          report_name='B1770',
+                                                                          settlement_date='2022-01-02'))
+        self.assertEqual(self._service_bmrs_build_url.build_urls(report_name='B1780',
+                                                                 settlement_dates=['2023-10-01'],
+                                                                 periods=['*'],
+                                                                 service_type='csv'),
+        ['https://api.bmreports.com/BMRS/B1780/V1?APIKey=2zsd43hl5hjii36&SettlementDate=2023-10-01&Period=*&ServiceType=csv'])
+        self.assertIsNone(self._service_bmrs_build_url.build_urls(report_name='B1770',
+                                                                  settlement_dates=['2023-10-01'],
+                                                                  periods=[51]))
+        self.assertIsNone(self._service_bmrs_build_url.build_urls(report_name='B1770',
+                                                                  settlement_dates=['01/10/2023']))
+
+
+    def test_settings_load(self):
+        """Test that the environment takes precedence over the .env file and missing settings build no URL."""
+        
+        with tempfile.TemporaryDirectory() as directory:
+            env_file = Path(directory) / '.env'
+            env_file.write_text("# BMRS\nHOST=https://example.com/BMRS/\nAPI_SCRIPTING_KEY='file-key'\n")
+            
+            settings = ObjectBmrsSettings.load(environ={'API_SCRIPTING_KEY': 'env-key', 'VERSION': 'V2'},
+                                               env_file=env_file)
+        
+        self.assertEqual(settings, ObjectBmrsSettings(host='https://example.com/BMRS/',
+                                                      version='V2',
+                                                      api_scripting_key='env-key'))
+        self.assertFalse(settings.is_complete)
+        self.assertIsNone(ServiceBmrsBuildUrl(settings=settings).build_url(period='1',
+                                                                           report_name='B1770',
+                                                                           settlement_date='2023-10-01'))
+
+
+    @patch('bmrs.objects.object_bmrs_settings._default_bmrs_settings', None)
+    def test_default_settings_cached_once_complete(self):
+        """Test that an incomplete load of the default settings is not kept and a complete one is."""
+        
+        complete = ObjectBmrsSettings(host='https://example.com/BMRS/',
+                                      version='V1',
+                                      url_end_str='Period={Period}',
+                                      api_scripting_key='key')
+        
+        with patch.object(ObjectBmrsSettings, 'load', side_effect=[ObjectBmrsSettings(), complete]) as mock_load:
+            self.assertFalse(get_default_bmrs_settings().is_complete)
+            self.assertEqual(get_default_bmrs_settings(), complete, "An incomplete load was kept.")
+            self.assertIs(get_default_bmrs_settings(), complete, "A complete load was not kept.")
+        
+        self.assertEqual(mock_load.call_count, 2)
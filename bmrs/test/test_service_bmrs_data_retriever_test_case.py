@@ -2,7 +2,12 @@ import asyncio
 import unittest
 
 from unittest.mock import patch, AsyncMock
+from bmrs.objects.object_bmrs_settings import ObjectBmrsSettings
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_rate_limiter import ServiceRateLimiter
+from bmrs.services.service_bmrs_build_url import ServiceBmrsBuildUrl
 from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
 
 
 class TestServiceBmrsDataRetrieverTestCase(unittest.TestCase):
@@ -19,7 +24,12 @@ class TestServiceBmrsDataRetrieverTestCase(unittest.TestCase):
                     ServiceBmrsDataRetriever(timeout=10,
                                             max_tries=3,
                                             max_concurrent_tasks=5,
-                                            rate_limit_sleep_time=30
+                                            rate_limit_sleep_time=30,
+                                            url_builder=ServiceBmrsBuildUrl(settings=ObjectBmrsSettings(
+                                                host='https://api.bmreports.com/BMRS/',
+                                                version='V1',
+                                                url_end_str='SettlementDate={SettlementDate}&Period={Period}&ServiceType={ServiceType}',
+                                                api_scripting_key='2zsd43hl5hjii36'))
                                             )
 
 
@@ -104,4 +114,158 @@ class TestServiceBmrsDataRetrieverTestCase(unittest.TestCase):
 
         # Assertions to confirm the default range handling and data content
         self.assertEqual(len(data), 50, "Data length does not match expected number of entries for default range.")
-        self.assertTrue(all(d['data'] == 'mock_data' for d in data), "Not all entries match the expected 'mock_data'.")
\ No newline at end of file
+        self.assertTrue(all(d['data'] == 'mock_data' for d in data), "Not all entries match the expected 'mock_data'.")
+
+
+    def test_pooled_session_lifecycle(self):
+        """
+        Test that the retriever reuses one pooled session inside its async context manager and closes it on exit.
+        """
+        async def use_retriever():
+            async with self.bmrs_data_retriever as retriever:
+                first_session = await retriever.open()
+                second_session = await retriever.open()
+                self.assertIs(first_session, second_session, "A new session was opened inside the context manager.")
+                self.assertEqual(first_session.connector.limit_per_host, retriever.max_concurrent_tasks,
+                                 "Per-host limit does not follow max_concurrent_tasks.")
+            return first_session
+
+        session = asyncio.run(use_retriever())
+        self.assertTrue(session.closed, "Pooled session was not closed on exit.")
+
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        """
+        Test that concurrent identical requests share one in-flight fetch while different periods do not.
+        """
+        async def slow_fetch(**kwargs):
+            await asyncio.sleep(0.05)
+            return {'settlementPeriod': kwargs['period']}
+
+        async def retrieve_concurrently():
+            return await asyncio.gather(*[self.bmrs_data_retriever.retrieve_data(period, 'B1770', '2023-01-01')
+                                          for period in ['1', '1', '1', '2']])
+
+        with patch.object(ServiceBmrsDataRetriever, '_retrieve_data', side_effect=slow_fetch) as mock_fetch:
+            results = asyncio.run(retrieve_concurrently())
+
+        self.assertEqual(mock_fetch.call_count, 2, "Identical concurrent requests were not coalesced.")
+        self.assertIs(results[0], results[1], "Coalesced callers did not receive the same result.")
+        self.assertEqual(results[3], {'settlementPeriod': '2'})
+        self.assertEqual(self.bmrs_data_retriever.coalesced_count, 2)
+        self.assertEqual(self.bmrs_data_retriever._in_flight, {}, "Completed fetches were not removed.")
+
+
+    def test_bulk_day_request_with_gap_fallback(self):
+        """
+        Test that a whole day is fetched in one request and only the ended periods missing from it are requested per period.
+        """
+        requested_urls = []
+
+        async def fetch(url, report_name, file_format):
+            requested_urls.append(url)
+            if 'Period=*' in url:
+                # Period 3 is missing and the response stops after period 4; period 2 is restated.
+                return True, [{'settlementPeriod': '1', 'v': 1},
+                              {'settlementPeriod': '2', 'v': 2},
+                              {'settlementPeriod': '2', 'v': 22},
+                              {'settlementPeriod': '4', 'v': 4}]
+            period = url.split('Period=')[1].split('&')[0]
+            return True, [{'settlementPeriod': period, 'v': int(period)}]
+
+        # The items carry a field that is not registered, so they are returned as they are.
+        self.bmrs_data_retriever.compact_records = False
+        with patch.object(ServiceBmrsDataRetriever, '_fetch', side_effect=fetch):
+            data = asyncio.run(self.bmrs_data_retriever.retrieve_all_data(range_end=6,
+                                                                          range_start=1,
+                                                                          file_format='xml',
+                                                                          report_name='B1770',
+                                                                          settlement_date='2023-01-01'))
+
+        self.assertEqual(len(requested_urls), 4, "Expected one bulk request and one request per missing period.")
+        self.assertIn('Period=*', requested_urls[0])
+        self.assertEqual(sorted(url.split('Period=')[1].split('&')[0] for url in requested_urls[1:]), ['3', '5', '6'])
+        self.assertEqual([item['v'] for item in data], [1, 22, 3, 4, 5, 6])
+
+
+    def test_truncated_day_falls_back_to_periods(self):
+        """
+        Test that the ended periods missing from the end of a truncated whole-day response are requested individually.
+        """
+        with BenchmarkBmrsStandInServer(seed=1, truncate_day_after=40) as server:
+            retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                 max_tries=3,
+                                                 max_concurrent_tasks=5,
+                                                 rate_limit_sleep_time=30,
+                                                 url_builder=server,
+                                                 metrics=ServiceMetrics())
+            report_output = asyncio.run(retriever.retrieve_all_data(range_end=50,
+                                                                    range_start=1,
+                                                                    report_name='B1770',
+                                                                    settlement_date='2023-11-03'))
+
+            self.assertEqual(server.request_count, 9, "Expected one bulk request and one per truncated period.")
+        self.assertEqual(report_output.settlement_periods.tolist(), list(range(1, 49)))
+
+
+    def test_throttled_attempts_do_not_use_up_retries(self):
+        """
+        Test that a request rate limited more often than max_tries still succeeds once the server lets it through.
+        """
+        with BenchmarkBmrsStandInServer(seed=3, throttle_rate=0.6, retry_after=0) as server:
+            retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                 max_tries=1,
+                                                 max_concurrent_tasks=5,
+                                                 rate_limit_sleep_time=30,
+                                                 url_builder=server,
+                                                 bulk_reports=(),
+                                                 rate_limiter=ServiceRateLimiter(max_rate=1000, min_rate=100),
+                                                 metrics=ServiceMetrics())
+            report_output = asyncio.run(retriever.retrieve_all_data(range_end=10,
+                                                                    range_start=1,
+                                                                    report_name='B1770',
+                                                                    settlement_date='2023-11-03'))
+
+            self.assertGreater(server.throttled_count, 1)
+        self.assertEqual(len(report_output), 10, "Rate-limited attempts should not count against max_tries.")
+        self.assertIsNone(ServiceBmrsDataRetriever(timeout=10,
+                                                   max_tries=3,
+                                                   max_concurrent_tasks=5,
+                                                   rate_limit_sleep_time=30).rate_limiter.max_retry_after,
+                          "The server's Retry-After should not be capped.")
+
+
+    def test_stream_periods_ordered_within_window(self):
+        """
+        Test that streamed periods are reordered on request and never exceed the window in flight.
+        """
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def fetch(url, report_name, file_format):
+            nonlocal in_flight, peak_in_flight
+            period = int(url.split('Period=')[1].split('&')[0])
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            # Later periods complete first.
+            await asyncio.sleep((10 - period) * 0.002)
+            in_flight -= 1
+            return True, [{'settlementPeriod': str(period)}]
+
+        async def stream(ordered):
+            return [list(batch) async for batch in self.bmrs_data_retriever.stream_periods(periods=range(1, 11),
+                                                                                              ordered=ordered,
+                                                                                              window=4,
+                                                                                              file_format='xml',
+                                                                                              report_name='B1770',
+                                                                                              settlement_date='2023-01-01')]
+
+        self.bmrs_data_retriever.bulk_reports = frozenset()
+        with patch.object(ServiceBmrsDataRetriever, '_fetch', side_effect=fetch):
+            ordered_batches = asyncio.run(stream(ordered=True))
+            unordered_batches = asyncio.run(stream(ordered=False))
+
+        self.assertEqual([period for batch in ordered_batches for period in batch], list(range(1, 11)))
+        self.assertEqual(sorted(period for batch in unordered_batches for period in batch), list(range(1, 11)))
+        self.assertNotEqual(unordered_batches[0], [1], "Unordered batches should follow completion order.")
+        self.assertLessEqual(peak_in_flight, 4)
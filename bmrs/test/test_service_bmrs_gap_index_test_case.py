@@ -0,0 +1,111 @@
+import asyncio
+import tempfile
+import unittest
+
+from datetime import date, datetime, timezone
+
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_bmrs_gap_index import ServiceBmrsGapIndex
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class TestServiceBmrsGapIndexTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsGapIndex class to ensure only the missing periods of the calendar are refetched.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a stand-in BMRS server, a temporary store and a gap index before each test.
+        """
+        self.server = BenchmarkBmrsStandInServer(seed=1)
+        self.server.start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.parquet_store = ServiceBmrsParquetStore(root=self.directory.name)
+        self.data_retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                       max_tries=3,
+                                                       max_concurrent_tasks=5,
+                                                       rate_limit_sleep_time=30,
+                                                       url_builder=self.server,
+                                                       metrics=ServiceMetrics())
+        self.gap_index = ServiceBmrsGapIndex(data_retriever=self.data_retriever, parquet_store=self.parquet_store)
+
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+
+    def test_expected_periods(self):
+        """
+        Test that days have 48 periods, 46 and 50 on the clock-change days, and only ended periods are expected.
+        """
+        for settlement_date, period_count in (('2023-03-26', 46), ('2023-11-03', 48), (date(2023, 10, 29), 50)):
+            self.assertEqual(len(self.gap_index.get_expected_periods(report_name='B1770',
+                                                                     settlement_date=settlement_date)), period_count)
+        self.assertEqual(self.gap_index.get_expected_periods(report_name='B1770',
+                                                             settlement_date='2023-11-03',
+                                                             now=datetime(2023, 11, 3, 1, 45, tzinfo=timezone.utc)),
+                         [1, 2, 3])
+
+
+    def test_find_gaps(self):
+        """
+        Test that periods absent from retrieved items, or without a value, are reported as gaps.
+        """
+        items = [self.server.build_item(report_name='B1770', settlement_date=date(2023, 11, 3), period=period)
+                 for period in range(1, 49) if period not in (5, 48)]
+        items[10]['imbalancePriceAmountGBP'] = None
+
+        self.assertEqual(self.gap_index.find_gaps(report_name='B1770',
+                                                  report_output=items,
+                                                  settlement_date='2023-11-03'), [5, 12, 48])
+
+
+    def test_reconcile_refetches_only_the_gaps(self):
+        """
+        Test that reconciling a stored day with gaps fills them in a single request, leaving other days untouched.
+        """
+        async def retrieve_day():
+            return await self.data_retriever.retrieve_all_data(range_end=50,
+                                                               range_start=1,
+                                                               report_name='B1770',
+                                                               settlement_date='2023-11-03')
+
+        async def reconcile():
+            return [result async for result in self.gap_index.reconcile(reports=['B1770'],
+                                                                        start_date='2023-11-02',
+                                                                        end_date='2023-11-03')]
+
+        converter = ConverterDictToDataFrame()
+        for settlement_date in ('2023-11-02', '2023-11-03'):
+            report_dataframe = converter.convert(report_name='B1770',
+                                                 report_output=asyncio.run(self.data_retriever.retrieve_all_data(
+                                                                                range_end=50,
+                                                                                range_start=1,
+                                                                                report_name='B1770',
+                                                                                settlement_date=settlement_date)))
+            if settlement_date == '2023-11-03':
+                report_dataframe = report_dataframe.drop(report_dataframe.index[[4, 19]])
+            self.parquet_store.write(report_name='B1770', report_ts_dataframe=report_dataframe)
+
+        self.assertEqual(self.gap_index.find_stored_gaps(reports=['B1770'], start_date='2023-11-02', end_date='2023-11-03'),
+                         {('B1770', '2023-11-03'): [5, 20]})
+
+        request_count = self.server.request_count
+        results = asyncio.run(reconcile())
+        for report_name, _, report_output in results:
+            self.parquet_store.write(report_name=report_name,
+                                     report_ts_dataframe=converter.convert(report_name=report_name,
+                                                                           report_output=report_output))
+
+        self.assertEqual(self.server.request_count - request_count, 1, "Only the gapped day should be requested.")
+        self.assertEqual(results[0][2].settlement_periods.tolist(), [5, 20])
+        self.assertEqual(self.gap_index.find_stored_gaps(reports=['B1770'], start_date='2023-11-02', end_date='2023-11-03'), {})
+        self.assertTrue(self.parquet_store.read(report_name='B1770', start='2023-11-03', end='2023-11-03 23:30')
+                                          .equals(converter.convert(report_name='B1770',
+                                                                    report_output=asyncio.run(retrieve_day()))))
@@ -0,0 +1,108 @@
+import unittest
+import pandas as pd
+
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar
+from bmrs.services.service_bmrs_dataframe_analyser import ServiceBmrsDataframeAnalyser
+from bmrs.services.service_bmrs_incremental_analyser import ServiceBmrsIncrementalAnalyser
+
+
+class TestServiceBmrsIncrementalAnalyserTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsIncrementalAnalyser class to ensure incremental summaries match a full recomputation.
+    """
+
+
+    def setUp(self):
+        """
+        Set up the analyser and a day of B1780 imbalance volumes before each test.
+        """
+        self.incremental_analyser = ServiceBmrsIncrementalAnalyser()
+        self.column = self.incremental_analyser.get_column(report_name='B1780')
+
+        index = pd.date_range('2023-11-03', periods=48, freq='30min', name='datetime')
+        volumes = [float(period) if period != 20 else -500.0 for period in range(48)]
+        self.report_dataframe = pd.DataFrame({self.column: volumes}, index=index)
+
+
+    def test_incremental_updates_match_full_recomputation(self):
+        """
+        Test that folding the periods in chunks gives the same metrics as computing them over the whole day.
+        """
+        for start in range(0, 48, 7):
+            summaries = self.incremental_analyser.update(report_name='B1780',
+                                                         report_ts_dataframe=self.report_dataframe.iloc[start:start + 7])
+
+        summary = summaries[-1]
+        hourly_absolute = self.report_dataframe[self.column].abs().resample('H').sum()
+
+        self.assertEqual(summary.period_count, 48)
+        self.assertAlmostEqual(summary.aggregates['mean_unit_rate'], self.report_dataframe[self.column].mean())
+        self.assertEqual(summary.aggregates['peak_hour'], hourly_absolute.idxmax())
+        self.assertAlmostEqual(summary.aggregates['peak_hour_absolute_imbalance'], hourly_absolute.max())
+
+
+    def test_restated_period_replaces_previous_value(self):
+        """
+        Test that a restated period replaces its previous contribution and can move the peak hour.
+        """
+        self.incremental_analyser.update(report_name='B1780', report_ts_dataframe=self.report_dataframe)
+
+        restated_dataframe = self.report_dataframe.iloc[[20]] * 0
+        summary = self.incremental_analyser.update(report_name='B1780', report_ts_dataframe=restated_dataframe)[0]
+
+        self.assertEqual(summary.period_count, 48, "Restated period was counted twice.")
+        self.assertAlmostEqual(summary.aggregates['mean_unit_rate'], (sum(range(48)) - 20) / 48)
+        self.assertEqual(summary.aggregates['peak_hour'], pd.Timestamp('2023-11-03 23:00'))
+
+
+    def test_dates_past_retention_window_are_evicted(self):
+        """
+        Test that only the dates within the retention window of the latest date are held.
+        """
+        incremental_analyser = ServiceBmrsIncrementalAnalyser(retention_days=2)
+        for day in range(10):
+            day_dataframe = self.report_dataframe.set_axis(self.report_dataframe.index + pd.Timedelta(days=day))
+            incremental_analyser.update(report_name='B1780', report_ts_dataframe=day_dataframe)
+
+        self.assertEqual(sorted(incremental_analyser._period_values['B1780']),
+                         list(pd.date_range('2023-11-10', '2023-11-12')), "Dates past the window were kept.")
+        self.assertIsNone(incremental_analyser.get_summary(report_name='B1780', settlement_date='2023-11-09'))
+
+        late_summaries = incremental_analyser.update(report_name='B1780', report_ts_dataframe=self.report_dataframe)
+        self.assertEqual(late_summaries, [], "Periods of an evicted date were folded again.")
+        self.assertEqual(incremental_analyser.get_summary(report_name='B1780', settlement_date='2023-11-12').period_count, 48)
+
+
+    def test_dataframe_analyser_returns_summaries(self):
+        """
+        Test that ServiceBmrsDataframeAnalyser returns a structured summary for B1770 as well as B1780.
+        """
+        b1770_column = self.incremental_analyser.get_column(report_name='B1770')
+        report_dataframe = self.report_dataframe.rename(columns={self.column: b1770_column})
+
+        summaries = ServiceBmrsDataframeAnalyser().calculate_imbalances(report_name='B1770',
+                                                                       report_ts_dataframe=report_dataframe)
+
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0].report_name, 'B1770')
+        self.assertAlmostEqual(summaries[0].aggregates['total'], report_dataframe[b1770_column].sum())
+
+
+    def test_autumn_clock_change_day(self):
+        """
+        Test that the 50 periods of 2023-10-29 are summarised under one date, keeping the repeated 01:00 hour apart.
+        """
+        calendar = ServiceSettlementCalendar(start_date='2023-10-01', end_date='2023-10-31')
+        index = calendar.to_timestamps(settlement_dates=['2023-10-29'] * 50, settlement_periods=range(1, 51))
+        volumes = [100.0 if period in (5, 6) else 1.0 for period in range(1, 51)]
+        report_dataframe = pd.DataFrame({self.column: volumes}, index=index)
+
+        summaries = ServiceBmrsDataframeAnalyser().calculate_imbalances(report_name='B1780',
+                                                                       report_ts_dataframe=report_dataframe)
+
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0].period_count, 50)
+        self.assertAlmostEqual(summaries[0].aggregates['mean_unit_rate'], 248.0 / 50)
+        self.assertEqual(summaries[0].aggregates['peak_hour'],
+                         pd.Timestamp('2023-10-29 01:00', tz='UTC').tz_convert('Europe/London'))
+        self.assertAlmostEqual(summaries[0].aggregates['peak_hour_absolute_imbalance'], 200.0)
@@ -0,0 +1,140 @@
+import asyncio
+import unittest
+
+from datetime import datetime, timedelta, timezone
+
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_bmrs_live_poller import ServiceBmrsLivePoller
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class TestServiceBmrsLivePollerTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsLivePoller class to ensure only the next expected periods are requested and pushed.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a stand-in BMRS server publishing up to 01:30 on 2023-11-03, and a poller of B1770 before each test.
+        """
+        self.server = BenchmarkBmrsStandInServer(seed=1, published_until=datetime(2023, 11, 3, 1, 30, tzinfo=timezone.utc))
+        self.server.start()
+        self.data_retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                       max_tries=3,
+                                                       max_concurrent_tasks=5,
+                                                       rate_limit_sleep_time=30,
+                                                       url_builder=self.server,
+                                                       conditional_requests=True,
+                                                       metrics=ServiceMetrics())
+        self.poller = ServiceBmrsLivePoller(data_retriever=self.data_retriever, reports=['B1770'])
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def test_expected_periods(self):
+        """
+        Test that the ended periods after the latest published one are expected, across midnight.
+        """
+        self.assertEqual(self.poller.get_expected_periods(report_name='B1770',
+                                                          now=datetime(2023, 11, 3, 2, 10, tzinfo=timezone.utc)),
+                         [('2023-11-03', [1, 2, 3, 4])])
+
+        self.poller.latest_periods['B1770'] = ('2023-11-03', 47)
+        self.assertEqual(self.poller.get_expected_periods(report_name='B1770',
+                                                          now=datetime(2023, 11, 4, 0, 40, tzinfo=timezone.utc)),
+                         [('2023-11-03', [48]), ('2023-11-04', [1])])
+
+        # A poller restarting after an outage finishes every day it missed.
+        self.poller.latest_periods['B1770'] = ('2023-11-01', 46)
+        expected = self.poller.get_expected_periods(report_name='B1770',
+                                                    now=datetime(2023, 11, 4, 0, 40, tzinfo=timezone.utc))
+        self.assertEqual([(settlement_date, periods[0], periods[-1]) for settlement_date, periods in expected],
+                         [('2023-11-01', 47, 48), ('2023-11-02', 1, 48), ('2023-11-03', 1, 48), ('2023-11-04', 1, 1)])
+
+        self.poller.latest_periods['B1770'] = ('2023-11-04', 1)
+        now = datetime(2023, 11, 4, 0, 40, tzinfo=timezone.utc)
+        self.assertEqual(self.poller.get_expected_periods(report_name='B1770', now=now), [])
+        self.assertEqual(self.poller.get_next_poll_time(now=now), datetime(2023, 11, 4, 1, 1, tzinfo=timezone.utc))
+
+
+    def test_poll_pushes_only_new_periods(self):
+        """
+        Test that polls request only the unpublished periods, revalidate unchanged ones with a 304,
+        and push each newly published period once to plain and async subscribers.
+        """
+        received, received_async = [], []
+
+        async def on_update(update):
+            received_async.append(update)
+
+        self.poller.subscribe(received.append)
+        unsubscribe = self.poller.subscribe(on_update)
+
+        now = datetime(2023, 11, 3, 2, 10, tzinfo=timezone.utc)
+        updates = asyncio.run(self.poller.poll(now=now))
+
+        self.assertEqual(self.server.request_count, 2, "Expected one bulk request and one for the ended period 4.")
+        self.assertEqual([update.periods for update in updates], [(1, 2, 3)])
+        self.assertEqual(updates[0].report_output.settlement_periods.tolist(), [1, 2, 3])
+        self.assertEqual(updates[0].lag_seconds, 40 * 60)
+        self.assertEqual(self.poller.latest_periods['B1770'], ('2023-11-03', 3))
+        self.assertEqual(self.poller.get_next_poll_time(now=now), now + timedelta(seconds=15))
+
+        # Period 4 has ended but is not published, so only it is requested, and revalidated as unchanged.
+        for _ in range(2):
+            self.assertEqual(asyncio.run(self.poller.poll(now=now)), [])
+        self.assertEqual(self.server.request_count, 4)
+        self.assertEqual(self.server.not_modified_count, 2)
+        self.assertEqual(self.data_retriever.not_modified_count, 2)
+
+        self.server.published_until = datetime(2023, 11, 3, 2, 30, tzinfo=timezone.utc)
+        unsubscribe()
+        now = datetime(2023, 11, 3, 2, 35, tzinfo=timezone.utc)
+        updates = asyncio.run(self.poller.poll(now=now))
+
+        self.assertEqual([update.periods for update in updates], [(4, 5)])
+        self.assertEqual([update.periods for update in received], [(1, 2, 3), (4, 5)])
+        self.assertEqual([update.periods for update in received_async], [(1, 2, 3)])
+        self.assertEqual(self.poller.get_next_poll_time(now=now), datetime(2023, 11, 3, 3, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.data_retriever.metrics.get_summary('live_lag_seconds', report='B1770')['count'], 2)
+
+
+    def test_late_period_is_polled_again(self):
+        """
+        Test that a late period holds back the periods published after it until it is published itself.
+        """
+        self.server.withheld_periods = {2}
+        now = datetime(2023, 11, 3, 1, 40, tzinfo=timezone.utc)
+
+        updates = asyncio.run(self.poller.poll(now=now))
+        self.assertEqual([update.periods for update in updates], [(1,)])
+        self.assertEqual(self.poller.latest_periods['B1770'], ('2023-11-03', 1))
+
+        self.server.withheld_periods = set()
+        updates = asyncio.run(self.poller.poll(now=now))
+        self.assertEqual([update.periods for update in updates], [(2, 3)])
+        self.assertEqual(self.poller.latest_periods['B1770'], ('2023-11-03', 3))
+
+
+    def test_run_until_stopped(self):
+        """
+        Test that run keeps polling until the stop event is set, then returns without waiting for the next poll.
+        """
+        self.server.published_until = None
+
+        async def run():
+            stop_event = asyncio.Event()
+            task = asyncio.ensure_future(self.poller.run(stop_event=stop_event))
+            while self.poller.poll_count == 0:
+                await asyncio.sleep(0.01)
+            stop_event.set()
+            await asyncio.wait_for(task, timeout=30)
+
+        asyncio.run(run())
+
+        self.assertEqual(self.poller.poll_count, 1)
+        self.assertIsNone(self.data_retriever._session, "The pooled session should be closed once stopped.")
@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+import pandas as pd
+
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+
+
+class TestServiceBmrsParquetStoreTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsParquetStore class to ensure time series are partitioned, upserted and read by range.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a ServiceBmrsParquetStore in a temporary directory with two months of half-hourly data.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.parquet_store = ServiceBmrsParquetStore(root=self.temp_dir.name)
+
+        index = pd.date_range('2023-10-31', '2023-11-01 23:30', freq='30min', name='datetime', tz='Europe/London')
+        self.report_dataframe = pd.DataFrame({'imbalancePriceAmountGBP': range(len(index))}, index=index, dtype=float)
+
+
+    def tearDown(self):
+        """
+        Remove the temporary store.
+        """
+        self.temp_dir.cleanup()
+
+
+    def test_write_partitions_by_report_year_month(self):
+        """
+        Test that a write produces one Parquet file per month and reads back unchanged.
+        """
+        self.parquet_store.write(report_name='B1770', report_ts_dataframe=self.report_dataframe)
+
+        partitions = sorted(path.parent.name for path in self.parquet_store.root.rglob('data.parquet'))
+        self.assertListEqual(partitions, ['month=10', 'month=11'], "Data was not partitioned by month.")
+
+        stored_dataframe = self.parquet_store.read(report_name='B1770')
+        pd.testing.assert_frame_equal(stored_dataframe, self.report_dataframe, check_freq=False)
+        self.assertEqual(self.parquet_store.write(report_name='B1770',
+                                                  report_ts_dataframe=self.report_dataframe.tz_localize(None)), 0,
+                         "A series without a timezone should not be stored.")
+
+
+    def test_upsert_replaces_restated_periods(self):
+        """
+        Test that writing restated periods replaces the stored values instead of duplicating rows.
+        """
+        self.parquet_store.write(report_name='B1770', report_ts_dataframe=self.report_dataframe)
+
+        restated_dataframe = self.report_dataframe.iloc[:2] * -1
+        self.parquet_store.write(report_name='B1770', report_ts_dataframe=restated_dataframe)
+
+        stored_dataframe = self.parquet_store.read(report_name='B1770')
+        self.assertEqual(len(stored_dataframe), len(self.report_dataframe), "Upsert duplicated restated rows.")
+        self.assertEqual(stored_dataframe['imbalancePriceAmountGBP'].iloc[1], -1.0, "Restated value was not stored.")
+
+
+    def test_read_date_range(self):
+        """
+        Test that a ranged read only returns rows inside the range.
+        """
+        self.parquet_store.write(report_name='B1770', report_ts_dataframe=self.report_dataframe)
+
+        stored_dataframe = self.parquet_store.read(report_name='B1770',
+                                                   start='2023-11-01 00:00',
+                                                   end='2023-11-01 01:00',
+                                                   columns=['imbalancePriceAmountGBP'])
+
+        self.assertEqual(len(stored_dataframe), 3, "Ranged read returned rows outside the range.")
+        self.assertEqual(stored_dataframe.index.min(), pd.Timestamp('2023-11-01 00:00', tz='Europe/London'))
@@ -0,0 +1,192 @@
+import os
+import asyncio
+import tempfile
+import unittest
+import pandas as pd
+
+from datetime import date, timedelta
+from unittest.mock import patch, MagicMock
+from bmrs.services.service_bmrs_response_cache import ServiceBmrsResponseCache
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.registries.registry_reports import get_default_registry
+
+
+class TestServiceBmrsResponseCacheTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceBmrsResponseCache class to ensure items are stored, expired and evicted.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a ServiceBmrsResponseCache backed by a temporary SQLite file before each test.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+        self.response_cache = ServiceBmrsResponseCache(path=self.cache_path, recent_ttl=300)
+        self.item = {'settlementDate': '2023-11-03', 'settlementPeriod': '1', 'imbalancePriceAmountGBP': '-25.85'}
+
+
+    def tearDown(self):
+        """
+        Close the cache and remove the temporary directory.
+        """
+        self.response_cache.close()
+        self.temp_dir.cleanup()
+
+
+    def test_put_and_get_round_trip(self):
+        """
+        Test that stored items and known empty periods are served from the cache, and unknown keys miss.
+        """
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=self.item)
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='50', item=None)
+
+        self.assertEqual(self.response_cache.get('B1770', '2023-11-03', '1'), (True, self.item), "Cached item not returned.")
+        self.assertEqual(self.response_cache.get('B1770', '2023-11-03', '50'), (True, None), "Empty period not cached.")
+        self.assertEqual(self.response_cache.get('B1780', '2023-11-03', '1'), (False, None), "Unknown key should miss.")
+
+
+    def test_database_opened_on_first_use(self):
+        """
+        Test that constructing the cache creates no file until it is first used.
+        """
+        lazy_path = os.path.join(self.temp_dir.name, 'lazy.sqlite3')
+        lazy_cache = ServiceBmrsResponseCache(path=lazy_path)
+        lazy_cache.close()
+        self.assertFalse(os.path.exists(lazy_path), "Constructing the cache created its database.")
+
+        lazy_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=self.item)
+        self.assertTrue(os.path.exists(lazy_path), "The database was not created on first use.")
+        lazy_cache.close()
+
+
+    def test_fields_are_part_of_the_key(self):
+        """
+        Test that items reduced to other value columns are not served.
+        """
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=self.item,
+                                fields={'imbalancePriceAmountGBP'})
+
+        self.assertEqual(self.response_cache.get('B1770', '2023-11-03', '1', fields=['imbalancePriceAmountGBP']),
+                         (True, self.item), "Item not served for the same fields.")
+        self.assertEqual(self.response_cache.get('B1770', '2023-11-03', '1', fields={'imbalancePriceAmount'}),
+                         (False, None), "Item reduced to other fields was served.")
+
+
+    def test_day_written_in_one_transaction(self):
+        """
+        Test that a whole day is stored with one commit and served again in full.
+        """
+        items = {period: dict(self.item, settlementPeriod=str(period)) for period in range(1, 49)}
+        changes = self.response_cache._connection.total_changes
+
+        self.response_cache.put_day(report_name='B1770', settlement_date='2023-11-03', items=items, period_count=48)
+
+        self.assertEqual(self.response_cache._connection.total_changes, changes + 49, "Day was not stored in full.")
+        self.assertEqual(self.response_cache.get_day('B1770', '2023-11-03'), items, "Day not served from the cache.")
+
+
+    def test_truncated_day_not_served_as_a_whole(self):
+        """
+        Test that a day response missing some of the calendar's periods is not served as the whole day.
+        """
+        items = {period: dict(self.item, settlementPeriod=str(period)) for period in range(1, 31)}
+
+        self.response_cache.put_day(report_name='B1770', settlement_date='2023-11-03', items=items, period_count=48)
+
+        self.assertIsNone(self.response_cache.get_day('B1770', '2023-11-03'), "Truncated day was served.")
+        self.assertEqual(self.response_cache.get('B1770', '2023-11-03', '30'), (True, items[30]),
+                         "Periods of a truncated day were not cached.")
+
+
+    def test_ttl_rules(self):
+        """
+        Test that past settlement dates never expire while recent dates expire after the recent TTL.
+        """
+        today = date.today().strftime('%Y-%m-%d')
+        past_day = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
+
+        self.assertIsNone(self.response_cache.get_expiry(settlement_date=past_day), "Past dates should be cached forever.")
+        self.assertEqual(self.response_cache.get_expiry(settlement_date=today, now=1000.0), 1300.0,
+                         "Recent dates should expire after the recent TTL.")
+
+
+    def test_empty_periods_expire(self):
+        """
+        Test that a period without data expires after the recent TTL even for a date cached forever.
+        """
+        past_day = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
+        self.response_cache.put(report_name='B1770', settlement_date=past_day, period='1', item=None)
+
+        expires_at = self.response_cache._connection.execute("SELECT expires_at FROM response_cache").fetchone()[0]
+        self.assertIsNotNone(expires_at, "A period without data should not be cached forever.")
+
+        with patch('bmrs.services.service_bmrs_response_cache.time.time', return_value=expires_at + 1):
+            self.assertEqual(self.response_cache.get('B1770', past_day, '1'), (False, None), "Empty period did not expire.")
+
+
+    def test_hits_batch_access_times(self):
+        """
+        Test that hits do not write to the database until their access times are flushed.
+        """
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=self.item)
+        changes = self.response_cache._connection.total_changes
+
+        for _ in range(10):
+            self.response_cache.get('B1770', '2023-11-03', '1')
+        self.assertEqual(self.response_cache._connection.total_changes, changes, "Hits should not write.")
+
+        self.response_cache.flush()
+        self.assertEqual(self.response_cache._connection.total_changes, changes + 1, "Access time was not flushed once.")
+
+
+    def test_size_based_eviction(self):
+        """
+        Test that the least recently used entries are evicted once the size limit is exceeded.
+        """
+        small_cache = ServiceBmrsResponseCache(path=os.path.join(self.temp_dir.name, 'small.sqlite3'),
+                                               max_size_bytes=len(str(self.item)) * 3)
+        for period in range(1, 11):
+            small_cache.put(report_name='B1770', settlement_date='2023-11-03', period=str(period), item=self.item)
+
+        self.assertLessEqual(small_cache.snapshot()['size_bytes'], small_cache.max_size_bytes, "Cache exceeded its size limit.")
+        self.assertFalse(small_cache.get('B1770', '2023-11-03', '1')[0], "Least recently used entry was not evicted.")
+        self.assertTrue(small_cache.get('B1770', '2023-11-03', '10')[0], "Most recent entry was evicted.")
+        small_cache.close()
+
+
+    def test_retriever_serves_cached_items_without_network(self):
+        """
+        Test that the retriever returns cached items without opening a session.
+        """
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=self.item,
+                                fields=get_default_registry().get_fields(report_name='B1770'))
+        retriever = ServiceBmrsDataRetriever(timeout=10,
+                                             max_tries=3,
+                                             max_concurrent_tasks=5,
+                                             rate_limit_sleep_time=30,
+                                             url_builder=MagicMock(build_url=MagicMock(return_value='http://localhost/')),
+                                             response_cache=self.response_cache)
+
+        with patch.object(ServiceBmrsDataRetriever, 'open') as mock_open:
+            item = asyncio.run(retriever.retrieve_data(period='1', report_name='B1770', settlement_date='2023-11-03'))
+
+        mock_open.assert_not_called()
+        self.assertEqual(item, self.item, "Retriever did not serve the cached item.")
+
+
+    def test_dataframe_round_trip(self):
+        """
+        Test that typed DataFrames from CSV responses are restored with their dtypes.
+        """
+        frame = pd.DataFrame({'settlementDate': pd.to_datetime(['2023-11-03', '2023-11-03']),
+                              'settlementPeriod': [1, 2],
+                              'imbalancePriceAmountGBP': [-25.85, -0.1101]})
+        self.response_cache.put(report_name='B1770', settlement_date='2023-11-03', period='1', item=frame, service_type='csv')
+
+        found, cached_frame = self.response_cache.get('B1770', '2023-11-03', '1', service_type='csv')
+
+        self.assertTrue(found, "Cached DataFrame not found.")
+        pd.testing.assert_frame_equal(cached_frame, frame, check_dtype=False)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(cached_frame['settlementDate']), "Dates were not restored.")
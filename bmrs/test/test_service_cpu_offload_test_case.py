@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+import numpy as np
+
+from datetime import date
+
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_cpu_offload import ServiceCpuOffload
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.converters.converter_xml_stream_to_dict import ConverterXmlStreamToDict
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+def _square(value):
+    return value * value
+
+
+class TestServiceCpuOffloadTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceCpuOffload class to ensure parsing and conversion run in bounded worker processes.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a stand-in BMRS server and a two process pool before each test.
+        """
+        self.server = BenchmarkBmrsStandInServer(seed=1)
+        self.server.start()
+        self.cpu_offload = ServiceCpuOffload(max_workers=2, max_pending=2, metrics=ServiceMetrics())
+
+
+    def tearDown(self):
+        self.cpu_offload.close()
+        self.server.stop()
+
+
+    def build_retriever(self, cpu_offload=None) -> ServiceBmrsDataRetriever:
+        return ServiceBmrsDataRetriever(timeout=10,
+                                        max_tries=3,
+                                        max_concurrent_tasks=5,
+                                        rate_limit_sleep_time=30,
+                                        url_builder=self.server,
+                                        cpu_offload=cpu_offload,
+                                        metrics=ServiceMetrics())
+
+
+    def test_xml_columns_are_typed(self):
+        """
+        Test that XML bodies are parsed into the same typed columns as CSV bodies.
+        """
+        content = self.server.render_xml(report_name='B1780',
+                                         items=[self.server.build_item(report_name='B1780',
+                                                                       settlement_date=date(2023, 11, 3),
+                                                                       period=period)
+                                                for period in (1, 2)])
+
+        columns = ConverterXmlStreamToDict().convert_columns(report_name='B1780', content=content)
+
+        self.assertEqual(list(columns), ['settlementDate', 'settlementPeriod', 'imbalanceQuantityMAW'])
+        self.assertEqual(columns['settlementDate'].dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(columns['settlementPeriod'].tolist(), [1, 2])
+        self.assertEqual(columns['imbalanceQuantityMAW'].dtype, np.float64)
+
+
+    def test_pending_jobs_are_bounded(self):
+        """
+        Test that no more than max_pending jobs are queued or running at once and worker errors reach the caller.
+        """
+        async def run_jobs():
+            jobs = asyncio.gather(*[self.cpu_offload.run(_square, value=value) for value in range(8)])
+            peak = 0
+            while not jobs.done():
+                peak = max(peak, self.cpu_offload.snapshot()['pending_count'])
+                await asyncio.sleep(0.001)
+            return await jobs, peak
+
+        results, peak = asyncio.run(run_jobs())
+
+        self.assertEqual(results, [value * value for value in range(8)])
+        self.assertLessEqual(peak, 2)
+        with self.assertRaises(TypeError):
+            asyncio.run(self.cpu_offload.run(_square, value=None))
+        self.assertEqual(self.cpu_offload.snapshot(), {'submitted_count': 9,
+                                                       'completed_count': 8,
+                                                       'failed_count': 1,
+                                                       'pending_count': 0})
+
+
+    def test_retriever_offloads_parsing(self):
+        """
+        Test that offloaded XML days are returned as typed DataFrames converting to the same time series.
+        """
+        async def retrieve(retriever):
+            return await retriever.retrieve_all_data(range_end=50,
+                                                     range_start=1,
+                                                     report_name='B1770',
+                                                     settlement_date='2023-03-26')
+
+        offloaded = asyncio.run(retrieve(self.build_retriever(cpu_offload=self.cpu_offload)))
+        inline = asyncio.run(retrieve(self.build_retriever()))
+
+        self.assertEqual(len(offloaded), 46, "Every period of the spring clock change should be returned.")
+        self.assertEqual(offloaded.settlement_periods.tolist(), list(range(1, 47)))
+        self.assertGreater(self.cpu_offload.snapshot()['completed_count'], 0)
+
+        converter = ConverterDictToDataFrame()
+        self.assertTrue(converter.convert(report_name='B1770', report_output=offloaded)
+                                 .equals(converter.convert(report_name='B1770', report_output=inline)))
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from bmrs.services.service_metrics import ServiceMetrics
+
+
+class TestServiceMetricsTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceMetrics class to ensure metrics are aggregated and exported.
+    """
+
+
+    def setUp(self):
+        """
+        Set up an empty ServiceMetrics registry before each test.
+        """
+        self.metrics = ServiceMetrics()
+
+
+    def test_summary_quantiles_and_counters(self):
+        """
+        Test that summaries report their count, sum and quantiles and counters accumulate per label set.
+        """
+        for value in range(1, 101):
+            self.metrics.observe('request_seconds', value / 100, report='B1770')
+        self.metrics.increment('response_bytes_total', 1024, report='B1770')
+        self.metrics.increment('response_bytes_total', 1024, report='B1770')
+        self.metrics.increment('response_bytes_total', 10, report='B1780')
+
+        summary = self.metrics.get_summary('request_seconds', report='B1770')
+
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['sum'], 50.5)
+        self.assertEqual((summary['p50'], summary['p95'], summary['p99']), (0.5, 0.95, 0.99))
+        self.assertEqual(self.metrics.get_counter('response_bytes_total', report='B1770'), 2048)
+        self.assertIsNone(self.metrics.get_summary('request_seconds', report='B1780'))
+
+
+    def test_exports(self):
+        """
+        Test that metrics are exported in the Prometheus text format and as a JSON snapshot.
+        """
+        self.metrics.increment('throttled_total', report='B1770')
+        with self.metrics.timer('stage_seconds', stage='convert'):
+            pass
+
+        prometheus = self.metrics.to_prometheus()
+        snapshot = json.loads(self.metrics.to_json())
+
+        self.assertIn('# TYPE bmrs_throttled_total counter\nbmrs_throttled_total{report="B1770"} 1\n', prometheus)
+        self.assertIn('# TYPE bmrs_stage_seconds summary', prometheus)
+        self.assertIn('bmrs_stage_seconds{stage="convert",quantile="0.99"}', prometheus)
+        self.assertIn('bmrs_stage_seconds_count{stage="convert"} 1', prometheus)
+        self.assertEqual(snapshot['summaries'][0]['labels'], {'stage': 'convert'})
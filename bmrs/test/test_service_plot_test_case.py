@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+import pandas as pd
+
+from bmrs.services.service_plot import ServicePlot
+from bmrs.objects.object_report_definition import ObjectReportDefinition
+from bmrs.registries.registry_reports import build_default_registry
+
+
+class TestServicePlotTestCase(unittest.TestCase):
+    """
+    Test cases for the ServicePlot class to ensure headless plots are rendered to files.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a headless ServicePlot writing to a temporary directory and two days of data.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.service_plot = ServicePlot(headless=True, output_dir=self.temp_dir.name, max_points=20)
+
+        index = pd.date_range('2023-11-01', periods=96, freq='30min', name='datetime')
+        self.plot_dataframe = pd.DataFrame({'imbalancePriceAmountGBP': range(96)}, index=index, dtype=float)
+
+
+    def tearDown(self):
+        """
+        Remove the rendered files.
+        """
+        self.temp_dir.cleanup()
+
+
+    def test_headless_plot_renders_file(self):
+        """
+        Test that a headless plot is written to the output directory instead of being shown.
+        """
+        output_path = self.service_plot.plot(report_name='B1770', plot_dataframe=self.plot_dataframe)
+
+        self.assertTrue(output_path.endswith('bmrs_data_b1770_20231101_plot.png'))
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n', "Rendered file is not a PNG.")
+
+
+    def test_render_daily_in_process_pool(self):
+        """
+        Test that a multi-day series is rendered as one SVG per day by the process pool.
+        """
+        output_paths = self.service_plot.render_daily(report_name='B1780',
+                                                      plot_dataframe=self.plot_dataframe,
+                                                      file_format='svg',
+                                                      max_workers=2)
+
+        self.assertEqual([path.rsplit('/', 1)[-1] for path in output_paths],
+                         ['bmrs_data_b1780_20231101_plot.svg', 'bmrs_data_b1780_20231102_plot.svg'])
+
+
+    def test_render_batch_keeps_configuration(self):
+        """
+        Test that the worker processes render with the caller's registry and output directory.
+        """
+        registry = build_default_registry()
+        registry.register(ObjectReportDefinition(report_name='B0000',
+                                                 value_columns=('quantity',),
+                                                 plot_title='Quantity'))
+        service_plot = ServicePlot(headless=True, output_dir=self.temp_dir.name, registry=registry)
+
+        output_paths = service_plot.render_daily(report_name='B0000',
+                                                 plot_dataframe=self.plot_dataframe,
+                                                 max_workers=2)
+
+        self.assertEqual(output_paths,
+                         [f"{self.temp_dir.name}/bmrs_data_b0000_20231101_plot.png",
+                          f"{self.temp_dir.name}/bmrs_data_b0000_20231102_plot.png"],
+                         "The workers did not render the report registered by the caller.")
+
+
+    def test_downsample(self):
+        """
+        Test that long series are averaged down to at most max_points points.
+        """
+        downsampled = self.service_plot.downsample(series=self.plot_dataframe['imbalancePriceAmountGBP'])
+
+        self.assertLessEqual(len(downsampled), 20)
+        self.assertEqual(downsampled.iloc[0], 2.0)
+        self.assertEqual(downsampled.index[1], self.plot_dataframe.index[5])
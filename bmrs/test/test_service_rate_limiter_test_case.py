@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_rate_limiter import ServiceRateLimiter
+
+
+class TestServiceRateLimiterTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceRateLimiter class to ensure the request rate adapts to rate limiting.
+    """
+
+
+    def setUp(self):
+        """
+        Set up the ServiceRateLimiter instance with a known configuration before each test.
+        """
+        self.rate_limiter = ServiceRateLimiter(max_rate=10.0,
+                                               min_rate=1.0,
+                                               increase_step=1.0,
+                                               decrease_factor=0.5,
+                                               max_retry_after=30)
+
+
+    def test_throttle_decreases_and_success_increases_rate(self):
+        """
+        Test that a rate-limited response halves the rate and successes ramp it back up to the maximum.
+        """
+        self.rate_limiter.on_throttled()
+        self.assertEqual(self.rate_limiter.current_rate, 5.0, "Rate was not halved after a 429.")
+
+        self.rate_limiter.on_success()
+        self.assertEqual(self.rate_limiter.current_rate, 6.0, "Rate was not increased after a success.")
+
+        for _ in range(10):
+            self.rate_limiter.on_success()
+        self.assertEqual(self.rate_limiter.current_rate, 10.0, "Rate exceeded the configured maximum.")
+        self.assertEqual(self.rate_limiter.snapshot()['throttled_count'], 1, "Throttle count was not recorded.")
+
+
+    def test_retry_after_pauses_all_callers(self):
+        """
+        Test that a Retry-After header pauses the bucket, capped by max_retry_after.
+        """
+        pause = self.rate_limiter.on_throttled(retry_after='120')
+
+        self.assertEqual(pause, 30, "Retry-After pause was not capped by max_retry_after.")
+        self.assertGreater(self.rate_limiter.snapshot()['paused_for'], 29, "Bucket was not paused for the Retry-After duration.")
+        self.assertEqual(self.rate_limiter.parse_retry_after('not-a-date'), 0.0, "Invalid Retry-After should not pause.")
+
+
+    def test_missing_retry_after_pauses_for_default(self):
+        """
+        Test that a rate-limited response without a Retry-After pauses the bucket for default_retry_after.
+        """
+        rate_limiter = ServiceRateLimiter(max_retry_after=30, default_retry_after=30)
+
+        self.assertEqual(rate_limiter.on_throttled(), 30, "A 429 without Retry-After should pause for the default.")
+        self.assertGreater(rate_limiter.snapshot()['paused_for'], 29, "Bucket was not paused for the default duration.")
+        self.assertEqual(rate_limiter.on_throttled(retry_after='2'), 2, "An advertised Retry-After should take precedence.")
+
+
+    def test_acquire_within_burst_does_not_wait(self):
+        """
+        Test that requests within the burst size are released without waiting.
+        """
+        async def acquire_burst():
+            await asyncio.wait_for(asyncio.gather(*[self.rate_limiter.acquire() for _ in range(10)]), timeout=1)
+
+        asyncio.run(acquire_burst())
+        self.assertEqual(self.rate_limiter.snapshot()['acquired_count'], 10, "Not every acquire was recorded.")
+
+
+    def test_rate_is_recorded_as_gauge(self):
+        """
+        Test that the current rate is exported as the rate_limiter_rate gauge as it changes.
+        """
+        metrics = ServiceMetrics()
+        rate_limiter = ServiceRateLimiter(max_rate=10.0, min_rate=1.0, metrics=metrics)
+        self.assertEqual(metrics.get_gauge('rate_limiter_rate'), 10.0, "Initial rate was not recorded.")
+
+        rate_limiter.on_throttled()
+        self.assertEqual(metrics.get_gauge('rate_limiter_rate'), 5.0, "Reduced rate was not recorded.")
+        self.assertIn('# TYPE bmrs_rate_limiter_rate gauge\nbmrs_rate_limiter_rate 5\n', metrics.to_prometheus())
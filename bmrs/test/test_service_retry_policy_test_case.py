@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+
+from aiohttp import web, ClientConnectionError, ClientResponseError
+from aiohttp.test_utils import TestServer
+from unittest.mock import MagicMock
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_retry_policy import ServiceRetryPolicy
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+
+
+class TestServiceRetryPolicyTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceRetryPolicy class to ensure only transient errors are retried, within budget.
+    """
+
+
+    def setUp(self):
+        """
+        Set up the ServiceRetryPolicy instance with a small retry budget before each test.
+        """
+        self.retry_policy = ServiceRetryPolicy(max_attempts=3,
+                                               base_delay=0.01,
+                                               max_delay=0.02,
+                                               budget_ratio=0.5,
+                                               budget_max_tokens=2,
+                                               metrics=ServiceMetrics())
+
+
+    def server_error(self, status: int) -> ClientResponseError:
+        return ClientResponseError(request_info=MagicMock(), history=(), status=status)
+
+
+    def test_retryable_errors(self):
+        """
+        Test that timeouts, connection errors and 5xx responses are retryable while 4xx responses are not.
+        """
+        self.assertTrue(self.retry_policy.is_retryable(asyncio.TimeoutError()))
+        self.assertTrue(self.retry_policy.is_retryable(ClientConnectionError()))
+        self.assertTrue(self.retry_policy.is_retryable(self.server_error(503)))
+        self.assertFalse(self.retry_policy.is_retryable(self.server_error(404)))
+        self.assertFalse(self.retry_policy.is_retryable(ValueError()))
+
+
+    def test_backoff_and_retry_budget(self):
+        """
+        Test that backoffs stay within their jitter bounds, attempts are capped and the budget limits retries.
+        """
+        delay = self.retry_policy.get_retry_delay(error=asyncio.TimeoutError(), attempt=0)
+        self.assertTrue(0.0 <= delay <= 0.01, "First backoff exceeded base_delay.")
+        self.assertIsNone(self.retry_policy.get_retry_delay(error=asyncio.TimeoutError(), attempt=2),
+                          "Retried beyond max_attempts.")
+
+        self.retry_policy.get_retry_delay(error=asyncio.TimeoutError(), attempt=0)
+        self.assertIsNone(self.retry_policy.get_retry_delay(error=asyncio.TimeoutError(), attempt=0),
+                          "Retried with an empty budget.")
+
+        # Two requests earn back one retry token.
+        self.retry_policy.on_request()
+        self.retry_policy.on_request()
+        self.assertIsNotNone(self.retry_policy.get_retry_delay(error=asyncio.TimeoutError(), attempt=0))
+
+        snapshot = self.retry_policy.snapshot()
+        self.assertEqual(snapshot['retry_count'], 3)
+        self.assertEqual(snapshot['attempts_exhausted_count'], 1)
+        self.assertEqual(snapshot['budget_exhausted_count'], 1)
+
+        metrics = self.retry_policy.metrics
+        self.assertEqual(metrics.get_counter('retry_attempts_exhausted_total'), 1)
+        self.assertEqual(metrics.get_counter('retry_budget_exhausted_total'), 1)
+        self.assertEqual(metrics.get_gauge('retry_budget_tokens'), snapshot['budget_tokens'])
+
+
+    def test_retriever_retries_server_errors(self):
+        """
+        Test that the retriever retries a 5xx response and returns the data of the next attempt.
+        """
+        statuses = [503]
+        metrics = ServiceMetrics()
+
+        async def handler(request):
+            if statuses:
+                return web.Response(status=statuses.pop())
+            return web.Response(text='<response><responseBody><responseList><item>'
+                                     '<settlementDate>2023-11-03</settlementDate><settlementPeriod>1</settlementPeriod>'
+                                     '</item></responseList></responseBody></response>')
+
+        async def retrieve():
+            app = web.Application()
+            app.router.add_get('/', handler)
+            async with TestServer(app) as server:
+                retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                     max_tries=3,
+                                                     max_concurrent_tasks=5,
+                                                     rate_limit_sleep_time=30,
+                                                     metrics=metrics,
+                                                     retry_policy=self.retry_policy,
+                                                     url_builder=MagicMock(build_url=MagicMock(
+                                                                            return_value=str(server.make_url('/')))))
+                return await retriever.retrieve_data('1', 'B1770', '2023-11-03')
+
+        item = asyncio.run(retrieve())
+
+        self.assertEqual(item['settlementPeriod'], '1', "Data was not returned after a retried server error.")
+        self.assertEqual(self.retry_policy.snapshot()['retry_count'], 1)
+        self.assertEqual(metrics.get_counter('retries_total', report='B1770', format='xml', error='ClientResponseError'), 1)
+        self.assertEqual(metrics.get_summary('request_seconds', report='B1770', format='xml')['count'], 1)
+        self.assertGreater(metrics.get_counter('response_bytes_total', report='B1770', format='xml'), 0)
@@ -0,0 +1,100 @@
+import asyncio
+import tempfile
+import unittest
+
+from bmrs.services.service_plot import ServicePlot
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_run_main_async import ServiceRunMainAsync
+from bmrs.services.service_bmrs_parquet_store import ServiceBmrsParquetStore
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class TestServiceRunMainAsyncTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceRunMainAsync class to ensure reports run through the pipeline inside the caller's loop.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a stand-in BMRS server and temporary store and plot directories before each test.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server = BenchmarkBmrsStandInServer(latency=0.01)
+        self.server.start()
+
+
+    def tearDown(self):
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+
+    def build_pipeline(self) -> ServiceRunMainAsync:
+        data_retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                  max_tries=3,
+                                                  max_concurrent_tasks=5,
+                                                  rate_limit_sleep_time=30,
+                                                  url_builder=self.server,
+                                                  metrics=ServiceMetrics())
+        return ServiceRunMainAsync(data_retriever=data_retriever,
+                                   metrics=ServiceMetrics(),
+                                   parquet_store=ServiceBmrsParquetStore(root=f"{self.temp_dir.name}/store"),
+                                   service_plot=ServicePlot(headless=True, output_dir=f"{self.temp_dir.name}/plots"))
+
+
+    def test_run_inside_running_loop(self):
+        """
+        Test that both reports are fetched, converted, stored, analysed and plotted from within a running loop.
+        """
+        async def caller():
+            async with self.build_pipeline() as pipeline:
+                return pipeline, await pipeline.run(settlement_date='2023-11-03')
+
+        pipeline, results = asyncio.run(caller())
+
+        self.assertEqual(set(results), {'B1770', 'B1780'})
+        for report_name, result in results.items():
+            self.assertEqual(len(result.report_ts_dataframe), 48)
+            self.assertEqual(result.summaries[0].period_count, 48)
+            self.assertEqual(len(result.plot_paths), 1)
+            self.assertEqual(len(pipeline.service_bmrs_parquet_store.read(report_name=report_name)), 48)
+        self.assertTrue(pipeline.data_retriever._session is None, "Pooled session was not closed on exit.")
+
+
+    def test_run_range(self):
+        """
+        Test that a range of days is converted as it arrives and analysed per report.
+        """
+        async def caller():
+            pipeline = self.build_pipeline()
+            try:
+                return await pipeline.run_range(start_date='2023-11-01', end_date='2023-11-03', reports=['B1770'])
+            finally:
+                pipeline.close()
+
+        results = asyncio.run(caller())
+
+        self.assertEqual(len(results['B1770'].report_ts_dataframe), 3 * 48)
+        self.assertEqual([summary.period_count for summary in results['B1770'].summaries], [48, 48, 48])
+        self.assertEqual(len(results['B1770'].plot_paths), 3)
+
+
+    def test_stream_report(self):
+        """
+        Test that summaries are updated as periods arrive, before the whole day has been retrieved.
+        """
+        async def caller():
+            pipeline = self.build_pipeline()
+            pipeline.data_retriever.bulk_reports = frozenset()
+            try:
+                return [summary async for summary in pipeline.stream_report(report_name='B1780',
+                                                                            settlement_date='2023-11-03')]
+            finally:
+                pipeline.close()
+
+        summaries = asyncio.run(caller())
+
+        self.assertGreater(len(summaries), 1, "Summaries should be yielded as periods arrive.")
+        self.assertLess(summaries[0].period_count, 48)
+        self.assertEqual(summaries[-1].period_count, 48)
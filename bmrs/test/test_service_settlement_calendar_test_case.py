@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+import pandas as pd
+
+from bmrs.services.service_metrics import ServiceMetrics
+from bmrs.services.service_settlement_calendar import ServiceSettlementCalendar
+from bmrs.services.service_bmrs_data_retriever import ServiceBmrsDataRetriever
+from bmrs.converters.converter_dict_to_dataframe import ConverterDictToDataFrame
+from bmrs.benchmarks.benchmark_bmrs_stand_in_server import BenchmarkBmrsStandInServer
+
+
+class TestServiceSettlementCalendarTestCase(unittest.TestCase):
+    """
+    Test cases for the ServiceSettlementCalendar class to ensure periods follow the Europe/London clock changes.
+    """
+
+
+    def setUp(self):
+        """
+        Set up a calendar covering 2023 before each test.
+        """
+        self.calendar = ServiceSettlementCalendar(start_date='2023-01-01', end_date='2023-12-31')
+
+
+    def test_period_counts(self):
+        """
+        Test that the clock-change days have 46 and 50 periods and every other day 48.
+        """
+        self.assertEqual(self.calendar.get_period_count(settlement_date='2023-03-26'), 46)
+        self.assertEqual(self.calendar.get_period_count(settlement_date='2023-10-29'), 50)
+        self.assertEqual(self.calendar.get_period_count(settlement_date='2023-10-29', granularity='60min'), 25)
+        self.assertEqual(self.calendar.get_periods(settlement_date='2023-11-03'), range(1, 49))
+        self.assertEqual(int(self.calendar.period_counts.sum()), 365 * 48)
+        with self.assertRaises(ValueError):
+            self.calendar.get_period_count(settlement_date='2024-01-01')
+
+
+    def test_timestamps_follow_local_time(self):
+        """
+        Test that periods start from local midnight, so period 5 of the autumn clock change is the second 01:00,
+        and that timestamps map back to their date and period and match the index.
+        """
+        timestamps = self.calendar.to_timestamps(settlement_dates=['2023-03-26', '2023-10-29', '2023-10-29'],
+                                                 settlement_periods=[3, 5, 50])
+
+        self.assertEqual(list(timestamps), [pd.Timestamp('2023-03-26 02:00', tz='Europe/London'),
+                                            pd.Timestamp('2023-10-29 01:00', tz='UTC').tz_convert('Europe/London'),
+                                            pd.Timestamp('2023-10-29 23:30', tz='Europe/London')])
+
+        settlement_dates, settlement_periods = self.calendar.to_settlement_periods(timestamps=timestamps)
+        self.assertEqual(settlement_periods.tolist(), [3, 5, 50])
+        self.assertEqual(settlement_dates.astype(str).tolist(), ['2023-03-26', '2023-10-29', '2023-10-29'])
+
+        index = self.calendar.get_index(start_date='2023-03-25', end_date='2023-10-29')
+        self.assertTrue(index.is_unique)
+        locations = self.calendar.get_locations(settlement_dates=['2023-03-26', '2023-10-29', '2023-10-29'],
+                                                settlement_periods=[3, 5, 50],
+                                                start_date='2023-03-25')
+        self.assertTrue(index[locations].equals(timestamps))
+
+
+    def test_only_existing_periods_are_requested(self):
+        """
+        Test that a 46 period day is requested in 46 calls and converted to 46 distinct half hours.
+        """
+        async def retrieve(retriever):
+            return await retriever.retrieve_all_data(range_end=50,
+                                                     range_start=1,
+                                                     report_name='B1780',
+                                                     settlement_date='2023-03-26')
+
+        with BenchmarkBmrsStandInServer(seed=1) as server:
+            retriever = ServiceBmrsDataRetriever(timeout=10,
+                                                 max_tries=3,
+                                                 max_concurrent_tasks=5,
+                                                 rate_limit_sleep_time=30,
+                                                 url_builder=server,
+                                                 bulk_reports=(),
+                                                 calendar=self.calendar,
+                                                 metrics=ServiceMetrics())
+            report_output = asyncio.run(retrieve(retriever))
+
+            self.assertEqual(server.request_count, 46)
+
+        report_dataframe = ConverterDictToDataFrame(calendar=self.calendar).convert(report_name='B1780',
+                                                                                    report_output=report_output)
+        self.assertEqual(len(report_dataframe), 46)
+        self.assertEqual(report_dataframe.index[2], pd.Timestamp('2023-03-26 02:00', tz='Europe/London'))
@@ -3,8 +3,44 @@ from django.test import TestCase
 # Create your tests here.
 from bmrs.test.test_converter_to_dataframe_test_case import \
                              TestConverterToDataframeTestCase
+from bmrs.test.test_converter_xml_stream_to_dict_test_case import \
+                             TestConverterXmlStreamToDictTestCase
+from bmrs.test.test_converter_csv_to_dataframe_test_case import \
+                             TestConverterCsvToDataframeTestCase
+from bmrs.test.test_registry_reports_test_case import \
+                             TestRegistryReportsTestCase
 from bmrs.test.test_service_bmrs_build_url_test_case import \
                               TestServiceBmrsBuildUrlTestCase
 from bmrs.test.test_service_bmrs_data_retriever_test_case import \
                               TestServiceBmrsDataRetrieverTestCase
-from bmrs.test.test_all_decorators_test_case import TestAllDecoratorsTestCase
\ No newline at end of file
+from bmrs.test.test_service_bmrs_backfill_test_case import \
+                              TestServiceBmrsBackfillTestCase
+from bmrs.test.test_service_bmrs_backfill_manifest_test_case import \
+                              TestServiceBmrsBackfillManifestTestCase
+from bmrs.test.test_service_rate_limiter_test_case import \
+                              TestServiceRateLimiterTestCase
+from bmrs.test.test_service_retry_policy_test_case import \
+                              TestServiceRetryPolicyTestCase
+from bmrs.test.test_service_metrics_test_case import \
+                              TestServiceMetricsTestCase
+from bmrs.test.test_service_cpu_offload_test_case import \
+                              TestServiceCpuOffloadTestCase
+from bmrs.test.test_service_bmrs_response_cache_test_case import \
+                              TestServiceBmrsResponseCacheTestCase
+from bmrs.test.test_service_bmrs_parquet_store_test_case import \
+                              TestServiceBmrsParquetStoreTestCase
+from bmrs.test.test_service_bmrs_gap_index_test_case import \
+                              TestServiceBmrsGapIndexTestCase
+from bmrs.test.test_service_settlement_calendar_test_case import \
+                              TestServiceSettlementCalendarTestCase
+from bmrs.test.test_service_bmrs_live_poller_test_case import \
+                              TestServiceBmrsLivePollerTestCase
+from bmrs.test.test_service_bmrs_incremental_analyser_test_case import \
+                              TestServiceBmrsIncrementalAnalyserTestCase
+from bmrs.test.test_service_plot_test_case import \
+                              TestServicePlotTestCase
+from bmrs.test.test_service_run_main_async_test_case import \
+                              TestServiceRunMainAsyncTestCase
+from bmrs.test.test_benchmark_runner_test_case import \
+                              TestBenchmarkRunnerTestCase
+from bmrs.test.test_all_decorators_test_case import TestAllDecoratorsTestCase